@@ -1,6 +1,7 @@
 import { Composition } from "remotion";
 import { VideoForgeComposition } from "./compositions/VideoForgeComposition";
 import { VideoSpecSchema } from "./types";
+import { totalFrames } from "./timing";
 import { YouTubeIntro } from "./templates/YouTubeIntro";
 import { TikTokShort } from "./templates/TikTokShort";
 import { TextExplainer } from "./templates/TextExplainer";
@@ -75,6 +76,16 @@ export const RemotionRoot: React.FC = () => {
         height={defaultSpec.video.resolution[1]}
         schema={VideoSpecSchema}
         defaultProps={defaultSpec}
+        calculateMetadata={({ props }) => ({
+          // Size the composition from the VideoSpec props instead of the preview defaults
+          durationInFrames: Math.max(
+            1,
+            totalFrames(props.scenes, props.video.fps, props.scene_frames),
+          ),
+          fps: props.video.fps,
+          width: props.video.resolution[0],
+          height: props.video.resolution[1],
+        })}
       />
 
       {/* Pre-built templates */}
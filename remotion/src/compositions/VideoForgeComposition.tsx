@@ -2,6 +2,7 @@ import React from "react";
 import { AbsoluteFill, Sequence, useVideoConfig } from "remotion";
 import type { VideoSpec } from "../types";
 import { SceneRenderer } from "../components/SceneRenderer";
+import { computeSceneTimings } from "../timing";
 
 /**
  * Main VideoForge composition.
@@ -12,13 +13,7 @@ export const VideoForgeComposition: React.FC<VideoSpec> = (spec) => {
   const { fps } = useVideoConfig();
 
   // Calculate scene start frames
-  let currentFrame = 0;
-  const sceneTimings = spec.scenes.map((scene) => {
-    const startFrame = currentFrame;
-    const durationInFrames = Math.round(scene.duration * fps);
-    currentFrame += durationInFrames;
-    return { scene, startFrame, durationInFrames };
-  });
+  const sceneTimings = computeSceneTimings(spec.scenes, fps, spec.scene_frames);
 
   return (
     <AbsoluteFill
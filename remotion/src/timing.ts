@@ -0,0 +1,33 @@
+import type { Scene } from "./types";
+
+export interface SceneTiming {
+  scene: Scene;
+  startFrame: number;
+  durationInFrames: number;
+}
+
+/**
+ * Scene start frames and lengths, with scenes laid back to back. Frame counts
+ * come from the Python timeline index (videoforge.timeline.Timeline, passed as
+ * `scene_frames`) so sharded renders split on exactly the same frames; without
+ * them each duration is rounded to whole frames the same way (half up).
+ */
+export const computeSceneTimings = (
+  scenes: Scene[],
+  fps: number,
+  sceneFrames?: number[],
+): SceneTiming[] => {
+  let currentFrame = 0;
+  return scenes.map((scene, i) => {
+    const startFrame = currentFrame;
+    const durationInFrames = sceneFrames?.[i] ?? Math.round(scene.duration * fps);
+    currentFrame += durationInFrames;
+    return { scene, startFrame, durationInFrames };
+  });
+};
+
+export const totalFrames = (scenes: Scene[], fps: number, sceneFrames?: number[]): number =>
+  computeSceneTimings(scenes, fps, sceneFrames).reduce(
+    (sum, t) => sum + t.durationInFrames,
+    0,
+  );
@@ -98,6 +98,8 @@ export const VideoSpecSchema = z.object({
   scenes: z.array(SceneSchema).default([]),
   audio: AudioSchema.default({}),
   export: ExportSchema.default({}),
+  // Per-scene frame counts from the Python timeline index; computed here if absent
+  scene_frames: z.array(z.number()).optional(),
 });
 
 export type TextOverlay = z.infer<typeof TextOverlaySchema>;
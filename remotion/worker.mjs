@@ -0,0 +1,133 @@
+/**
+ * VideoForge persistent render worker.
+ *
+ * Keeps one headless browser warm and renders jobs with Remotion's programmatic
+ * renderer. Driven by the Python bridge (videoforge.render.remotion_worker) over a
+ * newline-delimited JSON protocol:
+ *
+ *   stdin  <- {"id": "1", "type": "render", "serveUrl": "...", "composition": "...",
+ *              "props": {...}, "output": "/abs/out.mp4", "codec": "h264",
+ *              "width"?: n, "height"?: n, "fps"?: n, "durationInFrames"?: n,
+ *              "frameRange"?: [start, end], "concurrency"?: n, "muted"?: bool}
+ *   stdin  <- {"id": "2", "type": "ping"} | {"type": "shutdown"}
+ *   stdout -> {"id": "1", "event": "progress", "progress": 0.42}
+ *   stdout -> {"id": "1", "ok": true, "output": "/abs/out.mp4"}
+ *   stdout -> {"id": "1", "ok": false, "error": "..."}
+ *
+ * stdout carries protocol messages only; all logging goes to stderr.
+ */
+
+import readline from "node:readline";
+import { openBrowser, renderMedia, selectComposition } from "@remotion/renderer";
+
+// Keep stray library logging off the protocol channel
+console.log = (...args) => console.error(...args);
+
+let browser = null;
+
+const send = (msg) => process.stdout.write(JSON.stringify(msg) + "\n");
+
+const getBrowser = async () => {
+  if (!browser) {
+    browser = await openBrowser("chrome");
+  }
+  return browser;
+};
+
+const resetBrowser = async () => {
+  const old = browser;
+  browser = null;
+  if (old) {
+    await old.close({ silent: true }).catch(() => {});
+  }
+};
+
+const render = async (job) => {
+  const puppeteerInstance = await getBrowser();
+  const inputProps = job.props ?? {};
+
+  const selected = await selectComposition({
+    serveUrl: job.serveUrl,
+    id: job.composition,
+    inputProps,
+    puppeteerInstance,
+  });
+
+  const composition = {
+    ...selected,
+    width: job.width ?? selected.width,
+    height: job.height ?? selected.height,
+    fps: job.fps ?? selected.fps,
+    durationInFrames: job.durationInFrames ?? selected.durationInFrames,
+  };
+
+  let lastReported = -1;
+  await renderMedia({
+    serveUrl: job.serveUrl,
+    composition,
+    inputProps,
+    codec: job.codec ?? "h264",
+    outputLocation: job.output,
+    frameRange: job.frameRange ?? null,
+    muted: job.muted ?? false,
+    concurrency: job.concurrency ?? null,
+    puppeteerInstance,
+    overwrite: true,
+    onProgress: ({ progress }) => {
+      const pct = Math.floor(progress * 100);
+      if (pct !== lastReported) {
+        lastReported = pct;
+        send({ id: job.id, event: "progress", progress });
+      }
+    },
+  });
+  return job.output;
+};
+
+// Jobs run one at a time; the Python side runs several workers for parallelism.
+let queue = Promise.resolve();
+
+const handle = async (job) => {
+  switch (job.type) {
+    case "ping":
+      send({ id: job.id, ok: true });
+      return;
+    case "shutdown":
+      await resetBrowser();
+      process.exit(0);
+      return;
+    case "render":
+      try {
+        const output = await render(job);
+        send({ id: job.id, ok: true, output });
+      } catch (err) {
+        // The browser may have crashed; relaunch it on the next job
+        await resetBrowser();
+        send({ id: job.id, ok: false, error: String(err?.stack ?? err) });
+      }
+      return;
+    default:
+      send({ id: job.id, ok: false, error: `Unknown job type: ${job.type}` });
+  }
+};
+
+const rl = readline.createInterface({ input: process.stdin });
+rl.on("line", (line) => {
+  if (!line.trim()) return;
+  let job;
+  try {
+    job = JSON.parse(line);
+  } catch (err) {
+    send({ ok: false, error: `Invalid JSON: ${err}` });
+    return;
+  }
+  queue = queue.then(() => handle(job));
+});
+
+rl.on("close", async () => {
+  await queue;
+  await resetBrowser();
+  process.exit(0);
+});
+
+send({ event: "ready", pid: process.pid });
@@ -6,8 +6,6 @@ import logging
 from pathlib import Path
 from typing import Protocol
 
-import httpx
-
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -32,6 +30,8 @@ class VoicevoxTTS:
 
     def is_available(self) -> bool:
         """Check if VOICEVOX engine is running."""
+        import httpx
+
         try:
             resp = httpx.get(f"{self.base_url}/version", timeout=3)
             return resp.status_code == 200
@@ -40,6 +40,8 @@ class VoicevoxTTS:
 
     def get_speakers(self) -> list[dict]:
         """Get available speakers/characters."""
+        import httpx
+
         resp = httpx.get(f"{self.base_url}/speakers", timeout=10)
         resp.raise_for_status()
         return resp.json()
@@ -55,6 +57,8 @@ class VoicevoxTTS:
         Returns:
             WAV audio data as bytes.
         """
+        import httpx
+
         # Step 1: Create audio query
         query_resp = httpx.post(
             f"{self.base_url}/audio_query",
@@ -1,8 +1,13 @@
-"""VideoForge CLI - command-line interface for video creation."""
+"""VideoForge CLI - command-line interface for video creation.
+
+Startup is kept cheap: heavy modules (pydantic models, yaml, httpx, dotenv, the
+render pipeline) are imported inside the commands that need them, so ``--help``
+and ``validate`` stay fast when wrapper scripts call them repeatedly.
+tests/test_startup.py enforces this with ``python -X importtime``.
+"""
 
 from __future__ import annotations
 
-import logging
 import sys
 from pathlib import Path
 
@@ -10,40 +15,88 @@ import click
 
 from . import __version__
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    datefmt="%H:%M:%S",
-)
-logger = logging.getLogger("videoforge")
-
 
 @click.group()
 @click.version_option(version=__version__, prog_name="videoforge")
 def main():
     """VideoForge - Natural language video creation system."""
-    pass
+    import logging
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
 
 
 @main.command()
-@click.argument("spec_file", type=click.Path(exists=True))
+@click.argument("spec_file", type=click.Path(exists=True, allow_dash=True))
 @click.option("-o", "--output", type=click.Path(), default=None, help="Output file path")
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="JSONL spec: render scenes as they are read (- reads from stdin)",
+)
 @click.option(
     "--engine",
-    type=click.Choice(["ffmpeg", "remotion"]),
+    type=click.Choice(["ffmpeg", "remotion", "hybrid"]),
     default="ffmpeg",
-    help="Rendering engine (ffmpeg or remotion)",
+    help="Rendering engine (ffmpeg, remotion, or hybrid: Remotion only for animated scenes)",
+)
+@click.option(
+    "--shards", type=int, default=1, help="Remotion: split into N parallel frame-range shards"
+)
+@click.option(
+    "--concurrency", type=int, default=None, help="Remotion: browser tabs per shard"
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=None,
+    help="Remotion: seconds before a render is killed (default: scaled to the video length)",
 )
-def render(spec_file: str, output: str | None, engine: str):
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Keep intermediates in a work dir and continue from them if a previous run failed",
+)
+@click.option(
+    "--calibrate",
+    is_flag=True,
+    help="Record task times into the cost model used by `videoforge plan`",
+)
+def render(
+    spec_file: str,
+    output: str | None,
+    stream: bool,
+    engine: str,
+    shards: int,
+    concurrency: int | None,
+    timeout: float | None,
+    resume: bool,
+    calibrate: bool,
+):
     """Render a video from a VideoSpec YAML file.
 
     Examples:
       videoforge render examples/simple_slideshow.yaml
       videoforge render examples/simple_slideshow.yaml --engine remotion
+      videoforge render examples/simple_slideshow.yaml --engine hybrid
+      generate_scenes | videoforge render - --stream -o long.mp4
+      videoforge render long.yaml -o long.mp4 --resume
+      videoforge render examples/simple_slideshow.yaml --calibrate
     """
     from .config import Config
     from .spec import load_spec
 
+    if resume and (engine == "remotion" or stream or spec_file == "-"):
+        raise click.UsageError("--resume needs a spec file and --engine ffmpeg or hybrid")
+    if calibrate and (engine == "remotion" or stream or spec_file == "-"):
+        raise click.UsageError("--calibrate needs a spec file and --engine ffmpeg or hybrid")
+    if stream or spec_file == "-":
+        _render_stream(spec_file, output, engine)
+        return
+
     click.echo(f"Loading spec: {spec_file}")
     spec = load_spec(spec_file)
     click.echo(f"  Title: {spec.video.title}")
@@ -63,39 +116,441 @@ def render(spec_file: str, output: str | None, engine: str):
             config.output_dir.mkdir(parents=True, exist_ok=True)
             output_path = config.output_dir / f"{spec.video.title}.mp4"
 
-        click.echo("Rendering with Remotion...")
-        result = render_with_remotion(spec, output_path)
+        if shards > 1:
+            from .render.remotion_shards import render_sharded
+
+            click.echo(f"Rendering with Remotion ({shards} shards)...")
+            result = render_sharded(
+                spec,
+                output_path,
+                shards=shards,
+                concurrency=concurrency,
+                timeout=timeout,
+                base_dir=base_dir,
+            )
+        else:
+            click.echo("Rendering with Remotion...")
+            result = render_with_remotion(
+                spec, output_path, timeout=timeout, base_dir=base_dir
+            )
+
+        if spec.export.platforms:
+            from .export.fanout import export_platforms
+
+            export_platforms(result, spec.export.platforms)
     else:
         from .render.engine import RenderEngine
 
-        render_engine = RenderEngine(config)
-        click.echo("Rendering with FFmpeg...")
-        result = render_engine.render(spec, output_path=output_path, base_dir=base_dir)
+        render_plan = timings = None
+        if calibrate:
+            from .render.plan import build_plan
+
+            # Planned before rendering: cache hits afterwards are this render's own output
+            render_plan, timings = build_plan(spec, config, engine, base_dir), {}
+        render_engine = RenderEngine(config, hybrid=engine == "hybrid")
+        click.echo("Rendering with FFmpeg..." if engine == "ffmpeg" else "Rendering (hybrid)...")
+        result = render_engine.render(
+            spec, output_path=output_path, base_dir=base_dir, resume=resume, timings=timings
+        )
+        if render_plan is not None:
+            from .render.plan import default_cost_model_path, record_timings
+
+            costs_path = default_cost_model_path(config.cache_dir)
+            record_timings(render_plan, timings, costs_path)
+            click.echo(f"Cost model updated: {costs_path}")
 
     click.echo(f"Done! Video saved to: {result}")
 
 
+def _render_stream(spec_file: str, output: str | None, engine: str) -> None:
+    """Render a JSONL spec scene by scene while it is being read."""
+    from .config import Config
+    from .render.engine import RenderEngine
+    from .spec import stream_spec
+
+    if engine == "remotion":
+        raise click.UsageError("--stream renders scene by scene: use --engine ffmpeg or hybrid")
+
+    click.echo(f"Streaming spec: {spec_file}")
+    header, scenes = stream_spec(spec_file)
+    click.echo(f"  Title: {header.video.title}")
+    click.echo(f"  Resolution: {header.video.resolution[0]}x{header.video.resolution[1]}")
+    click.echo(f"  Engine: {engine}")
+
+    render_engine = RenderEngine(Config.load(), hybrid=engine == "hybrid")
+    base_dir = Path.cwd() if spec_file == "-" else Path(spec_file).parent
+    result = render_engine.render_stream(
+        header, scenes, output_path=Path(output) if output else None, base_dir=base_dir
+    )
+    click.echo(f"Done! Video saved to: {result}")
+
+
+@main.command()
+@click.argument("master", type=click.Path(exists=True))
+@click.option(
+    "--platforms",
+    default=None,
+    help="Comma-separated platform presets (e.g. youtube,tiktok,instagram_reel,twitter)",
+)
+@click.option(
+    "--codec",
+    type=click.Choice(["h264", "h265", "vp9", "av1"]),
+    default=None,
+    help="Re-encode the master with this codec using the parallel chunked encoder",
+)
+@click.option(
+    "--quality", type=click.Choice(["low", "medium", "high"]), default="high",
+    help="Quality level for --codec",
+)
+@click.option("--workers", type=int, default=None, help="Parallel encoders for --codec")
+@click.option("--hls", is_flag=True, help="Package an HLS rendition ladder")
+@click.option("--dash", is_flag=True, help="Package a DASH rendition ladder")
+@click.option(
+    "--ladder", default=None, help="Comma-separated ABR rungs (default: 1080p,720p,480p,360p)"
+)
+@click.option("--segment", type=float, default=4.0, help="HLS/DASH segment length in seconds")
+@click.option(
+    "-o", "--output-dir", type=click.Path(), default=None, help="Directory for the variants"
+)
+def export(
+    master: str,
+    platforms: str | None,
+    codec: str | None,
+    quality: str,
+    workers: int | None,
+    hls: bool,
+    dash: bool,
+    ladder: str | None,
+    segment: float,
+    output_dir: str | None,
+):
+    """Export platform variants, a re-encoded copy or an HLS/DASH ladder of a video.
+
+    Examples:
+      videoforge export output/master.mp4 --platforms youtube,tiktok,twitter
+      videoforge export output/master.mp4 --codec av1
+      videoforge export output/master.mp4 --hls --dash --ladder 1080p,720p,480p
+    """
+    from .export.fanout import export_platforms, resolve_presets
+    from .export.ladder import resolve_ladder
+
+    if not platforms and not codec and not (hls or dash):
+        click.echo("Specify --platforms, --codec and/or --hls/--dash.", err=True)
+        sys.exit(1)
+
+    names = [p.strip() for p in (platforms or "").split(",") if p.strip()]
+    rungs = [r.strip() for r in (ladder or "").split(",") if r.strip()]
+    try:
+        resolve_presets(names)
+        resolve_ladder(rungs)
+    except ValueError as e:
+        click.echo(str(e), err=True)
+        sys.exit(1)
+
+    master_path = Path(master)
+    out_dir = Path(output_dir) if output_dir else master_path.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if names:
+        click.echo(f"Exporting {len(names)} variant(s) from: {master}")
+        results = export_platforms(master_path, names, out_dir)
+        for name, path in results.items():
+            click.echo(f"  {name}: {path}")
+
+    if codec:
+        from .export.chunked import encode_chunked
+        from .schema import ExportCodec
+
+        target = out_dir / f"{master_path.stem}_{codec}.mp4"
+        click.echo(f"Encoding {codec} (chunked): {target}")
+        encode_chunked(master_path, target, ExportCodec(codec), quality, workers)
+        click.echo(f"  {codec}: {target}")
+
+    if hls or dash:
+        from .export.ladder import package_abr
+        from .render.ffmpeg import probe_video_size
+
+        formats = [f for f, on in (("hls", hls), ("dash", dash)) if on]
+        abr_dir = out_dir / f"{master_path.stem}_abr"
+        click.echo(f"Packaging {'+'.join(formats)}: {abr_dir}")
+        entries = package_abr(
+            master_path, abr_dir, formats, rungs, segment,
+            source_size=probe_video_size(master_path),
+        )
+        for fmt, path in entries.items():
+            click.echo(f"  {fmt}: {path}")
+
+
+@main.command()
+@click.argument("spec_file", type=click.Path(exists=True))
+@click.argument("video", type=click.Path(exists=True))
+@click.option("-o", "--output", type=click.Path(), default=None, help="Output video path")
+@click.option(
+    "--format", "fmt", type=click.Choice(["ass", "vtt", "srt"]), default="ass",
+    help="Subtitle format for the track and sidecar file",
+)
+@click.option("--burn", is_flag=True, help="Burn the captions in (one libass pass)")
+def subtitles(spec_file: str, video: str, output: str | None, fmt: str, burn: bool):
+    """Add a spec's overlays and narration to a video as captions.
+
+    VIDEO should be rendered with `export.subtitles` set, so its picture has no
+    telops. Fixing a caption is then a re-run of this command (a remux).
+
+    Examples:
+      videoforge subtitles spec.yaml output/video.mp4 --format vtt
+      videoforge subtitles spec.yaml output/video.mp4 --burn
+    """
+    from .config import Config
+    from .render.output import atomic_output
+    from .render.subtitles import burn_subtitles, mux_subtitles, write_subtitles
+    from .spec import load_spec
+
+    spec = load_spec(spec_file)
+    video_path = Path(video)
+    output_path = Path(output) if output else video_path.with_name(
+        f"{video_path.stem}_sub{video_path.suffix}"
+    )
+    font = Config.load().default_font
+    if burn:
+        fmt = "ass"  # libass keeps the overlay styling, placement and animation
+    sub_file = write_subtitles(spec, output_path.with_suffix(f".{fmt}"), fmt, font)
+    click.echo(f"Subtitles: {sub_file}")
+
+    with atomic_output(output_path) as partial:
+        if burn:
+            burn_subtitles(video_path, sub_file, partial)
+        else:
+            mux_subtitles(video_path, sub_file, partial)
+    click.echo(f"Done! Video saved to: {output_path}")
+
+
+@main.command()
+@click.argument("spec_file", type=click.Path(exists=True))
+@click.option(
+    "--engine",
+    type=click.Choice(["ffmpeg", "remotion", "hybrid"]),
+    default="ffmpeg",
+    help="Engine the render would use",
+)
+@click.option("--shards", type=int, default=1, help="Remotion: number of frame-range shards")
+@click.option("--json", "as_json", is_flag=True, help="Print the plan as JSON")
+@click.option(
+    "--costs",
+    type=click.Path(exists=True),
+    default=None,
+    help="Cost-model calibration JSON (default: <cache>/plan/cost_model.json)",
+)
+def plan(spec_file: str, engine: str, shards: int, as_json: bool, costs: str | None):
+    """Show the tasks a render would run, with cache status and cost estimates.
+
+    Examples:
+      videoforge plan examples/simple_slideshow.yaml
+      videoforge plan spec.yaml --engine hybrid --json
+    """
+    from .config import Config
+    from .render.plan import CostModel, build_plan
+    from .spec import load_spec
+
+    spec = load_spec(spec_file)
+    render_plan = build_plan(
+        spec,
+        Config.load(),
+        engine=engine,
+        base_dir=Path(spec_file).parent,
+        shards=shards,
+        cost_model=CostModel.load(Path(costs)) if costs else None,
+    )
+    click.echo(render_plan.to_json() if as_json else render_plan.to_table())
+
+
+@main.command()
+@click.argument("spec_files", nargs=-1, type=click.Path(exists=True))
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True),
+    default=None,
+    help='JSONL file with one {"spec": ..., "output": ..., "id": ...} job per line',
+)
+@click.option("-o", "--output-dir", type=click.Path(), default=None, help="Output directory")
+@click.option(
+    "--engine",
+    type=click.Choice(["ffmpeg", "hybrid"]),
+    default="ffmpeg",
+    help="Rendering engine (hybrid: Remotion only for animated scenes)",
+)
+@click.option(
+    "--workers", type=int, default=None, help="Concurrent encodes across all jobs"
+)
+@click.option(
+    "--io-workers", type=int, default=4, help="Concurrent audio/asset/mux tasks across all jobs"
+)
+@click.option(
+    "--ledger",
+    type=click.Path(),
+    default=None,
+    help="Job ledger for resuming (default: .videoforge_batch.json in the output dir)",
+)
+@click.option("--report", type=click.Path(), default=None, help="Write the summary as JSON")
+def batch(
+    spec_files: tuple[str, ...],
+    manifest: str | None,
+    output_dir: str | None,
+    engine: str,
+    workers: int | None,
+    io_workers: int,
+    ledger: str | None,
+    report: str | None,
+):
+    """Render many specs through one shared scheduler.
+
+    Jobs already done according to the ledger are skipped, so rerunning an
+    interrupted batch continues where it stopped.
+
+    Examples:
+      videoforge batch specs/*.yaml -o out/
+      videoforge batch --manifest jobs.jsonl --workers 8
+    """
+    import json
+    from dataclasses import asdict
+
+    from .config import Config
+    from .render.batch import (
+        DEFAULT_LEDGER_NAME,
+        JobLedger,
+        format_report,
+        jobs_from_manifest,
+        jobs_from_specs,
+        run_batch,
+    )
+
+    if bool(spec_files) == bool(manifest):
+        raise click.UsageError("Give spec files or --manifest (not both)")
+    config = Config.load()
+    out_dir = Path(output_dir) if output_dir else config.output_dir
+    if manifest:
+        jobs = jobs_from_manifest(Path(manifest), out_dir)
+    else:
+        jobs = jobs_from_specs([Path(p) for p in spec_files], out_dir)
+
+    click.echo(f"Batch: {len(jobs)} job(s), engine {engine}")
+    job_ledger = JobLedger(Path(ledger) if ledger else out_dir / DEFAULT_LEDGER_NAME)
+    reports = run_batch(
+        jobs,
+        config,
+        hybrid=engine == "hybrid",
+        ledger=job_ledger,
+        workers=workers,
+        io_workers=io_workers,
+    )
+    click.echo(format_report(reports))
+    if report:
+        Path(report).write_text(
+            json.dumps([asdict(r) for r in reports], ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+    if any(r.status == "failed" for r in reports):
+        sys.exit(1)
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", help="Address to listen on (keep it local)")
+@click.option("--port", type=int, default=8765, help="HTTP port")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(),
+    default=None,
+    help="Listen on this Unix socket instead of HTTP on host:port",
+)
+@click.option("--workers", type=int, default=1, help="Jobs rendered at the same time")
+@click.option(
+    "--engine",
+    type=click.Choice(["ffmpeg", "hybrid"]),
+    default="ffmpeg",
+    help="Rendering engine (hybrid: Remotion only for animated scenes)",
+)
+def serve(host: str, port: int, socket_path: str | None, workers: int, engine: str):
+    """Run a render daemon that takes VideoSpec JSON jobs over a local API.
+
+    Configuration, fonts, FFmpeg and caches are loaded once and stay warm
+    between jobs. Videos are written to the output directory.
+
+    Examples:
+      videoforge serve
+      videoforge serve --socket /tmp/videoforge.sock
+      curl -H 'Content-Type: application/json' --data @spec.json localhost:8765/jobs
+      curl localhost:8765/jobs/<id>/events
+    """
+    from .render.daemon import RenderDaemon, make_server
+
+    daemon = RenderDaemon(hybrid=engine == "hybrid", runners=workers)
+    daemon.warm_up()
+    try:
+        server = make_server(daemon, host, port, Path(socket_path) if socket_path else None)
+    except ValueError as e:
+        click.echo(str(e), err=True)
+        sys.exit(1)
+    where = socket_path or f"http://{host}:{server.server_address[1]}"
+    click.echo(f"Serving on {where} ({workers} job(s) at a time, engine {engine})")
+    click.echo(f"Output: {daemon.config.output_dir}")
+    with daemon:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            click.echo("\nStopping: cancelling unfinished jobs")
+        finally:
+            server.server_close()
+            if socket_path:
+                Path(socket_path).unlink(missing_ok=True)
+
+
 @main.command()
 @click.argument("spec_file", type=click.Path(exists=True))
 def validate(spec_file: str):
     """Validate a VideoSpec YAML file without rendering.
 
+    The validated spec is stored in the spec cache (under the cache dir), so a
+    later validate or render of the unchanged file skips parsing.
+
     Example: videoforge validate examples/simple_slideshow.yaml
     """
+    from .config import Config
     from .spec import load_spec
 
     try:
         spec = load_spec(spec_file)
+        if any(scene.text_overlays for scene in spec.scenes):
+            from .render.compositor import check_overlay_fonts
+
+            config = Config.load()
+            problems = check_overlay_fonts(
+                spec.scenes, config.default_font, config.default_font_path
+            )
+            if problems:
+                raise ValueError("fonts are missing glyphs:\n  " + "\n  ".join(problems))
         click.echo(f"Valid VideoSpec: {spec.video.title}")
         click.echo(f"  Version: {spec.version}")
         click.echo(f"  Scenes: {len(spec.scenes)}")
         click.echo(f"  Duration: {spec.total_duration}s")
         click.echo(f"  Resolution: {spec.video.resolution[0]}x{spec.video.resolution[1]}")
         click.echo(f"  Platform: {spec.export.platform.value}")
+        if spec.export.platforms:
+            from .export.fanout import resolve_presets
+
+            resolve_presets(spec.export.platforms)
+            click.echo(f"  Variants: {', '.join(spec.export.platforms)}")
         if spec.audio.bgm:
             click.echo(f"  BGM: {spec.audio.bgm.source or spec.audio.bgm.source_prompt}")
         if spec.audio.narration:
             click.echo(f"  Narration: {len(spec.audio.narration)} segment(s)")
+        if spec.export.subtitles:
+            from .render.subtitles import SUBTITLE_FORMATS, SUBTITLE_MODES
+
+            if spec.export.subtitles not in SUBTITLE_MODES:
+                raise ValueError(f"export.subtitles must be one of {SUBTITLE_MODES}")
+            if spec.export.subtitle_format not in SUBTITLE_FORMATS:
+                raise ValueError(f"export.subtitle_format must be one of {SUBTITLE_FORMATS}")
+            click.echo(f"  Subtitles: {spec.export.subtitles} ({spec.export.subtitle_format})")
     except Exception as e:
         click.echo(f"Invalid: {e}", err=True)
         sys.exit(1)
@@ -216,23 +671,33 @@ def remotion_studio():
 @click.argument("composition", default="VideoForgeComposition")
 @click.option("-o", "--output", type=click.Path(), default=None, help="Output file path")
 @click.option("--props", type=click.Path(exists=True), default=None, help="Props JSON file")
-def remotion_render(composition: str, output: str | None, props: str | None):
+@click.option(
+    "--timeout",
+    type=float,
+    default=None,
+    help="Seconds before the render is killed (default: VIDEOFORGE_FFMPEG_TIMEOUT)",
+)
+def remotion_render(
+    composition: str, output: str | None, props: str | None, timeout: float | None
+):
     """Render a Remotion composition to video.
 
     Examples:
       videoforge remotion render YouTubeIntro
       videoforge remotion render Presentation --props my_props.json
     """
-    import json
-    import subprocess
     import shutil
 
-    from .render.remotion import find_remotion_dir
+    from .render.process import run_process
+    from .render.remotion import find_remotion_dir, serve_url_args
 
     remotion_dir = find_remotion_dir()
     npx = shutil.which("npx")
+    if not npx:
+        click.echo("npx not found. Install Node.js first.", err=True)
+        sys.exit(1)
 
-    cmd = [npx, "remotion", "render", composition]
+    cmd = [npx, "remotion", "render", *serve_url_args(), composition]
 
     if output:
         cmd.append(output)
@@ -242,14 +707,118 @@ def remotion_render(composition: str, output: str | None, props: str | None):
     cmd.extend(["--codec", "h264"])
 
     click.echo(f"Rendering composition: {composition}")
-    result = subprocess.run(cmd, cwd=remotion_dir)
+    result = run_process(cmd, cwd=remotion_dir, timeout=timeout, name="Remotion render")
     if result.returncode == 0:
         click.echo("Render complete!")
     else:
+        click.echo(result.stderr[-2000:], err=True)
         click.echo("Render failed.", err=True)
         sys.exit(1)
 
 
+@remotion.command("bundle")
+@click.option("--force", is_flag=True, help="Rebuild even if a cached bundle exists")
+def remotion_bundle(force: bool):
+    """Pre-build the Remotion webpack bundle so later renders skip bundling.
+
+    The bundle is cached by a hash of remotion/src and package-lock.json.
+    """
+    from .render.remotion import bundle_hash, ensure_bundle
+
+    click.echo(f"Bundling Remotion project ({bundle_hash()})...")
+    try:
+        bundle_dir = ensure_bundle(force=force)
+    except RuntimeError as e:
+        click.echo(str(e), err=True)
+        sys.exit(1)
+    click.echo(f"Bundle ready: {bundle_dir}")
+
+
+@remotion.command("batch")
+@click.argument("jobs_file", type=click.Path(exists=True))
+def remotion_batch(jobs_file: str):
+    """Render many compositions through one warm Remotion worker.
+
+    JOBS_FILE is JSONL, one job per line:
+    {"composition": "YouTubeIntro", "props": {...}, "output": "out/intro.mp4"}
+    """
+    import json
+
+    from .render.remotion import render_template
+    from .render.remotion_worker import RemotionWorker
+
+    with open(jobs_file, encoding="utf-8") as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+
+    failed = 0
+    with RemotionWorker() as worker:
+        for i, job in enumerate(jobs, 1):
+            click.echo(f"[{i}/{len(jobs)}] {job['composition']} -> {job['output']}")
+            try:
+                render_template(
+                    job["composition"], job.get("props", {}), Path(job["output"]), worker=worker
+                )
+            except RuntimeError as e:
+                failed += 1
+                click.echo(f"  Failed: {e}", err=True)
+
+    click.echo(f"Done: {len(jobs) - failed} rendered, {failed} failed.")
+    if failed:
+        sys.exit(1)
+
+
+@remotion.command("shard")
+@click.argument("spec_file", type=click.Path(exists=True))
+@click.option("--index", type=int, required=True, help="Shard index (0-based)")
+@click.option("--of", "count", type=int, required=True, help="Total number of shards")
+@click.option(
+    "--work-dir", type=click.Path(), required=True, help="Directory shared by all shard hosts"
+)
+@click.option("--concurrency", type=int, default=None, help="Browser tabs for this shard")
+def remotion_shard(
+    spec_file: str, index: int, count: int, work_dir: str, concurrency: int | None
+):
+    """Render one frame-range shard of a VideoSpec (for multi-host rendering).
+
+    Run once per index on any hosts sharing WORK_DIR, then 'videoforge remotion join'.
+    """
+    from .render.remotion_shards import render_shard
+    from .spec import load_spec
+
+    spec = load_spec(spec_file)
+    Path(work_dir).mkdir(parents=True, exist_ok=True)
+    result = render_shard(
+        spec,
+        index,
+        count,
+        Path(work_dir),
+        concurrency=concurrency,
+        base_dir=Path(spec_file).parent,
+    )
+    click.echo(f"Shard {index}: {result or 'nothing to render'}")
+
+
+@remotion.command("join")
+@click.argument("spec_file", type=click.Path(exists=True))
+@click.option("--of", "count", type=int, required=True, help="Total number of shards")
+@click.option("--work-dir", type=click.Path(exists=True), required=True, help="Shard directory")
+@click.option("-o", "--output", type=click.Path(), required=True, help="Output file path")
+def remotion_join(spec_file: str, count: int, work_dir: str, output: str):
+    """Join rendered shards of a VideoSpec into the final video."""
+    from .render.remotion_shards import join_shards
+    from .spec import load_spec
+
+    spec = load_spec(spec_file)
+    try:
+        result = join_shards(
+            spec, count, Path(work_dir), Path(output), base_dir=Path(spec_file).parent
+        )
+    except FileNotFoundError as e:
+        click.echo(str(e), err=True)
+        sys.exit(1)
+    click.echo(f"Done! Video saved to: {result}")
+
+
 @remotion.command("list")
 def remotion_list():
     """List available Remotion compositions."""
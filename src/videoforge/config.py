@@ -6,8 +6,6 @@ import os
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from dotenv import load_dotenv
-
 
 @dataclass
 class Config:
@@ -32,10 +30,23 @@ class Config:
     output_dir: Path = field(default_factory=lambda: Path("./output"))
     default_font: str = "Yu Gothic"
     default_font_path: str = ""
+    cache_dir: Path = field(default_factory=lambda: Path.home() / ".cache" / "videoforge")
+    # Concurrent Remotion renders per machine; each render already uses several tabs
+    remotion_slots: int = field(default_factory=lambda: max(1, (os.cpu_count() or 4) // 4))
+    # Concurrent encodes in a render's CPU pool; FFmpeg already threads each encode
+    render_workers: int = field(default_factory=lambda: max(1, (os.cpu_count() or 2) // 2))
+    # External processes: base timeout plus allowance per second of content,
+    # niceness and CPU list (e.g. "0-7") applied to ffmpeg/ffprobe/npx
+    ffmpeg_timeout: float = 600.0
+    ffmpeg_timeout_per_second: float = 10.0
+    process_nice: int = 0
+    process_cpus: str = ""
 
     @classmethod
     def load(cls, env_file: str | Path | None = None) -> Config:
         """Load configuration from .env file and environment variables."""
+        from dotenv import load_dotenv
+
         if env_file:
             load_dotenv(env_file)
         else:
@@ -52,6 +63,19 @@ class Config:
             output_dir=Path(os.getenv("OUTPUT_DIR", "./output")),
             default_font=os.getenv("DEFAULT_FONT", "Yu Gothic"),
             default_font_path=os.getenv("DEFAULT_FONT_PATH", ""),
+            cache_dir=Path(os.getenv("VIDEOFORGE_CACHE_DIR", "~/.cache/videoforge")).expanduser(),
+            remotion_slots=int(
+                os.getenv("VIDEOFORGE_REMOTION_SLOTS", max(1, (os.cpu_count() or 4) // 4))
+            ),
+            render_workers=int(
+                os.getenv("VIDEOFORGE_RENDER_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+            ),
+            ffmpeg_timeout=float(os.getenv("VIDEOFORGE_FFMPEG_TIMEOUT", "600")),
+            ffmpeg_timeout_per_second=float(
+                os.getenv("VIDEOFORGE_FFMPEG_TIMEOUT_PER_SECOND", "10")
+            ),
+            process_nice=int(os.getenv("VIDEOFORGE_NICE", "0")),
+            process_cpus=os.getenv("VIDEOFORGE_CPU_AFFINITY", ""),
         )
 
     def has_voicevox(self) -> bool:
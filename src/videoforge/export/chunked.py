@@ -0,0 +1,193 @@
+"""Parallel chunked encoding for slow codecs (H.265 / VP9 / AV1).
+
+The master is cut at keyframes (every scene boundary is one, since each scene clip
+starts with an IDR frame), each chunk is encoded by its own FFmpeg process, and the
+encoded chunks are stitched back together by stream copy.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..render.ffmpeg import probe_video_packets, run_ffmpeg, write_concat_list
+from ..render.output import atomic_output
+from ..render.process import current_cancel, current_threads
+from ..schema import ExportCodec
+
+logger = logging.getLogger(__name__)
+
+# FFmpeg encoder per export codec
+ENCODERS: dict[ExportCodec, str] = {
+    ExportCodec.H264: "libx264",
+    ExportCodec.H265: "libx265",
+    ExportCodec.VP9: "libvpx-vp9",
+    ExportCodec.AV1: "libsvtav1",
+}
+
+# Constant-quality level per codec and ExportConfig.quality
+CRF: dict[ExportCodec, dict[str, int]] = {
+    ExportCodec.H264: {"low": 28, "medium": 23, "high": 18},
+    ExportCodec.H265: {"low": 30, "medium": 26, "high": 22},
+    ExportCodec.VP9: {"low": 40, "medium": 34, "high": 28},
+    ExportCodec.AV1: {"low": 42, "medium": 35, "high": 28},
+}
+
+# Chunks shorter than this are merged into their neighbour; encoder warm-up and
+# rate-control restarts make tiny chunks inefficient.
+MIN_CHUNK_SECONDS = 10.0
+
+
+@dataclass
+class Chunk:
+    """A contiguous, keyframe-aligned range of the master."""
+
+    index: int
+    start: float  # pts of the first (key)frame
+    frames: int
+    duration: float = 0.0  # seconds up to the next chunk's first frame
+
+
+def encoder_args(codec: ExportCodec, quality: str = "high", threads: int = 0) -> list[str]:
+    """Video encoder arguments for a codec at a quality level."""
+    crf = CRF[codec].get(quality, CRF[codec]["high"])
+    args = ["-c:v", ENCODERS[codec], "-crf", str(crf), "-pix_fmt", "yuv420p"]
+    if codec == ExportCodec.VP9:
+        args += ["-b:v", "0", "-row-mt", "1"]
+    if threads:
+        args += ["-threads", str(threads)]
+    return args
+
+
+def plan_chunks(
+    packets: list[tuple[float, bool]],
+    num_chunks: int,
+    min_seconds: float = MIN_CHUNK_SECONDS,
+) -> list[Chunk]:
+    """Split a packet list into roughly equal chunks that start on keyframes.
+
+    Args:
+        packets: (pts_time, is_keyframe) in presentation order.
+        num_chunks: Desired number of chunks (an upper bound).
+        min_seconds: Minimum chunk length.
+
+    Returns:
+        Chunks covering every frame exactly once.
+    """
+    if not packets:
+        return []
+
+    first, last = packets[0][0], packets[-1][0]
+    total = last - first
+    num_chunks = max(1, min(num_chunks, int(total // min_seconds) or 1))
+    keyframes = [i for i, (_, key) in enumerate(packets) if key and i > 0]
+
+    # Snap each ideal cut to the nearest keyframe at or after it
+    cuts = [0]
+    k = 0
+    for n in range(1, num_chunks):
+        target = first + total * n / num_chunks
+        while k < len(keyframes) and packets[keyframes[k]][0] < target:
+            k += 1
+        if k >= len(keyframes):
+            break
+        idx = keyframes[k]
+        if packets[idx][0] - packets[cuts[-1]][0] >= min_seconds:
+            cuts.append(idx)
+
+    if len(cuts) > 1 and last - packets[cuts[-1]][0] < min_seconds:
+        cuts.pop()
+
+    starts = [packets[i][0] for i in cuts] + [last]
+    bounds = [*cuts, len(packets)]
+    return [
+        Chunk(
+            index=i,
+            start=starts[i],
+            frames=bounds[i + 1] - bounds[i],
+            duration=starts[i + 1] - starts[i],
+        )
+        for i in range(len(cuts))
+    ]
+
+
+def encode_chunked(
+    master: Path,
+    output: Path,
+    codec: ExportCodec,
+    quality: str = "high",
+    workers: int | None = None,
+    work_dir: Path | None = None,
+) -> Path:
+    """Re-encode ``master`` with ``codec`` by encoding keyframe-aligned chunks in parallel.
+
+    Each chunk runs in its own FFmpeg process, so encoding throughput scales with the
+    number of workers until the cores are saturated. Audio is copied from the master
+    (or transcoded to Opus for WebM) while stitching.
+
+    Args:
+        master: Rendered master video (any codec FFmpeg can decode).
+        output: Destination file. Its suffix picks the container.
+        codec: Target video codec.
+        quality: "low", "medium" or "high".
+        workers: Parallel encoder processes. Defaults to half the CPU count (or of
+            the ``process.thread_budget``, when one is set).
+        work_dir: Where the encoded chunks are kept until they are stitched.
+            Defaults to the output's directory, which has room for the output
+            (the system temp dir is often a small tmpfs).
+
+    Returns:
+        Path to the encoded output.
+    """
+    master, output = Path(master), Path(output)
+    cpus = current_threads() or os.cpu_count() or 1
+    workers = workers or max(1, cpus // 2)
+    threads = max(1, cpus // workers)
+
+    chunks = plan_chunks(probe_video_packets(master), num_chunks=workers * 2)
+    if not chunks:
+        raise ValueError(f"No video frames found in {master}")
+    logger.info(
+        "Encoding %s as %s in %d chunk(s) with %d worker(s)",
+        master.name, codec.value, len(chunks), workers,
+    )
+
+    cancel = current_cancel()  # pool threads don't inherit the caller's cancel scope
+    chunk_root = Path(work_dir) if work_dir is not None else output.parent
+    chunk_root.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=".videoforge_chunks_", dir=chunk_root) as tmpdir:
+        tmp = Path(tmpdir)
+
+        def encode(chunk: Chunk) -> Path:
+            part = tmp / f"chunk_{chunk.index:05d}.mkv"
+            run_ffmpeg([
+                "-ss", f"{chunk.start:.6f}",
+                "-i", str(master),
+                "-frames:v", str(chunk.frames),
+                "-an",
+                *encoder_args(codec, quality, threads),
+                str(part),
+            ], duration=chunk.duration, cancel=cancel)
+            return part
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(encode, chunks))
+
+        list_file = write_concat_list(tmp / "_chunks.txt", parts)
+        audio_codec = ["-c:a", "libopus"] if output.suffix == ".webm" else ["-c:a", "copy"]
+        tag = ["-tag:v", "hvc1"] if codec == ExportCodec.H265 else []
+        with atomic_output(output) as partial:
+            run_ffmpeg([
+                "-f", "concat", "-safe", "0", "-i", str(list_file),
+                "-i", str(master),
+                "-map", "0:v", "-map", "1:a?",
+                "-c:v", "copy", *tag, *audio_codec,
+                "-movflags", "+faststart",
+                str(partial),
+            ], duration=sum(c.duration for c in chunks))
+
+    return output
@@ -0,0 +1,100 @@
+"""Multi-platform fan-out export - encodes every platform variant from a single decode."""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+from pathlib import Path
+
+from ..render.ffmpeg import media_duration, run_ffmpeg
+from ..render.output import atomic_output
+from .platforms import PlatformPreset, get_encode_args, get_preset, get_video_filter
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_presets(platforms: list[str]) -> dict[str, PlatformPreset]:
+    """Look up presets by name, raising ValueError for unknown platforms."""
+    presets: dict[str, PlatformPreset] = {}
+    for name in platforms:
+        preset = get_preset(name)
+        if preset is None:
+            raise ValueError(f"Unknown export platform: {name}")
+        presets[name.lower()] = preset
+    return presets
+
+
+def variant_path(master: Path, platform: str, output_dir: Path | None = None) -> Path:
+    """Default output path for a platform variant of ``master``."""
+    return (output_dir or master.parent) / f"{master.stem}_{platform}.mp4"
+
+
+def build_fanout_args(
+    master: Path,
+    presets: dict[str, PlatformPreset],
+    outputs: dict[str, Path],
+) -> list[str]:
+    """Build one FFmpeg command that splits the decoded master to every preset.
+
+    The master is decoded once; ``split`` feeds a per-platform scale/pad/fps chain
+    and each chain is encoded to its own output by the same process.
+    """
+    names = list(presets)
+    labels = "".join(f"[s{i}]" for i in range(len(names)))
+    graph = [f"[0:v]split={len(names)}{labels}"]
+    for i, name in enumerate(names):
+        graph.append(f"[s{i}]{get_video_filter(presets[name])}[v{i}]")
+
+    args = ["-i", str(master), "-filter_complex", ";".join(graph)]
+    for i, name in enumerate(names):
+        args += ["-map", f"[v{i}]", "-map", "0:a?"]
+        args += get_encode_args(presets[name])
+        args.append(str(outputs[name]))
+    return args
+
+
+def export_platforms(
+    master: Path,
+    platforms: list[str],
+    output_dir: Path | None = None,
+) -> dict[str, Path]:
+    """Export platform variants of a rendered master in a single FFmpeg pass.
+
+    Args:
+        master: The rendered master video.
+        platforms: Preset names from ``PRESETS`` (e.g. "youtube", "tiktok").
+        output_dir: Where to write variants. Defaults to the master's directory.
+
+    Returns:
+        Mapping of platform name to the exported file.
+    """
+    master = Path(master)
+    presets = resolve_presets(platforms)
+    if not presets:
+        return {}
+
+    targets = {name: variant_path(master, name, output_dir) for name in presets}
+    duration = media_duration(master)
+    _warn_over_limit(master, presets, duration)
+
+    with contextlib.ExitStack() as stack:
+        partials = {name: stack.enter_context(atomic_output(p)) for name, p in targets.items()}
+        logger.info("Exporting %d platform variant(s): %s", len(presets), ", ".join(presets))
+        run_ffmpeg(build_fanout_args(master, presets, partials), duration=duration)
+
+    return targets
+
+
+def _warn_over_limit(
+    master: Path, presets: dict[str, PlatformPreset], duration: float | None
+) -> None:
+    """Log a warning for platforms whose max duration the master exceeds."""
+    limited = [p for p in presets.values() if p.max_duration is not None]
+    if not limited or duration is None:
+        return
+    for preset in limited:
+        if duration > preset.max_duration:
+            logger.warning(
+                "%s: %.1fs exceeds the %s limit of %ds.",
+                master.name, duration, preset.name, preset.max_duration,
+            )
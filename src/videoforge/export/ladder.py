@@ -0,0 +1,178 @@
+"""Adaptive-bitrate packaging - an HLS/DASH rendition ladder from a single decode."""
+
+from __future__ import annotations
+
+import logging
+import re
+from pathlib import Path
+
+from ..render.ffmpeg import media_duration, probe_has_audio, run_ffmpeg
+from ..render.output import atomic_output
+from .platforms import ABR_LADDER, PlatformPreset, get_rendition_filter
+
+logger = logging.getLogger(__name__)
+
+STREAMING_FORMATS = ("hls", "dash")
+DEFAULT_SEGMENT_SECONDS = 4.0
+
+
+def resolve_ladder(names: list[str] | None = None) -> list[PlatformPreset]:
+    """Look up ladder rungs by name (all rungs when ``names`` is empty)."""
+    if not names:
+        return list(ABR_LADDER.values())
+    rungs = []
+    for name in names:
+        rung = ABR_LADDER.get(name.lower())
+        if rung is None:
+            raise ValueError(
+                f"Unknown ABR rendition: {name} (choose from {', '.join(ABR_LADDER)})"
+            )
+        rungs.append(rung)
+    return rungs
+
+
+def _scale_bitrate(bitrate: str, factor: float) -> str:
+    """Multiply an FFmpeg bitrate string such as "5M" or "1200k"."""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([kKmM]?)", bitrate)
+    if not m:
+        raise ValueError(f"Invalid bitrate: {bitrate}")
+    value = float(m.group(1)) * factor
+    return f"{value:g}{m.group(2)}"
+
+
+def build_ladder_args(
+    master: Path,
+    renditions: list[PlatformPreset],
+    out_dir: Path,
+    formats: list[str],
+    segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+    has_audio: bool = True,
+) -> list[str]:
+    """Build one FFmpeg command that encodes and packages every rendition.
+
+    The master is decoded once and ``split`` to one scale chain per rendition.
+    Keyframes are forced on segment boundaries with scene-cut detection off, so
+    every rendition has identical GOP boundaries and players can switch cleanly.
+    When both formats are requested the DASH muxer writes fMP4 segments and an
+    HLS master playlist that references the same segments.
+    """
+    formats = [f.lower() for f in formats]
+    unknown = set(formats) - set(STREAMING_FORMATS)
+    if unknown or not formats:
+        raise ValueError(f"Streaming formats must be among {STREAMING_FORMATS}, got {formats}")
+
+    n = len(renditions)
+    labels = "".join(f"[s{i}]" for i in range(n))
+    graph = [f"[0:v]split={n}{labels}"]
+    for i, rung in enumerate(renditions):
+        graph.append(f"[s{i}]{get_rendition_filter(rung)}[v{i}]")
+
+    gop = max(1, round(renditions[0].fps * segment_seconds))
+    args = ["-i", str(master), "-filter_complex", ";".join(graph)]
+    for i, rung in enumerate(renditions):
+        args += [
+            "-map", f"[v{i}]",
+            f"-c:v:{i}", rung.codec,
+            f"-b:v:{i}", rung.bitrate,
+            f"-maxrate:v:{i}", _scale_bitrate(rung.bitrate, 1.07),
+            f"-bufsize:v:{i}", _scale_bitrate(rung.bitrate, 1.5),
+        ]
+    args += [
+        "-pix_fmt", "yuv420p",
+        "-g", str(gop),
+        "-keyint_min", str(gop),
+        "-sc_threshold", "0",
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})",
+    ]
+
+    if "dash" in formats:
+        # One shared audio track in its own adaptation set
+        if has_audio:
+            args += ["-map", "0:a:0", "-c:a", "aac", "-b:a", renditions[0].audio_bitrate]
+        adaptation = "id=0,streams=v id=1,streams=a" if has_audio else "id=0,streams=v"
+        args += [
+            "-f", "dash",
+            "-seg_duration", str(segment_seconds),
+            "-use_template", "1",
+            "-use_timeline", "1",
+            "-adaptation_sets", adaptation,
+            "-init_seg_name", "init-$RepresentationID$.m4s",
+            "-media_seg_name", "chunk-$RepresentationID$-$Number%05d$.m4s",
+        ]
+        if "hls" in formats:
+            args += ["-hls_playlist", "1"]
+        args.append(str(out_dir / "manifest.mpd"))
+        return args
+
+    # HLS only: one audio copy per variant so each variant playlist is self-contained
+    stream_map = []
+    for i, rung in enumerate(renditions):
+        if has_audio:
+            args += ["-map", "0:a:0", f"-c:a:{i}", "aac", f"-b:a:{i}", rung.audio_bitrate]
+            stream_map.append(f"v:{i},a:{i},name:{rung.name}")
+        else:
+            stream_map.append(f"v:{i},name:{rung.name}")
+    args += [
+        "-f", "hls",
+        "-hls_time", str(segment_seconds),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", str(out_dir / "%v" / "seg_%05d.ts"),
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", " ".join(stream_map),
+        str(out_dir / "%v" / "index.m3u8"),
+    ]
+    return args
+
+
+def package_abr(
+    master: Path,
+    out_dir: Path,
+    formats: list[str] | None = None,
+    renditions: list[str] | None = None,
+    segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+    source_size: tuple[int, int] | None = None,
+) -> dict[str, Path]:
+    """Encode an ABR ladder from ``master`` and write HLS and/or DASH packaging.
+
+    Args:
+        master: Rendered master video.
+        out_dir: Directory for playlists, manifests and segments.
+        formats: "hls" and/or "dash". Defaults to HLS.
+        renditions: Ladder rung names from ``ABR_LADDER``. Defaults to all rungs.
+        segment_seconds: Target segment (and GOP) length.
+        source_size: Master resolution; rungs larger than it are skipped.
+
+    The ladder is written to a temp directory beside ``out_dir`` that replaces
+    ``out_dir`` once every rendition is done, so players never see a partial
+    ladder and a failed run leaves the previous one in place.
+
+    Returns:
+        Mapping of format to its entry point (``master.m3u8`` / ``manifest.mpd``).
+    """
+    master, out_dir = Path(master), Path(out_dir)
+    formats = [f.lower() for f in (formats or ["hls"])]
+    rungs = resolve_ladder(renditions)
+    if source_size:
+        fitting = [r for r in rungs if min(r.resolution) <= min(source_size)]
+        rungs = fitting or rungs[-1:]
+    logger.info(
+        "Packaging %s with %d rendition(s): %s",
+        "+".join(formats), len(rungs), ", ".join(r.name for r in rungs),
+    )
+    has_audio = probe_has_audio(master)
+    with atomic_output(out_dir) as partial:
+        partial.mkdir()
+        if "dash" not in formats:
+            for rung in rungs:
+                (partial / rung.name).mkdir()
+        args = build_ladder_args(
+            master, rungs, partial, formats, segment_seconds, has_audio=has_audio
+        )
+        run_ffmpeg(args, duration=media_duration(master))
+
+    entries = {}
+    if "hls" in formats:
+        entries["hls"] = out_dir / "master.m3u8"
+    if "dash" in formats:
+        entries["dash"] = out_dir / "manifest.mpd"
+    return entries
@@ -84,6 +84,52 @@ PRESETS: dict[str, PlatformPreset] = {
 }
 
 
+# Adaptive-bitrate ladder rungs for HLS/DASH packaging. Rungs are named by the
+# short side, so portrait masters get 1080x1920 / 720x1280 / ... automatically.
+ABR_LADDER: dict[str, PlatformPreset] = {
+    "1080p": PlatformPreset(
+        name="1080p",
+        resolution=(1920, 1080),
+        fps=30,
+        codec="libx264",
+        bitrate="5M",
+        audio_bitrate="192k",
+        max_duration=None,
+        aspect_ratio="source",
+    ),
+    "720p": PlatformPreset(
+        name="720p",
+        resolution=(1280, 720),
+        fps=30,
+        codec="libx264",
+        bitrate="3M",
+        audio_bitrate="128k",
+        max_duration=None,
+        aspect_ratio="source",
+    ),
+    "480p": PlatformPreset(
+        name="480p",
+        resolution=(854, 480),
+        fps=30,
+        codec="libx264",
+        bitrate="1200k",
+        audio_bitrate="96k",
+        max_duration=None,
+        aspect_ratio="source",
+    ),
+    "360p": PlatformPreset(
+        name="360p",
+        resolution=(640, 360),
+        fps=30,
+        codec="libx264",
+        bitrate="700k",
+        audio_bitrate="64k",
+        max_duration=None,
+        aspect_ratio="source",
+    ),
+}
+
+
 def get_preset(platform: str) -> PlatformPreset | None:
     """Get a platform preset by name."""
     return PRESETS.get(platform.lower())
@@ -91,12 +137,32 @@ def get_preset(platform: str) -> PlatformPreset | None:
 
 def get_ffmpeg_args(preset: PlatformPreset) -> list[str]:
     """Generate FFmpeg encoding arguments from a platform preset."""
+    return ["-vf", get_video_filter(preset)] + get_encode_args(preset)
+
+
+def get_video_filter(preset: PlatformPreset) -> str:
+    """Build the scale/pad/fps filter chain that conforms a video to a preset."""
     w, h = preset.resolution
+    return (
+        f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+        f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,fps={preset.fps}"
+    )
+
+
+def get_rendition_filter(preset: PlatformPreset) -> str:
+    """Scale to an ABR rung's short side, keeping the source aspect ratio (no padding)."""
+    short = min(preset.resolution)
+    return (
+        f"scale=w='if(gte(iw,ih),-2,{short})':h='if(gte(iw,ih),{short},-2)',"
+        f"fps={preset.fps}"
+    )
+
+
+def get_encode_args(preset: PlatformPreset) -> list[str]:
+    """Per-output encoder arguments for a preset (no filters or stream maps)."""
     return [
         "-c:v", preset.codec,
         "-b:v", preset.bitrate,
-        "-r", str(preset.fps),
-        "-vf", f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2",
         "-c:a", "aac",
         "-b:a", preset.audio_bitrate,
         "-movflags", "+faststart",
@@ -0,0 +1,92 @@
+"""Overlay animation curves as FFmpeg expressions.
+
+Timings mirror remotion/src/components/TextOverlay.tsx, so an animated telop looks
+the same whichever engine renders its scene.
+"""
+
+from __future__ import annotations
+
+import math
+
+FADE_SECONDS = 0.5
+SLIDE_SECONDS = 0.4
+SLIDE_FADE_SECONDS = 0.3
+SLIDE_DISTANCE = 60  # pixels
+TYPEWRITER_SECONDS = 1.5
+# Longer texts reveal several characters per step to bound the number of layers
+TYPEWRITER_MAX_STEPS = 48
+
+
+def escape_expr(expr: str) -> str:
+    """Escape commas so an expression survives inside a filter graph."""
+    return expr.replace(",", "\\,")
+
+
+def opacity_ramp(
+    animation: str, start: float | None, end: float | None, duration: float
+) -> tuple[str, float, float] | None:
+    """``(direction, start, length)`` of the overlay's fade, or None if it has none.
+
+    Args:
+        animation: ``Animation`` value.
+        start: Overlay start within the scene (None = scene start).
+        end: Overlay end within the scene (None = scene end).
+        duration: Scene duration.
+    """
+    s = start or 0.0
+    e = duration if end is None else end
+    if animation == "fade_in":
+        return ("in", s, FADE_SECONDS)
+    if animation == "fade_out":
+        return ("out", max(s, e - FADE_SECONDS), FADE_SECONDS)
+    if animation in ("slide_up", "slide_down"):
+        return ("in", s, SLIDE_FADE_SECONDS)
+    return None
+
+
+def alpha_expr(
+    animation: str, start: float | None, end: float | None, duration: float
+) -> str | None:
+    """Opacity in [0, 1] as a function of ``t``, or None for fully opaque."""
+    ramp = opacity_ramp(animation, start, end, duration)
+    if ramp is None:
+        return None
+    direction, st, length = ramp
+    if direction == "in":
+        return f"clip((t-{st})/{length},0,1)"
+    return f"clip(({st + length}-t)/{length},0,1)"
+
+
+def y_offset_expr(animation: str, start: float | None) -> str | None:
+    """Vertical offset in pixels as a function of ``t``, or None if the text stays put."""
+    if animation not in ("slide_up", "slide_down"):
+        return None
+    sign = "" if animation == "slide_up" else "-"
+    s = start or 0.0
+    return f"{sign}{SLIDE_DISTANCE}*(1-clip((t-{s})/{SLIDE_SECONDS},0,1))"
+
+
+def typewriter_steps(
+    text: str, start: float | None, end: float | None
+) -> list[tuple[str, float, float | None]]:
+    """Windowed prefixes of ``text``: ``(prefix, shown_from, shown_until)``.
+
+    Matches Remotion's ``floor(len * elapsed / TYPEWRITER_SECONDS)`` reveal. Windows
+    are inclusive (like overlay ``end`` times) and stop a millisecond before the next
+    one begins; the last window (the full text) lasts until ``end``.
+    """
+    length = len(text)
+    if length == 0:
+        return []
+    s = start or 0.0
+    steps = min(length, TYPEWRITER_MAX_STEPS)
+    counts = sorted({math.ceil(j * length / steps) for j in range(1, steps + 1)})
+    windows = []
+    for i, count in enumerate(counts):
+        shown_from = s + TYPEWRITER_SECONDS * count / length
+        if i + 1 < len(counts):
+            shown_until = round(s + TYPEWRITER_SECONDS * counts[i + 1] / length - 0.001, 4)
+        else:
+            shown_until = end
+        windows.append((text[:count], round(shown_from, 4), shown_until))
+    return windows
@@ -0,0 +1,336 @@
+"""Local asset server for Remotion renders.
+
+Remotion's browser can only load assets over HTTP, so local files referenced by a
+VideoSpec are served from a short-lived server on 127.0.0.1 for the duration of a
+render. Oversized images and videos are first scaled down to the render resolution
+(and cached), so every browser tab decodes no more pixels than it draws.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import hashlib
+import logging
+import math
+import mimetypes
+import re
+import threading
+from collections.abc import Iterator
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Self
+from urllib.parse import quote, unquote
+
+from ..schema import VideoSpec
+from .ffmpeg import media_duration, probe_video_size, run_ffmpeg
+from .output import atomic_output
+
+logger = logging.getLogger(__name__)
+
+REMOTE_PREFIXES = ("http://", "https://", "data:", "blob:")
+CHUNK_SIZE = 1 << 16
+# Served files are content-addressed by URL, so browsers may cache them forever
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def asset_key(path: Path, *extra: object) -> str:
+    """Cache key for a local asset, from its path, size and mtime (no re-reading)."""
+    st = path.stat()
+    parts = [str(path.resolve()), str(st.st_size), str(st.st_mtime_ns), *map(str, extra)]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:24]
+
+
+def cover_scale(size: tuple[int, int], target: tuple[int, int]) -> float:
+    """Scale factor at which ``size`` just covers ``target`` (below 1 means oversized)."""
+    return max(target[0] / size[0], target[1] / size[1])
+
+
+def fit_asset(
+    path: Path,
+    kind: str,
+    width: int,
+    height: int,
+    cache_dir: Path | None = None,
+) -> Path:
+    """Return ``path``, or a cached copy scaled down to cover ``width``x``height``.
+
+    Assets already at or below the render resolution are returned unchanged, as are
+    files that cannot be probed.
+
+    Args:
+        path: Local image or video file.
+        kind: "image" or "video".
+        width: Render width.
+        height: Render height.
+        cache_dir: Root cache directory. Defaults to the configured one.
+    """
+    try:
+        size = _image_size(path) if kind == "image" else probe_video_size(path)
+    except (OSError, RuntimeError, ValueError) as e:
+        logger.debug("Could not probe %s (%s); serving as is.", path, e)
+        return path
+    scale = cover_scale(size, (width, height))
+    if scale >= 1:
+        return path
+
+    if cache_dir is None:
+        from ..config import Config
+
+        cache_dir = Config.load().cache_dir
+    suffix = path.suffix.lower() if kind == "image" else ".mp4"
+    cached = Path(cache_dir) / "assets" / f"{asset_key(path, width, height)}{suffix}"
+    if cached.exists():
+        return cached
+
+    new_size = (math.ceil(size[0] * scale), math.ceil(size[1] * scale))
+    logger.info(
+        "Downscaling %s %dx%d -> %dx%d", path.name, size[0], size[1], new_size[0], new_size[1]
+    )
+    with atomic_output(cached) as partial:
+        if kind == "image":
+            _resize_image(path, partial, new_size)
+        else:
+            _transcode_video(path, partial, width, height)
+    return cached
+
+
+def _image_size(path: Path) -> tuple[int, int]:
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as img:
+        return ImageOps.exif_transpose(img).size
+
+
+def _resize_image(src: Path, dst: Path, size: tuple[int, int]) -> None:
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        fmt = img.format
+        img = ImageOps.exif_transpose(img)
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img = img.resize(size, Image.Resampling.LANCZOS)
+        options = {"quality": 92} if fmt in ("JPEG", "WEBP") else {}
+        img.save(dst, format=fmt, **options)
+
+
+def _transcode_video(src: Path, dst: Path, width: int, height: int) -> None:
+    # Video only, as for FFmpeg-rendered video scenes: a render's audio is its BGM and
+    # narration (and copying an arbitrary source audio codec into MP4 can fail)
+    scale = (
+        f"scale={width}:{height}:force_original_aspect_ratio=increase:flags=lanczos,"
+        "scale=trunc(iw/2)*2:trunc(ih/2)*2"
+    )
+    run_ffmpeg([
+        "-i", str(src),
+        "-vf", scale,
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-crf", "18",
+        "-pix_fmt", "yuv420p",
+        "-an",
+        "-movflags", "+faststart",
+        str(dst),
+    ], duration=media_duration(src))
+
+
+class AssetServer:
+    """HTTP server on 127.0.0.1 serving registered files only.
+
+    Supports ``HEAD``, single byte-range requests (so ``<Video>`` can seek), ETags and
+    long-lived caching headers. Runs on a daemon thread.
+
+    Usage:
+        with AssetServer() as server:
+            url = server.add(Path("photo.jpg"))
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._files: dict[str, Path] = {}
+        self._httpd = ThreadingHTTPServer((host, port), _AssetHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.files = self._files
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add(self, path: Path) -> str:
+        """Register a file and return the URL it is served at."""
+        path = Path(path).resolve()
+        key = asset_key(path)
+        self._files[key] = path
+        return f"{self.base_url}/{key}/{quote(path.name)}"
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+            self._thread.start()
+            logger.debug("Asset server listening on %s", self.base_url)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self) -> None:
+        self._serve(body=False)
+
+    def do_GET(self) -> None:
+        self._serve(body=True)
+
+    def _serve(self, body: bool) -> None:
+        key = unquote(self.path.split("?", 1)[0]).lstrip("/").split("/", 1)[0]
+        path = self.server.files.get(key)
+        if path is None or not path.is_file():
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        etag = f'"{key}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._common_headers(etag, path)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", etag) == etag:
+            byte_range = parse_range(range_header, size)
+            if byte_range is None:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range != (0, size - 1):
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        length = end - start + 1
+        self.send_response(status)
+        self._common_headers(etag, path)
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if not body:
+            return
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = length
+            try:
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the browser stopped reading (seek or cancelled request)
+
+    def _common_headers(self, etag: str, path: Path) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(path.stat().st_mtime, usegmt=True))
+        self.send_header("Cache-Control", CACHE_CONTROL)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("asset server: " + format, *args)
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single ``bytes=`` range into inclusive offsets; None if unsatisfiable.
+
+    Multi-range requests are answered with the whole file.
+    """
+    if "," in header:
+        return (0, size - 1)
+    m = _RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    first, last = m.group(1), m.group(2)
+    if not first:
+        length = int(last)
+        if length == 0:
+            return None
+        return (max(0, size - length), size - 1)
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return (start, end)
+
+
+def resolve_local(source: str | None, base_dir: Path | None) -> Path | None:
+    """Local path for a spec ``source``, or None if it is remote or missing."""
+    if not source or source.startswith(REMOTE_PREFIXES):
+        return None
+    p = Path(source)
+    if not p.is_absolute() and base_dir:
+        p = base_dir / p
+    return p if p.is_file() else None
+
+
+@contextlib.contextmanager
+def serve_spec_assets(
+    spec: VideoSpec,
+    props: dict,
+    base_dir: Path | None = None,
+    cache_dir: Path | None = None,
+) -> Iterator[dict]:
+    """Serve the spec's local assets for the duration of the block.
+
+    Yields a copy of ``props`` whose scene sources point at the server. Remote
+    sources are left alone; if nothing is local, no server is started.
+    """
+    width, height = spec.video.resolution
+    local = {}
+    for i, scene in enumerate(spec.scenes):
+        if scene.type.value not in ("image", "video"):
+            continue
+        path = resolve_local(scene.source, base_dir)
+        if path is None:
+            if scene.source and not scene.source.startswith(REMOTE_PREFIXES):
+                logger.warning("Scene %s: asset not found: %s", scene.id or i, scene.source)
+            continue
+        local[i] = fit_asset(path, scene.type.value, width, height, cache_dir)
+
+    if not local:
+        yield props
+        return
+
+    props = copy.deepcopy(props)
+    with AssetServer() as server:
+        for i, path in local.items():
+            props["scenes"][i]["source"] = server.add(path)
+        logger.info("Serving %d asset(s) from %s", len(local), server.base_url)
+        yield props
+
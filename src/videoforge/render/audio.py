@@ -0,0 +1,119 @@
+"""Audio bed preparation - loops, trims, normalizes and caches BGM tracks."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+
+from ..schema import BGM
+from .ffmpeg import run_ffmpeg
+from .output import atomic_output
+
+logger = logging.getLogger(__name__)
+
+# EBU R128 loudness target for the BGM bed before the spec's volume is applied
+LOUDNESS_TARGET = "I=-16:TP=-1.5:LRA=11"
+BGM_SAMPLE_RATE = 48000
+BGM_BITRATE = "192k"
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def bgm_cache_key(source: Path, bgm: BGM, duration: float) -> str:
+    """Build the cache key for a prepared BGM bed.
+
+    Keyed by source content plus every parameter that affects the output samples,
+    so a renamed file still hits and an edited one misses.
+    """
+    parts = [
+        file_digest(source),
+        f"{duration:.3f}",
+        f"{bgm.volume:.4f}",
+        f"{bgm.fade_in:.3f}",
+        f"{bgm.fade_out:.3f}",
+        str(int(bgm.loop)),
+        LOUDNESS_TARGET,
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+
+
+def bgm_cache_path(source: Path, bgm: BGM, duration: float, cache_dir: Path) -> Path:
+    """Where the prepared bed for these inputs is cached."""
+    return Path(cache_dir) / "bgm" / f"{bgm_cache_key(source, bgm, duration)}.m4a"
+
+
+def build_bgm_filter(bgm: BGM, duration: float) -> str:
+    """Build the audio filter chain for a BGM bed of exactly ``duration`` seconds."""
+    filters = [f"loudnorm={LOUDNESS_TARGET}", f"aresample={BGM_SAMPLE_RATE}"]
+    if not bgm.loop:
+        # Pad short tracks with silence so the bed always spans the timeline
+        filters.append("apad")
+    filters.append(f"volume={bgm.volume}")
+    if bgm.fade_in > 0:
+        filters.append(f"afade=t=in:st=0:d={bgm.fade_in}")
+    if bgm.fade_out > 0:
+        fade_start = max(0, duration - bgm.fade_out)
+        filters.append(f"afade=t=out:st={fade_start}:d={bgm.fade_out}")
+    return ",".join(filters)
+
+
+def prepare_bgm(
+    source: Path,
+    bgm: BGM,
+    duration: float,
+    cache_dir: Path | None = None,
+    output_dir: Path | None = None,
+) -> Path:
+    """Produce a BGM bed that matches the timeline length exactly.
+
+    Looping (``-stream_loop``), trimming, loudness normalization, volume and fades
+    happen in a single FFmpeg pass. The bed is stored under ``cache_dir/bgm`` and
+    reused by later renders with the same inputs. The source's directory is never
+    written to.
+
+    Args:
+        source: Source audio file.
+        bgm: BGM settings from the spec.
+        duration: Timeline length in seconds.
+        cache_dir: Root cache directory. Defaults to the configured one.
+        output_dir: Write the bed here instead, without caching it.
+
+    Returns:
+        Path to an AAC (.m4a) file of ``duration`` seconds.
+    """
+    if output_dir is not None:
+        target = Path(output_dir) / f"bgm_{bgm_cache_key(source, bgm, duration)}.m4a"
+    else:
+        if cache_dir is None:
+            from ..config import Config
+
+            cache_dir = Config.load().cache_dir
+        target = bgm_cache_path(source, bgm, duration, cache_dir)
+        if target.exists():
+            logger.info("BGM cache hit: %s", target.name)
+            return target
+
+    args: list[str] = []
+    if bgm.loop:
+        args += ["-stream_loop", "-1"]
+    args += [
+        "-i", str(source),
+        "-vn",
+        "-af", build_bgm_filter(bgm, duration),
+        "-t", f"{duration:.3f}",
+        "-c:a", "aac",
+        "-b:a", BGM_BITRATE,
+    ]
+
+    with atomic_output(target) as partial:
+        run_ffmpeg(args + [str(partial)])
+    logger.info("Prepared BGM bed: %s (%.2fs)", target.name, duration)
+    return target
@@ -0,0 +1,281 @@
+"""Batch rendering - many specs through one task graph (``videoforge batch``).
+
+Every job's render tasks go into a single ``TaskGraph``, so the CPU and I/O pool
+sizes are global budgets for the whole batch rather than per render, and each FFmpeg
+process is limited to its share of the cores (cores / concurrent encodes). Jobs share
+the process's caches (spec cache, fitted assets, text layers, BGM beds) and
+identical scenes across jobs are rendered once (``engine.SceneClipCache``).
+
+A JSON ledger records each job's outcome as it finishes; rerunning the batch skips
+jobs that are done (same spec, output still present), so an interrupted night run
+picks up where it stopped. A failed job does not stop the others.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from ..config import Config
+from ..spec import load_spec
+from .engine import RenderEngine, SceneClipCache
+from .output import atomic_output
+from .scheduler import DEFAULT_IO_WORKERS, TaskGraph
+
+logger = logging.getLogger(__name__)
+
+LEDGER_VERSION = 1
+DEFAULT_LEDGER_NAME = ".videoforge_batch.json"
+
+
+@dataclass
+class BatchJob:
+    """A spec to render and where to write the video."""
+
+    id: str
+    spec_path: Path
+    output: Path
+
+
+@dataclass
+class JobReport:
+    """Outcome of one job of a batch."""
+
+    id: str
+    status: str  # done | failed | skipped (already done) | cancelled
+    output: str
+    seconds: float = 0.0  # wall time from the job's first task to its last
+    task_seconds: float = 0.0  # summed run time of its tasks
+    error: str = ""
+
+
+def jobs_from_specs(spec_paths: list[Path], output_dir: Path) -> list[BatchJob]:
+    """One job per spec file, written to ``output_dir/<spec name>.mp4``."""
+    jobs = []
+    for path in spec_paths:
+        path = Path(path)
+        jobs.append(BatchJob(path.stem, path, Path(output_dir) / f"{path.stem}.mp4"))
+    return _unique(jobs)
+
+
+def jobs_from_manifest(manifest: Path, output_dir: Path) -> list[BatchJob]:
+    """Jobs from a JSONL manifest: one ``{"spec": ..., "output": ..., "id": ...}`` per line.
+
+    ``output`` and ``id`` are optional; relative paths are relative to the manifest.
+    """
+    manifest = Path(manifest)
+    jobs = []
+    with open(manifest, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                spec = manifest.parent / entry["spec"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Invalid batch manifest line ({manifest.name}:{n}): {e}") from e
+            output = entry.get("output")
+            output = manifest.parent / output if output else Path(output_dir) / f"{spec.stem}.mp4"
+            jobs.append(BatchJob(str(entry.get("id") or spec.stem), spec, output))
+    return _unique(jobs)
+
+
+def _unique(jobs: list[BatchJob]) -> list[BatchJob]:
+    """Make job ids unique (``name``, ``name_2``, ...) and reject shared outputs."""
+    seen: dict[str, int] = {}
+    outputs: set[Path] = set()
+    for job in jobs:
+        job.id = job.id.replace("/", "_")  # "/" separates job and task in task ids
+        count = seen[job.id] = seen.get(job.id, 0) + 1
+        if count > 1:
+            job.id = f"{job.id}_{count}"
+        output = job.output.resolve()
+        if output in outputs:
+            raise ValueError(f"Two batch jobs write to {job.output}")
+        outputs.add(output)
+    return jobs
+
+
+class JobLedger:
+    """Per-job status of a batch, saved as JSON after every change."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.jobs: dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == LEDGER_VERSION:
+                    self.jobs = data.get("jobs", {})
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable batch ledger %s: %s", self.path, e)
+
+    def is_done(self, job: BatchJob, key: str) -> bool:
+        entry = self.jobs.get(job.id, {})
+        return entry.get("status") == "done" and entry.get("key") == key and job.output.exists()
+
+    def record(self, report: JobReport, key: str = "") -> None:
+        self.jobs[report.id] = {**asdict(report), "key": key, "finished_at": time.time()}
+        data = {"version": LEDGER_VERSION, "jobs": self.jobs}
+        with atomic_output(self.path) as partial:
+            partial.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def run_batch(
+    jobs: list[BatchJob],
+    config: Config | None = None,
+    hybrid: bool = False,
+    ledger: JobLedger | None = None,
+    workers: int | None = None,
+    io_workers: int = DEFAULT_IO_WORKERS,
+    cancel: threading.Event | None = None,
+) -> list[JobReport]:
+    """Render ``jobs`` through one task graph and return a report per job.
+
+    Args:
+        jobs: The jobs, in priority order.
+        config: Configuration (loaded if None).
+        hybrid: Render animated scenes with Remotion (as ``--engine hybrid``).
+        ledger: Records outcomes; jobs it lists as done are skipped.
+        workers: Concurrent encodes across all jobs (default: ``render_workers``);
+            each FFmpeg process gets ``cores / workers`` threads.
+        io_workers: Concurrent audio/asset/mux tasks across all jobs.
+        cancel: Set to stop the batch; unfinished jobs are reported as cancelled.
+    """
+    engine = RenderEngine(config, hybrid=hybrid)
+    reports: dict[str, JobReport] = {}
+    keys: dict[str, str] = {}
+    graph = TaskGraph()
+    final: dict[str, str] = {}  # last task id -> job id
+
+    with ExitStack() as stack:
+        tmp = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="videoforge_batch_")))
+        shared = SceneClipCache(tmp / "scenes")
+        stack.callback(shared.close)
+
+        for n, job in enumerate(jobs):
+            report = reports[job.id] = JobReport(job.id, "cancelled", str(job.output))
+            try:
+                spec = load_spec(job.spec_path)
+                base_dir = job.spec_path.parent
+                keys[job.id] = engine.render_key(spec, base_dir)
+                if ledger is not None and ledger.is_done(job, keys[job.id]):
+                    logger.info("Batch job %s already done; skipping", job.id)
+                    report.status = "skipped"
+                    continue
+                engine.check_fonts(spec.scenes)
+                job.output.parent.mkdir(parents=True, exist_ok=True)
+                job_tmp = tmp / "jobs" / str(n)
+                job_tmp.mkdir(parents=True)
+                prefix = f"{job.id}/"
+                mux = stack.enter_context(engine.render_tasks(
+                    graph, spec, job.output, job_tmp, base_dir, prefix=prefix, shared=shared
+                ))
+            # Parsers raise their own errors (YAML, msgpack); a bad spec must not stop the batch
+            except Exception as e:  # noqa: BLE001
+                logger.error("Batch job %s failed before rendering: %s", job.id, e)
+                report.status, report.error = "failed", str(e)
+                if ledger is not None:
+                    ledger.record(report, keys.get(job.id, ""))
+                continue
+
+            def finish(_, spec=spec, job=job, prefix=prefix, job_tmp=job_tmp) -> None:
+                engine.export_extras(spec, job.output)
+                shutil.rmtree(job_tmp, ignore_errors=True)
+                shared.release(prefix)
+
+            final[graph.add(f"{prefix}finish", finish, deps=[mux])] = job.id
+
+        if shared.hits:
+            logger.info("Batch: %d scene(s) shared between jobs", shared.hits)
+
+        def on_result(task_id: str, _) -> None:
+            job_id = final.get(task_id)
+            if job_id is None:
+                return
+            report = reports[job_id]
+            report.status = "done"
+            _time_job(graph, report)
+            logger.info("Batch job %s done in %.1fs", job_id, report.seconds)
+            if ledger is not None:
+                ledger.record(report, keys[job_id])
+
+        cpu_workers = workers or engine.config.render_workers
+        try:
+            graph.run(
+                cpu_workers,
+                io_workers=io_workers,
+                cancel=cancel,
+                on_result=on_result,
+                keep_going=True,
+                threads=max(1, (os.cpu_count() or 1) // cpu_workers),
+            )
+        finally:
+            for job_id, error in _failed_jobs(graph, reports).items():
+                report = reports[job_id]
+                report.status, report.error = "failed", error
+                _time_job(graph, report)
+                if ledger is not None:
+                    ledger.record(report, keys.get(job_id, ""))
+
+    return [reports[job.id] for job in jobs]
+
+
+def _failed_jobs(graph: TaskGraph, reports: dict[str, JobReport]) -> dict[str, str]:
+    """Unfinished jobs hit by a failed task (their own, or a scene shared with others)."""
+    dependents: dict[str, list[str]] = {t: [] for t in graph.tasks}
+    for task in graph.tasks.values():
+        for dep in task.deps:
+            dependents[dep].append(task.id)
+    failed: dict[str, str] = {}
+    for task_id, error in graph.failed.items():
+        stack, seen = [task_id], set()
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            job_id = _job_of(current, reports)
+            if job_id and reports[job_id].status == "cancelled":
+                failed.setdefault(job_id, f"{task_id}: {error}")
+            stack.extend(dependents[current])
+    return failed
+
+
+def _job_of(task_id: str, reports: dict[str, JobReport]) -> str | None:
+    job_id, sep, _ = task_id.rpartition("/")
+    return job_id if sep and job_id in reports else None
+
+
+def _time_job(graph: TaskGraph, report: JobReport) -> None:
+    prefix = f"{report.id}/"
+    tasks = [t for t in graph.tasks.values() if t.id.startswith(prefix) and t.started]
+    if tasks:
+        end = max(t.finished or t.started for t in tasks)
+        report.seconds = end - min(t.started for t in tasks)
+        report.task_seconds = sum(t.seconds for t in tasks)
+
+
+def format_report(reports: list[JobReport]) -> str:
+    """Summary table of a batch: one line per job, then totals."""
+    lines = [f"{'JOB':<28} {'STATUS':<10} {'WALL':>8} {'TASKS':>8}  OUTPUT"]
+    for r in reports:
+        lines.append(
+            f"{r.id[:28]:<28} {r.status:<10} {r.seconds:>7.1f}s {r.task_seconds:>7.1f}s  "
+            + (r.output if r.status != "failed" else f"ERROR: {r.error.splitlines()[0]}")
+        )
+    counts = {s: sum(r.status == s for r in reports) for s in ("done", "skipped", "failed")}
+    lines.append(
+        f"{len(reports)} job(s): {counts['done']} done, {counts['skipped']} skipped, "
+        f"{counts['failed']} failed, "
+        f"{len(reports) - sum(counts.values())} cancelled"
+    )
+    return "\n".join(lines)
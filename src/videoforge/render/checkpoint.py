@@ -0,0 +1,136 @@
+"""Persistent work directories for resumable renders.
+
+A resumable render keeps its intermediates (scene clips, transition runs) in a work
+directory instead of a temporary one, and records each finished task in
+``manifest.json`` there. A rerun of the same spec to the same output loads the
+manifest and skips every task whose files are still on disk; a changed spec starts
+over in a clean directory. A directory is only ever emptied if it holds a manifest
+(written as soon as the work directory is set up), so pointing a render at a
+directory of other files fails instead of deleting them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Any
+
+from .output import atomic_output
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def default_work_dir(output_path: Path, cache_dir: Path) -> Path:
+    """Work directory for a render to ``output_path``: one per output file."""
+    key = hashlib.sha256(str(Path(output_path).resolve()).encode()).hexdigest()[:16]
+    return cache_dir / "work" / key
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Path):
+        return {"path": str(value)}
+    if isinstance(value, dict):
+        return {"dict": {k: _encode(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "path" in value:
+            return Path(value["path"])
+        return {k: _decode(v) for k, v in value["dict"].items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _files(value: Any) -> list[Path]:
+    if isinstance(value, Path):
+        return [value]
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [p for v in value for p in _files(v)]
+    return []
+
+
+class RenderManifest:
+    """Finished tasks of a render and their results, kept in its work directory.
+
+    Results may be paths, JSON scalars, lists and dicts of those. A task counts as
+    done only while every file in its result still exists.
+    """
+
+    def __init__(self, work_dir: Path, key: str):
+        self.work_dir = Path(work_dir)
+        self.key = key
+        self.path = self.work_dir / MANIFEST_NAME
+        self._tasks: dict[str, Any] = {}
+
+    @classmethod
+    def open(cls, work_dir: Path, key: str, resume: bool = True) -> RenderManifest:
+        """Load the manifest in ``work_dir``, or start a fresh, empty work directory.
+
+        The old contents are discarded when ``resume`` is false or when they belong
+        to a different render (``key`` differs).
+
+        Raises:
+            ValueError: ``work_dir`` holds files but no render manifest.
+        """
+        manifest = cls(work_dir, key)
+        data = None
+        if resume and manifest.path.exists():
+            try:
+                data = json.loads(manifest.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable render manifest %s: %s", manifest.path, e)
+        if data and data.get("version") == MANIFEST_VERSION and data.get("key") == key:
+            manifest._tasks = data.get("tasks", {})
+            logger.info("Resuming render: %d task(s) already done", len(manifest._tasks))
+        else:
+            manifest._reset()
+        return manifest
+
+    def _reset(self) -> None:
+        """Empty the work directory (only if it is one) and write an empty manifest."""
+        if self.work_dir.is_dir() and any(self.work_dir.iterdir()):
+            if not self.path.is_file():
+                raise ValueError(
+                    f"{self.work_dir} is not a videoforge work directory "
+                    f"(no {MANIFEST_NAME}); refusing to delete its contents"
+                )
+            shutil.rmtree(self.work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._tasks = {}
+        self._save()
+
+    def completed(self) -> dict[str, Any]:
+        """Results of the recorded tasks whose files are all still present."""
+        done = {}
+        for task_id, value in self._tasks.items():
+            result = _decode(value)
+            if all(p.exists() for p in _files(result)):
+                done[task_id] = result
+        return done
+
+    def record(self, task_id: str, result: Any) -> None:
+        """Mark ``task_id`` done with ``result`` and save the manifest."""
+        self._tasks[task_id] = _encode(result)
+        self._save()
+
+    def _save(self) -> None:
+        data = {"version": MANIFEST_VERSION, "key": self.key, "tasks": self._tasks}
+        with atomic_output(self.path) as partial:
+            partial.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    def remove(self) -> None:
+        """Delete the work directory (after a successful render)."""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
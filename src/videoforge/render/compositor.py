@@ -5,12 +5,15 @@ from __future__ import annotations
 import logging
 from pathlib import Path
 
-from ..schema import Scene, TextOverlay
+from ..schema import Animation, Scene, TextOverlay
+from .animation import typewriter_steps
 from .ffmpeg import (
     add_text_overlay,
     create_color_video,
     create_image_video,
 )
+from .fonts import FontFace, missing_glyphs, resolve_font
+from .text_layer import TextLayer, composite_layers, rasterize_overlay
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +27,7 @@ def render_scene(
     base_dir: Path | None = None,
     default_font: str = "Yu Gothic",
     default_font_path: str = "",
+    cache_dir: Path | None = None,
 ) -> Path:
     """Render a single scene to a video clip.
 
@@ -36,6 +40,7 @@ def render_scene(
         base_dir: Base directory for resolving relative asset paths.
         default_font: Default font family name.
         default_font_path: Default font file path.
+        cache_dir: Root cache directory for rasterized text layers.
 
     Returns:
         Path to the rendered scene clip.
@@ -82,25 +87,110 @@ def render_scene(
     else:
         raise ValueError(f"Unknown scene type: {scene.type}")
 
-    # Step 2: Apply text overlays sequentially
+    if not scene.text_overlays:
+        return base_clip
+
+    # Step 2: Composite pre-rasterized text layers in a single pass
+    layers = _rasterize_overlays(
+        scene.text_overlays, default_font, default_font_path, cache_dir
+    )
+    if layers is not None:
+        return composite_layers(
+            base_clip, output_dir / f"{scene_id}_text.mp4", layers, scene.duration, fps
+        )
+
+    # Fallback (no font file found): drawtext, one pass per overlay
     current = base_clip
     for i, overlay in enumerate(scene.text_overlays):
         next_clip = output_dir / f"{scene_id}_text{i}.mp4"
         current = _apply_overlay(
-            current, next_clip, overlay, default_font, default_font_path
+            current, next_clip, overlay, default_font, default_font_path, scene.duration
         )
 
     return current
 
 
+def _rasterize_overlays(
+    overlays: list[TextOverlay],
+    default_font: str,
+    default_font_path: str,
+    cache_dir: Path | None,
+) -> list[TextLayer] | None:
+    """Rasterize every overlay, or return None if any font cannot be loaded.
+
+    A typewriter overlay becomes one layer per revealed prefix, each shown in its
+    own time window.
+    """
+    layers = []
+    for overlay in overlays:
+        face = overlay_font(overlay, default_font, default_font_path)
+        if face is None:
+            logger.debug("No font file for %r; using drawtext.", overlay.font or default_font)
+            return None
+        try:
+            for part in overlay_parts(overlay):
+                layers.append(rasterize_overlay(part, Path(face.path), cache_dir, face.index))
+        except OSError as e:
+            logger.warning("Could not rasterize with %s (%s); using drawtext.", face.path, e)
+            return None
+    return layers
+
+
+def overlay_parts(overlay: TextOverlay) -> list[TextOverlay]:
+    """The static overlays drawn for ``overlay``: one per typewriter prefix, else itself."""
+    if overlay.animation != Animation.TYPEWRITER:
+        return [overlay]
+    return [
+        overlay.model_copy(update={
+            "content": prefix, "start": shown_from, "end": shown_until,
+            "animation": Animation.NONE,
+        })
+        for prefix, shown_from, shown_until in typewriter_steps(
+            overlay.content, overlay.start, overlay.end
+        )
+    ]
+
+
+def overlay_font(
+    overlay: TextOverlay, default_font: str, default_font_path: str
+) -> FontFace | None:
+    """The installed face an overlay will be drawn with, if any."""
+    font = overlay.font or default_font
+    return resolve_font(font, default_font_path if font == default_font else None)
+
+
+def check_overlay_fonts(
+    scenes: list[Scene], default_font: str, default_font_path: str
+) -> list[str]:
+    """List overlays whose font lacks glyphs for their text, one message each.
+
+    Run before rendering so a missing glyph fails fast instead of as tofu boxes in
+    the output. Fonts that are not installed are left to drawtext's fontconfig.
+    """
+    problems = []
+    for i, scene in enumerate(scenes):
+        for overlay in scene.text_overlays:
+            face = overlay_font(overlay, default_font, default_font_path)
+            if face is None:
+                continue
+            missing = missing_glyphs(face.path, overlay.content, face.index)
+            if missing:
+                problems.append(
+                    f"Scene {scene.id or i}: font {face.family!r} has no glyph for "
+                    f"{''.join(missing[:10])!r} in {overlay.content[:30]!r}"
+                )
+    return problems
+
+
 def _apply_overlay(
     input_path: Path,
     output_path: Path,
     overlay: TextOverlay,
     default_font: str,
     default_font_path: str,
+    duration: float,
 ) -> Path:
-    """Apply a single text overlay to a video clip."""
+    """Apply a single text overlay (with its animation) to a video clip."""
     font = overlay.font or default_font
     font_path = default_font_path if font == default_font else None
 
@@ -118,6 +208,8 @@ def _apply_overlay(
         start=overlay.start,
         end=overlay.end,
         font_path=font_path,
+        animation=overlay.animation.value,
+        duration=duration,
     )
 
 
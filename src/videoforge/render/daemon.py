@@ -0,0 +1,427 @@
+"""Render daemon - ``videoforge serve``.
+
+Keeps one process warm (imports, configuration, font index, FFmpeg lookup, caches)
+and renders ``VideoSpec`` JSON jobs submitted over HTTP on localhost or on a Unix
+socket. Jobs are queued and run by a fixed number of runner threads; each render
+still uses its own CPU and I/O pools (``VIDEOFORGE_RENDER_WORKERS``).
+
+API (JSON unless noted):
+
+- ``POST /jobs`` - body: a VideoSpec, or ``{"spec": {...}, "output": "name.mp4"}``.
+  Answers ``202`` with the job's status. ``output`` is relative to the output dir.
+- ``GET /jobs`` - status of every job.
+- ``GET /jobs/<id>`` - status of one job.
+- ``GET /jobs/<id>/events`` - progress events as NDJSON, streamed until the job ends.
+- ``POST /jobs/<id>/cancel`` (or ``DELETE /jobs/<id>``) - cancel a queued or running job.
+- ``GET /jobs/<id>/result`` - the rendered video (``409`` until the job is done).
+- ``GET /health``
+
+``POST`` requests must be sent as ``Content-Type: application/json`` and, over
+HTTP, with a ``Host`` of ``localhost`` or the listening address, so web pages open
+in a browser on the same machine cannot submit or cancel jobs (no CSRF, no DNS
+rebinding). Finished jobs are forgotten after ``JOB_RETENTION`` seconds, or
+sooner once more than ``MAX_FINISHED_JOBS`` have piled up; their files stay.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import os
+import queue
+import socketserver
+import stat
+import threading
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Self
+
+from pydantic import ValidationError
+
+from ..config import Config
+from ..schema import VideoSpec
+from .engine import RenderEngine
+from .jobs import RenderCancelled
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+CHUNK_SIZE = 1 << 16
+MAX_SPEC_BYTES = 64 << 20
+FINAL_STATES = ("done", "failed", "cancelled")
+JOB_RETENTION = 24 * 3600.0  # seconds a finished job (and its events) is kept
+MAX_FINISHED_JOBS = 1000
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+@dataclass
+class DaemonJob:
+    """A submitted render and its progress events."""
+
+    id: str
+    spec: VideoSpec
+    output: Path
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    error: str = ""
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    progress: tuple[int, int] = (0, 0)
+    events: list[dict] = field(default_factory=list)
+    cancel: threading.Event = field(default_factory=threading.Event)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.spec.video.title,
+            "status": self.status,
+            "output": str(self.output),
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": {"done": self.progress[0], "total": self.progress[1]},
+        }
+
+
+class RenderDaemon:
+    """Job queue and runner threads around one warm ``RenderEngine``.
+
+    Usage:
+        with RenderDaemon() as daemon:
+            job = daemon.submit(spec)
+    """
+
+    def __init__(
+        self,
+        config: Config | None = None,
+        hybrid: bool = False,
+        runners: int = 1,
+        retention: float = JOB_RETENTION,
+        max_finished: int = MAX_FINISHED_JOBS,
+    ):
+        self.engine = RenderEngine(config, hybrid=hybrid)
+        self.config = self.engine.config
+        self.retention = retention
+        self.max_finished = max_finished
+        self.jobs: dict[str, DaemonJob] = {}
+        self._queue: queue.Queue[DaemonJob | None] = queue.Queue()
+        self._changed = threading.Condition()
+        self._ids = itertools.count(1)
+        self._runners = [
+            threading.Thread(target=self._run, name=f"videoforge-job-{i}", daemon=True)
+            for i in range(max(1, runners))
+        ]
+
+    def warm_up(self) -> None:
+        """Load what every render needs once: FFmpeg's location and the font index."""
+        from .ffmpeg import find_ffmpeg
+        from .fonts import get_font_index
+
+        try:
+            find_ffmpeg()
+        except RuntimeError as e:
+            logger.warning("%s", e)
+        get_font_index()
+
+    def start(self) -> None:
+        for runner in self._runners:
+            runner.start()
+
+    def close(self) -> None:
+        """Cancel every unfinished job and stop the runners."""
+        for job in list(self.jobs.values()):
+            self.cancel(job.id)
+        for _ in self._runners:
+            self._queue.put(None)
+        for runner in self._runners:
+            if runner.is_alive():
+                runner.join()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def submit(self, spec: VideoSpec, output: str | None = None) -> DaemonJob:
+        """Queue ``spec``; ``output`` is a file name (or relative path) in the output dir."""
+        job_id = f"{next(self._ids):04d}-{os.urandom(3).hex()}"
+        out_dir = Path(self.config.output_dir).resolve()
+        output_path = (out_dir / (output or f"{job_id}.mp4")).resolve()
+        if not output_path.is_relative_to(out_dir):
+            raise ValueError(f"Output must be inside {out_dir}: {output}")
+        job = DaemonJob(job_id, spec, output_path)
+        self._prune()
+        with self._changed:
+            self.jobs[job_id] = job
+        self._event(job, "queued")
+        self._queue.put(job)
+        return job
+
+    def cancel(self, job_id: str) -> DaemonJob:
+        job = self.jobs[job_id]
+        with self._changed:  # a runner may be picking the job up right now
+            job.cancel.set()
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.finished = time.time()
+                self._event(job, "cancelled")
+        return job
+
+    def events(self, job_id: str, timeout: float | None = None):
+        """Yield the job's events, old and new, until it reaches a final state."""
+        job = self.jobs[job_id]
+        sent = 0
+        while True:
+            with self._changed:
+                self._changed.wait_for(
+                    lambda sent=sent: len(job.events) > sent or job.status in FINAL_STATES,
+                    timeout,
+                )
+                new = job.events[sent:]
+                final = job.status in FINAL_STATES
+            yield from new
+            sent += len(new)
+            if final and sent == len(job.events):
+                return
+
+    def _prune(self) -> None:
+        """Forget finished jobs past the retention time or beyond the newest ``max_finished``."""
+        cutoff = time.time() - self.retention
+        with self._changed:
+            finished = sorted(
+                (j for j in self.jobs.values() if j.status in FINAL_STATES and j.finished),
+                key=lambda j: j.finished,
+                reverse=True,
+            )
+            for n, job in enumerate(finished):
+                if n >= self.max_finished or job.finished < cutoff:
+                    del self.jobs[job.id]
+
+    def _event(self, job: DaemonJob, event: str, **data) -> None:
+        with self._changed:
+            job.events.append({"event": event, "job": job.id, "time": time.time(), **data})
+            self._changed.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._changed:
+                if job.cancel.is_set():
+                    continue
+                job.status, job.started = "running", time.time()
+                self._event(job, "started")
+
+            def progress(task_id: str, done: int, total: int, job=job) -> None:
+                job.progress = (done, total)
+                self._event(job, "progress", task=task_id, done=done, total=total)
+
+            try:
+                self.engine.render(
+                    job.spec, job.output, cancel=job.cancel, on_progress=progress
+                )
+                job.status = "done"
+            except RenderCancelled:
+                job.status = "cancelled"
+            except Exception as e:  # report any failure to the client; keep serving
+                logger.exception("Job %s failed", job.id)
+                job.status, job.error = "failed", str(e)
+            job.finished = time.time()
+            self._event(job, job.status, **({"error": job.error} if job.error else {}))
+            self._prune()
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _HTTPServer | _UnixHTTPServer
+
+    def do_GET(self) -> None:
+        parts = self._route()
+        daemon = self.server.daemon
+        if parts == ["health"]:
+            self._json({"status": "ok", "jobs": len(daemon.jobs)})
+        elif parts == ["jobs"]:
+            self._json([job.to_dict() for job in list(daemon.jobs.values())])
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job(parts[1])
+            if job:
+                self._json(job.to_dict())
+        elif len(parts) == 3 and parts[2] == "events":
+            if self._job(parts[1]):
+                self._stream_events(parts[1])
+        elif len(parts) == 3 and parts[2] == "result":
+            job = self._job(parts[1])
+            if job:
+                self._send_result(job)
+        else:
+            self._error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def do_POST(self) -> None:
+        parts = self._route()
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            self.close_connection = True  # the body, if any, is left unread
+            self._error(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Send Content-Type: application/json")
+        elif parts == ["jobs"]:
+            self._submit()
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            self._cancel(parts[1])
+        else:
+            self._error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def do_DELETE(self) -> None:
+        parts = self._route()
+        if len(parts) == 2 and parts[0] == "jobs":
+            self._cancel(parts[1])
+        else:
+            self._error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def parse_request(self) -> bool:
+        if not super().parse_request():
+            return False
+        if not self.server.allows_host(self.headers.get("Host", "")):
+            self.close_connection = True
+            self._error(HTTPStatus.FORBIDDEN, "Host not allowed")
+            return False
+        return True
+
+    def _route(self) -> list[str]:
+        return [p for p in self.path.split("?", 1)[0].split("/") if p]
+
+    def _job(self, job_id: str) -> DaemonJob | None:
+        job = self.server.daemon.jobs.get(job_id)
+        if job is None:
+            self._error(HTTPStatus.NOT_FOUND, f"No job {job_id}")
+        return job
+
+    def _submit(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not 0 < length <= MAX_SPEC_BYTES:
+            self.close_connection = True  # the body is left unread
+            self._error(HTTPStatus.BAD_REQUEST, "Send the spec as a JSON body")
+            return
+        try:
+            body = json.loads(self.rfile.read(length))
+            output = None
+            if isinstance(body, dict) and "spec" in body:
+                body, output = body["spec"], body.get("output")
+            job = self.server.daemon.submit(VideoSpec.model_validate(body), output)
+        except (ValueError, ValidationError) as e:
+            self._error(HTTPStatus.BAD_REQUEST, f"Invalid job: {e}")
+            return
+        self._json(job.to_dict(), HTTPStatus.ACCEPTED)
+
+    def _cancel(self, job_id: str) -> None:
+        if self._job(job_id):
+            self._json(self.server.daemon.cancel(job_id).to_dict())
+
+    def _stream_events(self, job_id: str) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for event in self.server.daemon.events(job_id):
+                self.wfile.write(json.dumps(event, ensure_ascii=False).encode() + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped listening; the job goes on
+
+    def _send_result(self, job: DaemonJob) -> None:
+        if job.status != "done" or not job.output.is_file():
+            self._error(HTTPStatus.CONFLICT, f"Job {job.id} is {job.status}")
+            return
+        size = job.output.stat().st_size
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(size))
+        self.send_header(
+            "Content-Disposition", f'attachment; filename="{job.output.name}"'
+        )
+        self.end_headers()
+        with open(job.output, "rb") as f:
+            try:
+                while chunk := f.read(CHUNK_SIZE):
+                    self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    def _json(self, data, status: HTTPStatus = HTTPStatus.OK) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._json({"error": message}, status)
+
+    def address_string(self) -> str:
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("daemon: " + format, *args)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], daemon: RenderDaemon):
+        super().__init__(address, _DaemonHandler)
+        self.daemon = daemon
+        self.hosts = {*LOCAL_HOSTS, address[0]}
+
+    def allows_host(self, host: str) -> bool:
+        """Whether a request's Host header names this machine (port ignored)."""
+        if host.startswith("["):  # [::1]:8765
+            name = host[1:].partition("]")[0]
+        else:
+            name = host.partition(":")[0]
+        return name.lower() in self.hosts
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, daemon: RenderDaemon):
+        super().__init__(str(path), _DaemonHandler)
+        self.daemon = daemon
+
+    def allows_host(self, host: str) -> bool:
+        return True  # only local processes can reach the socket
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)  # only the daemon's user may submit jobs
+
+
+def make_server(
+    daemon: RenderDaemon,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    socket_path: Path | None = None,
+) -> _HTTPServer | _UnixHTTPServer:
+    """HTTP server for ``daemon`` on ``host:port``, or on the Unix socket ``socket_path``."""
+    if socket_path is not None:
+        socket_path = Path(socket_path)
+        try:
+            mode = socket_path.lstat().st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise ValueError(f"Not a socket, refusing to replace it: {socket_path}")
+            socket_path.unlink()  # stale socket from a previous run
+        return _UnixHTTPServer(socket_path, daemon)
+    return _HTTPServer((host, port), daemon)
@@ -2,45 +2,440 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import shutil
 import tempfile
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 from ..config import Config
-from ..schema import VideoSpec
-from .compositor import render_scene
-from .ffmpeg import add_audio_to_video, concat_videos
+from ..export.chunked import encode_chunked
+from ..export.fanout import export_platforms
+from ..export.ladder import package_abr
+from ..schema import Animation, ExportCodec, Scene, SpecHeader, TransitionType, VideoSpec
+from ..timeline import Timeline
+from .asset_server import fit_asset, resolve_local
+from .audio import prepare_bgm
+from .checkpoint import RenderManifest, default_work_dir
+from .compositor import check_overlay_fonts, render_scene
+from .ffmpeg import mux_final
+from .output import atomic_output
+from .remotion import is_remotion_installed, render_with_remotion
+from .remotion_worker import RemotionWorker
+from .scheduler import TaskGraph
+from .subtitles import (
+    SUBTITLE_MODES,
+    Cue,
+    burn_subtitles,
+    mux_subtitles,
+    narration_cues,
+    overlay_cues,
+    write_subtitles,
+)
 from .transitions import apply_xfade
 
 logger = logging.getLogger(__name__)
 
 
+def scene_engine(scene: Scene) -> str:
+    """Engine for ``scene`` in hybrid mode.
+
+    FFmpeg draws static overlays just as well and far faster, so only scenes with an
+    animated overlay need the browser renderer.
+    """
+    if any(overlay.animation != Animation.NONE for overlay in scene.text_overlays):
+        return "remotion"
+    return "ffmpeg"
+
+
+def _without_overlays(spec: VideoSpec) -> VideoSpec:
+    """Copy of ``spec`` whose scenes carry no text overlays (they go to subtitles)."""
+    scenes = [scene.model_copy(update={"text_overlays": []}) for scene in spec.scenes]
+    return spec.model_copy(update={"scenes": scenes})
+
+
+class _ClipJoiner:
+    """Joins scene clips in order as they are rendered, applying the timeline's transitions.
+
+    Each joined clip covers a run of scenes merged by xfade; a failed transition
+    starts a new run (hard cut). Offsets are relative to the run's first scene.
+    """
+
+    def __init__(self, timeline: Timeline, tmp: Path):
+        self.timeline = timeline
+        self.tmp = tmp
+        self.clips: list[Path] = []
+        self._count = 0
+        self._origin = 0.0  # timeline start of the scene heading clips[-1]
+        self._closed = 0.0  # length of the runs before clips[-1]
+
+    def add(self, clip: Path) -> None:
+        """Append the clip of the next scene (already in ``timeline``)."""
+        timeline = self.timeline
+        i = self._count
+        self._count += 1
+        transition = timeline.transitions[i]
+        if transition is not None:
+            transition_type, duration = transition
+            offset = timeline.starts[i] - self._origin
+            merged = self.tmp / f"transition_{i}.mp4"
+            try:
+                apply_xfade(self.clips[-1], clip, merged, transition_type, duration, offset)
+                self.clips[-1] = merged
+                return
+            except RuntimeError:
+                logger.warning("Transition failed for scene %d, using hard cut.", i)
+        if i > 0:
+            self._closed += timeline.ends[i - 1] - self._origin
+        self._origin = timeline.starts[i]
+        self.clips.append(clip)
+
+    def state(self) -> dict:
+        """Progress so far, for ``restore`` in a resumed render."""
+        return {
+            "clips": list(self.clips),
+            "count": self._count,
+            "origin": self._origin,
+            "closed": self._closed,
+        }
+
+    def restore(self, state: dict) -> None:
+        self.clips = list(state["clips"])
+        self._count = state["count"]
+        self._origin = state["origin"]
+        self._closed = state["closed"]
+
+    @property
+    def duration(self) -> float:
+        """Length of the joined clips, after transition overlaps."""
+        if self._count == 0:
+            return 0.0
+        return self._closed + self.timeline.ends[self._count - 1] - self._origin
+
+
+class SceneClipCache:
+    """Scene clips shared by several renders in one task graph (``videoforge batch``).
+
+    Scenes that render identically (same content, video settings, asset directory
+    and engine) get one task and one clip, kept under ``root`` until every render
+    using it has called ``release``. Animated scenes share one Remotion ``worker``.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.tasks: dict[str, str] = {}  # scene key -> task id
+        self.worker: RemotionWorker | None = None
+        self.hits = 0
+        self._users: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(spec: VideoSpec, scene: Scene, engine: str, base_dir: Path | None) -> str:
+        h = hashlib.sha256(scene.model_dump_json(exclude={"id"}).encode())
+        for part in (spec.video.model_dump_json(), engine, base_dir and Path(base_dir).resolve()):
+            h.update(f"\0{part}".encode())
+        return h.hexdigest()[:24]
+
+    def use(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._users.setdefault(key, set()).add(owner)
+
+    def release(self, owner: str) -> None:
+        """Drop ``owner``'s claims and delete the clips no render needs any more."""
+        with self._lock:
+            for key, users in list(self._users.items()):
+                users.discard(owner)
+                if not users:
+                    del self._users[key]
+                    shutil.rmtree(self.root / key, ignore_errors=True)
+
+    def close(self) -> None:
+        if self.worker is not None:
+            self.worker.close()
+
+
 class RenderEngine:
     """Orchestrates the full video rendering pipeline.
 
-    Pipeline: VideoSpec → scene clips → transitions → concat → audio mix → export
+    Pipeline: VideoSpec → scene clips → transitions → concat + audio mix → export
+
+    In hybrid mode each scene picks its own engine (see ``scene_engine``): animated
+    scenes are rendered by Remotion, everything else by FFmpeg, and the clips meet
+    again at the transition step.
     """
 
-    def __init__(self, config: Config | None = None):
+    def __init__(self, config: Config | None = None, hybrid: bool = False):
         self.config = config or Config.load()
+        self.hybrid = hybrid
 
     def render(
         self,
         spec: VideoSpec,
         output_path: Path | None = None,
         base_dir: Path | None = None,
+        cancel: threading.Event | None = None,
+        resume: bool = False,
+        work_dir: Path | None = None,
+        on_progress: Callable[[str, int, int], None] | None = None,
+        timings: dict[str, float] | None = None,
     ) -> Path:
         """Render a complete video from a VideoSpec.
 
+        Steps 1-5 run as one task graph (see ``scheduler.TaskGraph``): scene encodes
+        on the CPU pool, each transition as soon as the clips on both sides of it
+        exist, and narration and the BGM bed on the I/O pool alongside the encodes.
+
+        With ``resume``, intermediates are kept in a persistent work directory with
+        a manifest of finished tasks (see ``checkpoint.RenderManifest``); rerunning
+        the same spec to the same output after a failure skips the finished tasks.
+        The work directory is removed once the video is saved.
+
         Args:
             spec: The video specification.
             output_path: Where to save the final video. Auto-generated if None.
             base_dir: Base directory for resolving relative asset paths.
+            cancel: Set to stop the render; raises ``RenderCancelled``.
+            resume: Checkpoint into a work directory and continue from it.
+            work_dir: Work directory owned by this render (its contents are
+                replaced when they belong to another render). Defaults to one
+                under the cache directory, per output file.
+            on_progress: Called with each finished task's id, the number of tasks
+                done and the total (e.g. ``scene:3``, 7, 12).
+            timings: Filled with the wall seconds of each task run (by task id), e.g.
+                for ``plan.record_timings``.
+
+        Returns:
+            Path to the rendered video file.
+        """
+        output_path = self._prepare_output(spec, output_path)
+
+        # Fail before any encoding if an overlay's font cannot draw its text
+        self.check_fonts(spec.scenes)
+
+        manifest = None
+        if resume or work_dir is not None:
+            manifest = RenderManifest.open(
+                work_dir or default_work_dir(output_path, self.config.cache_dir),
+                self.render_key(spec, base_dir),
+                resume=resume,
+            )
+
+        with self._work_dir(manifest) as tmp:
+            graph = TaskGraph()
+            done = manifest.completed() if manifest else {}
+            with self.render_tasks(graph, spec, output_path, tmp, base_dir, done=done):
+                finished = len(done.keys() & graph.tasks.keys())
+
+                def on_result(task_id: str, result) -> None:
+                    nonlocal finished
+                    finished += 1
+                    if manifest:
+                        manifest.record(task_id, result)
+                    if on_progress:
+                        on_progress(task_id, finished, len(graph.tasks))
+
+                graph.run(
+                    self.config.render_workers, cancel=cancel, done=done, on_result=on_result
+                )
+                if timings is not None:
+                    timings.update(
+                        {t.id: t.seconds for t in graph.tasks.values() if t.id not in done}
+                    )
+
+        if manifest:
+            manifest.remove()
+        self.export_extras(spec, output_path)
+        return output_path
+
+    def plan_tasks(
+        self, spec: VideoSpec, base_dir: Path | None = None
+    ) -> tuple[TaskGraph, list[str]]:
+        """Build the task graph ``render`` would run for ``spec``, without running it.
+
+        Returns the graph (its last task is the final mux) and the engine of each
+        scene. Nothing is written or started and ``spec`` is left as it is; the
+        tasks are only for inspection (see ``plan.build_plan``) and must not be run.
+        """
+        engines = self._scene_engines(spec)
+        graph = TaskGraph()
+        work = Path(tempfile.gettempdir()) / "videoforge_plan"  # never created
+        with self.render_tasks(
+            graph, spec, work / "plan.mp4", work, base_dir, engines=engines, dry_run=True
+        ):
+            pass
+        return graph, engines
+
+    @contextmanager
+    def render_tasks(
+        self,
+        graph: TaskGraph,
+        spec: VideoSpec,
+        output_path: Path,
+        tmp: Path,
+        base_dir: Path | None,
+        done: dict | None = None,
+        prefix: str = "",
+        shared: SceneClipCache | None = None,
+        engines: list[str] | None = None,
+        dry_run: bool = False,
+    ) -> Iterator[str]:
+        """Add Steps 1-5 of rendering ``spec`` to ``graph``; yield the final task's id.
+
+        Task ids start with ``prefix``, so several renders can share one graph (see
+        ``render.batch``); ``shared`` lets them share identical scene clips. ``done``
+        holds results of a resumed render. The graph must be run inside the block,
+        unless ``dry_run`` (no Remotion worker is set up; see ``plan_tasks``).
+        ``engines`` are the scenes' engines, if already chosen.
+        """
+        done = done or {}
+
+        # Step 1: Render individual scenes (without telops when they become captions)
+        captions = self._caption_mode(spec)
+        scene_spec = _without_overlays(spec) if captions else spec
+        with self._scene_tasks(
+            graph, scene_spec, tmp, base_dir, prefix, shared, engines, dry_run
+        ) as scene_tasks:
+            # Step 2: Join each clip onto the previous ones, applying its transition
+            joiner = _ClipJoiner(spec.timeline, tmp)
+            joined = None
+            for i, scene_task in enumerate(scene_tasks):
+                deps = [joined, scene_task] if joined else [scene_task]
+
+                def join(*clips: Path) -> dict:
+                    joiner.add(clips[-1])
+                    return joiner.state()
+
+                joined = graph.add(f"{prefix}join:{i}", join, deps=deps)
+                if joined in done:
+                    joiner.restore(done[joined])  # later joins continue from here
+
+            # Steps 3-4: Narration and BGM bed, sized from the planned timeline
+            graph.add(
+                f"{prefix}narration", lambda: self._narration(spec, tmp, base_dir), pool="io"
+            )
+            graph.add(
+                f"{prefix}bgm", lambda: self._prepare_bgm(spec, spec.timeline.duration, base_dir),
+                pool="io", retries=1,
+            )
+
+            # Step 5: Concat + audio + subtitles once everything above is done
+            def mux(_joined, _narration, bgm_bed: Path | None) -> None:
+                if bgm_bed and abs(joiner.duration - spec.timeline.duration) > 1e-3:
+                    # A transition fell back to a hard cut: the video got longer
+                    bgm_bed = self._prepare_bgm(spec, joiner.duration, base_dir)
+                self._mux_output(spec, joiner.clips, bgm_bed, tmp, output_path, joiner.duration)
+
+            deps = [joined, f"{prefix}narration", f"{prefix}bgm"]
+            yield graph.add(f"{prefix}mux", mux, deps=deps)
+
+    def render_stream(
+        self,
+        header: SpecHeader,
+        scenes: Iterable[Scene],
+        output_path: Path | None = None,
+        base_dir: Path | None = None,
+    ) -> Path:
+        """Render a video whose scenes arrive one at a time (see ``spec.stream_spec``).
+
+        Each scene is validated, rendered and joined onto the previous one as soon as
+        it is read, so memory stays flat and encoding starts while the producer is
+        still writing later scenes. Only per-scene timing (and caption cues) is kept.
+
+        Args:
+            header: Video, audio and export settings.
+            scenes: The scenes, in order; typically a lazy iterator.
+            output_path: Where to save the final video. Auto-generated if None.
+            base_dir: Base directory for resolving relative asset paths.
 
         Returns:
             Path to the rendered video file.
         """
+        spec = VideoSpec(**dict(header))  # settings only; scenes are not collected
+        output_path = self._prepare_output(spec, output_path)
+        captions = self._caption_mode(spec)
+        timeline = Timeline(fps=spec.video.fps)
+        cues: list[Cue] = []
+
+        with tempfile.TemporaryDirectory(prefix="videoforge_") as tmpdir:
+            tmp = Path(tmpdir)
+            joiner = _ClipJoiner(timeline, tmp)
+
+            # Steps 1-2: render each scene as it arrives and join it onto the timeline
+            def checked(scenes: Iterable[Scene]) -> Iterator[Scene]:
+                for i, scene in enumerate(scenes):
+                    if not scene.id:
+                        scene.id = f"scene_{i}"
+                    self.check_fonts([scene])
+                    start = timeline.starts[timeline.append(scene)]
+                    if captions:
+                        cues.extend(overlay_cues(scene, start))
+                        scene = scene.model_copy(update={"text_overlays": []})
+                    yield scene
+
+            for _, clip in self._iter_scene_clips(spec, checked(scenes), tmp, base_dir):
+                joiner.add(clip)
+            if not joiner.clips:
+                raise ValueError("Streamed spec has no scenes")
+            logger.info("Rendered %d streamed scene(s)", len(timeline))
+
+            cues.extend(narration_cues(spec.audio.narration, timeline))
+            cues.sort(key=lambda c: c.start)
+            self._finish(
+                spec, joiner.clips, joiner.duration, tmp, output_path, base_dir,
+                cues=cues if captions else None,
+            )
+
+        self.export_extras(spec, output_path)
+        return output_path
+
+    def render_key(self, spec: VideoSpec, base_dir: Path | None) -> str:
+        """Identity of a render, for matching a work directory or batch ledger entry to it."""
+        h = hashlib.sha256(spec.model_dump_json().encode())
+        for part in (
+            self.hybrid, self.config.default_font, self.config.default_font_path,
+            base_dir and Path(base_dir).resolve(),
+        ):
+            h.update(f"\0{part}".encode())
+        return h.hexdigest()
+
+    def check_fonts(self, scenes: list[Scene]) -> None:
+        """Raise ValueError if an overlay's font cannot draw its text."""
+        problems = check_overlay_fonts(
+            scenes, self.config.default_font, self.config.default_font_path
+        )
+        if problems:
+            raise ValueError("Fonts are missing glyphs:\n" + "\n".join(problems))
+
+    def export_extras(self, spec: VideoSpec, output_path: Path) -> None:
+        """Steps 6-7: platform variants and the streaming ladder, from the final file."""
+        # Step 6: Platform variants, all encoded from one decode of the master
+        if spec.export.platforms:
+            export_platforms(output_path, spec.export.platforms)
+
+        # Step 7: HLS/DASH rendition ladder, also from one decode
+        if spec.export.streaming:
+            package_abr(
+                output_path,
+                output_path.parent / f"{output_path.stem}_abr",
+                formats=spec.export.streaming,
+                renditions=spec.export.renditions,
+                source_size=spec.video.resolution,
+            )
+
+    @contextmanager
+    def _work_dir(self, manifest: RenderManifest | None) -> Iterator[Path]:
+        """The manifest's work directory, or a temporary one removed afterwards."""
+        if manifest is not None:
+            yield manifest.work_dir
+            return
+        with tempfile.TemporaryDirectory(prefix="videoforge_") as tmpdir:
+            yield Path(tmpdir)
+
+    def _prepare_output(self, spec: VideoSpec, output_path: Path | None) -> Path:
+        """Resolve the output path (named after the title if None) and create its dir."""
         if output_path is None:
             self.config.output_dir.mkdir(parents=True, exist_ok=True)
             safe_title = "".join(
@@ -50,106 +445,278 @@ class RenderEngine:
 
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        return output_path
 
-        width, height = spec.video.resolution
-        fps = spec.video.fps
+    def _caption_mode(self, spec: VideoSpec) -> str | None:
+        captions = spec.export.subtitles
+        if captions and captions not in SUBTITLE_MODES:
+            raise ValueError(f"Unknown subtitles mode: {captions} (use soft or burn)")
+        return captions
 
-        with tempfile.TemporaryDirectory(prefix="videoforge_") as tmpdir:
-            tmp = Path(tmpdir)
+    def _finish(
+        self,
+        spec: VideoSpec,
+        scene_clips: list[Path],
+        timeline_duration: float,
+        tmp: Path,
+        output_path: Path,
+        base_dir: Path | None,
+        cues: list[Cue] | None = None,
+    ) -> None:
+        """Steps 3-5: narration, BGM bed, and the final concat/mux/encode."""
+        self._narration(spec, tmp, base_dir)
+        bgm_bed = self._prepare_bgm(spec, timeline_duration, base_dir)
+        self._mux_output(spec, scene_clips, bgm_bed, tmp, output_path, timeline_duration, cues)
+
+    def _narration(self, spec: VideoSpec, tmp: Path, base_dir: Path | None) -> Path | None:
+        """Step 3: Generate narration audio (if any)."""
+        if not spec.audio.narration:
+            return None
+        logger.info("Generating narration...")
+        return self._generate_narration(spec, tmp, base_dir)
 
-            # Step 1: Render individual scenes
-            logger.info("Rendering %d scenes...", len(spec.scenes))
-            scene_clips: list[Path] = []
-            for i, scene in enumerate(spec.scenes):
-                if not scene.id:
-                    scene.id = f"scene_{i}"
-                logger.info("  Scene %d/%d: %s", i + 1, len(spec.scenes), scene.id)
-                clip = render_scene(
-                    scene=scene,
-                    output_dir=tmp,
-                    width=width,
-                    height=height,
-                    fps=fps,
-                    base_dir=base_dir,
-                    default_font=self.config.default_font,
-                    default_font_path=self.config.default_font_path,
+    def _prepare_bgm(
+        self, spec: VideoSpec, duration: float, base_dir: Path | None
+    ) -> Path | None:
+        """Step 4: Prepare the BGM bed (looped, trimmed, normalized; cached)."""
+        bgm = spec.audio.bgm
+        if not (bgm and bgm.source):
+            return None
+        bgm_path = self._resolve_audio(bgm.source, base_dir)
+        if not bgm_path.exists():
+            logger.warning("BGM file not found: %s", bgm_path)
+            return None
+        logger.info("Preparing BGM...")
+        return prepare_bgm(bgm_path, bgm, duration, cache_dir=self.config.cache_dir)
+
+    def _mux_output(
+        self,
+        spec: VideoSpec,
+        scene_clips: list[Path],
+        bgm_bed: Path | None,
+        tmp: Path,
+        output_path: Path,
+        duration: float,
+        cues: list[Cue] | None = None,
+    ) -> None:
+        """Step 5: the final concat/mux/encode, written atomically to ``output_path``."""
+        captions = spec.export.subtitles
+
+        # Step 5: Concat + audio + faststart in a single pass, written beside
+        # the output and renamed into place
+        # (slow codecs go through a master and the parallel chunked encoder)
+        # (soft captions are muxed in that same pass; burned ones take one libass pass)
+        logger.info("Concatenating scenes...")
+        codec = spec.export.codec
+        soft_subs = None
+        if captions == "soft":
+            fmt = spec.export.subtitle_format
+            soft_subs = write_subtitles(
+                spec, output_path.with_suffix(f".{fmt}"), fmt, self.config.default_font,
+                cues=cues,
+            )
+
+        if codec == ExportCodec.H264 and captions != "burn":
+            with atomic_output(output_path) as partial:
+                mux_final(
+                    partial, scene_clips, audio_path=bgm_bed, work_dir=tmp,
+                    subtitle_path=soft_subs, duration=duration,
                 )
-                scene_clips.append(clip)
-
-            # Step 2: Apply transitions between scenes
-            if len(scene_clips) > 1:
-                logger.info("Applying transitions...")
-                scene_clips = self._apply_transitions(spec, scene_clips, tmp)
-
-            # Step 3: Concatenate all scene clips
-            logger.info("Concatenating scenes...")
-            concat_output = tmp / "concat.mp4"
-            concat_videos(concat_output, scene_clips)
-
-            # Step 4: Generate narration audio (if any)
-            narration_audio = None
-            if spec.audio.narration:
-                logger.info("Generating narration...")
-                narration_audio = self._generate_narration(spec, tmp, base_dir)
-
-            # Step 5: Mix audio (BGM + narration)
-            final_video = concat_output
-            if spec.audio.bgm and spec.audio.bgm.source:
-                logger.info("Mixing BGM...")
-                bgm_path = self._resolve_audio(spec.audio.bgm.source, base_dir)
-                if bgm_path.exists():
-                    mixed = tmp / "with_bgm.mp4"
-                    add_audio_to_video(
-                        video_path=final_video,
-                        audio_path=bgm_path,
-                        output=mixed,
-                        audio_volume=spec.audio.bgm.volume,
-                        fade_in=spec.audio.bgm.fade_in,
-                        fade_out=spec.audio.bgm.fade_out,
-                        video_duration=spec.total_duration,
-                    )
-                    final_video = mixed
-                else:
-                    logger.warning("BGM file not found: %s", bgm_path)
+        else:
+            master = mux_final(
+                tmp / "master.mp4", scene_clips, audio_path=bgm_bed, work_dir=tmp,
+                duration=duration,
+            )
+            if captions == "burn":
+                logger.info("Burning subtitles...")
+                ass = write_subtitles(
+                    spec, tmp / "captions.ass", "ass", self.config.default_font, cues=cues
+                )
+                burned = tmp / "burned.mp4" if codec != ExportCodec.H264 else None
+                with atomic_output(burned or output_path) as partial:
+                    burn_subtitles(master, ass, partial, duration=duration)
+                master = burned
+            if master is not None:
+                logger.info("Encoding %s...", codec.value)
+                encoded = tmp / f"encoded{output_path.suffix}" if soft_subs else output_path
+                encode_chunked(master, encoded, codec, spec.export.quality, work_dir=tmp)
+                if soft_subs:
+                    with atomic_output(output_path) as partial:
+                        mux_subtitles(encoded, soft_subs, partial)
+        logger.info("Video saved to: %s", output_path)
 
-            # Step 6: Copy to output
-            shutil.copy2(final_video, output_path)
-            logger.info("Video saved to: %s", output_path)
+    def _scene_engines(self, spec: VideoSpec) -> list[str]:
+        """Engine of each scene: FFmpeg, or per ``scene_engine`` in hybrid mode."""
+        engines = ["ffmpeg"] * len(spec.scenes)
+        if self.hybrid:
+            engines = [scene_engine(scene) for scene in spec.scenes]
+            animated = engines.count("remotion")
+            if animated and not is_remotion_installed():
+                logger.warning(
+                    "Remotion not installed; rendering %d animated scene(s) with FFmpeg.",
+                    animated,
+                )
+                engines = ["ffmpeg"] * len(spec.scenes)
+            logger.info(
+                "Hybrid render: %d scene(s) via Remotion, %d via FFmpeg",
+                engines.count("remotion"), engines.count("ffmpeg"),
+            )
+        return engines
 
-        return output_path
+    @contextmanager
+    def _scene_tasks(
+        self,
+        graph: TaskGraph,
+        spec: VideoSpec,
+        tmp: Path,
+        base_dir: Path | None,
+        prefix: str = "",
+        shared: SceneClipCache | None = None,
+        engines: list[str] | None = None,
+        dry_run: bool = False,
+    ) -> Iterator[list[str]]:
+        """Add a task per scene clip to ``graph`` and yield their ids, in scene order.
 
-    def _apply_transitions(
-        self, spec: VideoSpec, clips: list[Path], tmp: Path
-    ) -> list[Path]:
-        """Apply transitions between consecutive clips."""
-        result = [clips[0]]
-        cumulative_duration = spec.scenes[0].duration
-
-        for i in range(1, len(clips)):
-            prev_scene = spec.scenes[i - 1]
-            curr_scene = spec.scenes[i]
-
-            transition_type = prev_scene.transition_out.value
-            if transition_type == "none":
-                transition_type = curr_scene.transition_in.value
-
-            if transition_type != "none":
-                duration = prev_scene.transition_duration
-                offset = cumulative_duration - duration
-                merged = tmp / f"transition_{i}.mp4"
-                try:
-                    apply_xfade(result[-1], clips[i], merged, transition_type, duration, offset)
-                    result[-1] = merged
-                    cumulative_duration += curr_scene.duration - duration
-                except RuntimeError:
-                    logger.warning("Transition failed for scene %d, using hard cut.", i)
-                    result.append(clips[i])
-                    cumulative_duration += curr_scene.duration
+        Remotion scenes get an I/O task that fits their asset into the cache first, and
+        share one worker, kept alive for the duration of the block (or owned by
+        ``shared``; none with ``dry_run``). With ``shared``, a scene already in it
+        reuses that task and clip.
+        """
+        engines = engines or self._scene_engines(spec)
+        total = len(spec.scenes)
+        if not dry_run:
+            logger.info("Rendering %d scenes...", total)
+        worker = None
+        if "remotion" in engines and not dry_run:
+            if shared is None:
+                worker = RemotionWorker()
             else:
-                result.append(clips[i])
-                cumulative_duration += curr_scene.duration
+                worker = shared.worker = shared.worker or RemotionWorker()
+        width, height = spec.video.resolution
+        tasks = []
+        try:
+            for i, (scene, engine) in enumerate(zip(spec.scenes, engines)):
+                task_id, clip_dir = f"{prefix}scene:{i}", tmp
+                if shared is not None:
+                    key = shared.key(spec, scene, engine, base_dir)
+                    shared.use(key, prefix)
+                    if key in shared.tasks:
+                        shared.hits += 1
+                        tasks.append(shared.tasks[key])
+                        continue
+                    task_id = shared.tasks[key] = f"scene:{key}"
+                    clip_dir = shared.root / key
+                    clip_dir.mkdir(parents=True, exist_ok=True)
+
+                deps = []
+                if engine == "remotion" and scene.type.value in ("image", "video"):
+                    path = resolve_local(scene.source, base_dir)
+                    if path is not None:
+                        deps.append(graph.add(
+                            f"asset:{task_id}",
+                            lambda path=path, kind=scene.type.value: fit_asset(
+                                path, kind, width, height, self.config.cache_dir
+                            ),
+                            pool="io",
+                        ))
 
-        return result
+                def clip(
+                    *_, scene=scene, engine=engine, out=clip_dir, count=f"{i + 1}/{total}"
+                ) -> Path:
+                    return self._render_clip(spec, scene, engine, out, base_dir, worker, count)
+
+                tasks.append(graph.add(task_id, clip, deps=deps, retries=1))
+            yield tasks
+        finally:
+            if worker is not None and shared is None:
+                worker.close()
+
+    def _render_clip(
+        self,
+        spec: VideoSpec,
+        scene: Scene,
+        engine: str,
+        tmp: Path,
+        base_dir: Path | None,
+        worker: RemotionWorker | None,
+        count: str,
+    ) -> Path:
+        """Render one scene to its clip with ``engine``."""
+        logger.info("  Scene %s: %s (%s)", count, scene.id, engine)
+        if engine == "remotion":
+            return self._render_remotion_scene(spec, scene, tmp, base_dir, worker)
+        width, height = spec.video.resolution
+        return render_scene(
+            scene=scene,
+            output_dir=tmp,
+            width=width,
+            height=height,
+            fps=spec.video.fps,
+            base_dir=base_dir,
+            default_font=self.config.default_font,
+            default_font_path=self.config.default_font_path,
+            cache_dir=self.config.cache_dir,
+        )
+
+    def _iter_scene_clips(
+        self,
+        spec: VideoSpec,
+        scenes: Iterable[Scene],
+        tmp: Path,
+        base_dir: Path | None,
+    ) -> Iterator[tuple[Scene, Path]]:
+        """Render scenes one by one as they are read, yielding each with its clip.
+
+        The engine is chosen as each scene arrives (``scene_engine`` in hybrid mode,
+        falling back to FFmpeg without Remotion). The Remotion worker is started on
+        first use and closed at the end.
+        """
+        remotion_ok: bool | None = None
+        worker: RemotionWorker | None = None
+        try:
+            for i, scene in enumerate(scenes):
+                engine = scene_engine(scene) if self.hybrid else "ffmpeg"
+                if engine == "remotion":
+                    if remotion_ok is None:
+                        remotion_ok = is_remotion_installed()
+                        if not remotion_ok:
+                            logger.warning(
+                                "Remotion not installed; rendering animated scenes with FFmpeg."
+                            )
+                    engine = "remotion" if remotion_ok else "ffmpeg"
+                if engine == "remotion":
+                    worker = worker or RemotionWorker()
+                clip = self._render_clip(spec, scene, engine, tmp, base_dir, worker, str(i + 1))
+                yield scene, clip
+        finally:
+            if worker is not None:
+                worker.close()
+
+    def _render_remotion_scene(
+        self,
+        spec: VideoSpec,
+        scene: Scene,
+        tmp: Path,
+        base_dir: Path | None,
+        worker: RemotionWorker,
+    ) -> Path:
+        """Render one scene alone through Remotion, as a silent clip.
+
+        Transitions are stripped from the scene: they are applied when the clips are
+        joined (see ``_ClipJoiner``), exactly as for FFmpeg-rendered scenes.
+        """
+        solo = scene.model_copy(
+            update={"transition_in": TransitionType.NONE, "transition_out": TransitionType.NONE}
+        )
+        scene_spec = spec.model_copy(update={"scenes": [solo]})
+        return render_with_remotion(
+            scene_spec,
+            tmp / f"{scene.id}_remotion.mp4",
+            cache_dir=self.config.cache_dir,
+            worker=worker,
+            muted=True,
+            base_dir=base_dir,
+        )
 
     def _generate_narration(
         self, spec: VideoSpec, tmp: Path, base_dir: Path | None
@@ -5,8 +5,12 @@ from __future__ import annotations
 import logging
 import shutil
 import subprocess
+import threading
 from pathlib import Path
 
+from .animation import alpha_expr, escape_expr, typewriter_steps, y_offset_expr
+from .process import current_threads, run_process, scaled_timeout
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,18 +24,39 @@ def find_ffmpeg() -> str:
     return path
 
 
-def run_ffmpeg(args: list[str], cwd: Path | None = None) -> subprocess.CompletedProcess:
-    """Run an FFmpeg command and return the result."""
+def run_ffmpeg(
+    args: list[str],
+    cwd: Path | None = None,
+    duration: float | None = None,
+    cancel: threading.Event | None = None,
+) -> subprocess.CompletedProcess:
+    """Run an FFmpeg command and return the result.
+
+    Args:
+        args: Arguments after ``ffmpeg -y``.
+        cwd: Working directory.
+        duration: Seconds of content produced, for the timeout (see
+            ``process.scaled_timeout``). Defaults to the ``-t`` argument, if any.
+        cancel: Kills FFmpeg when set (default: the thread's ``cancel_scope``).
+
+    Inside a ``process.thread_budget``, filters and the encoder of the (last)
+    output are limited to the budget unless ``args`` set ``-threads`` themselves.
+    """
     ffmpeg = find_ffmpeg()
+    threads = current_threads()
+    if threads and "-threads" not in args:
+        budget = str(threads)
+        args = ["-filter_threads", budget, *args[:-1], "-threads", budget, args[-1]]
     cmd = [ffmpeg, "-y"] + args  # -y to overwrite output
     logger.info("FFmpeg command: %s", " ".join(cmd))
 
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        cwd=cwd,
-        timeout=600,
+    if duration is None and "-t" in args:
+        try:
+            duration = float(args[args.index("-t") + 1])
+        except (IndexError, ValueError):
+            pass
+    result = run_process(
+        cmd, cwd=cwd, timeout=scaled_timeout(duration), cancel=cancel, name="FFmpeg"
     )
 
     if result.returncode != 0:
@@ -41,26 +66,87 @@ def run_ffmpeg(args: list[str], cwd: Path | None = None) -> subprocess.Completed
     return result
 
 
-def probe_duration(file_path: Path) -> float:
-    """Get the duration of a media file in seconds."""
+def run_ffprobe(args: list[str]) -> subprocess.CompletedProcess:
+    """Run ffprobe and return the result (stdout decoded; exit code not checked)."""
     ffprobe = shutil.which("ffprobe")
     if not ffprobe:
         raise RuntimeError("ffprobe not found.")
+    return run_process([ffprobe, *args], capture_stdout=True, name="ffprobe")
 
-    result = subprocess.run(
-        [
-            ffprobe,
-            "-v", "quiet",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(file_path),
-        ],
-        capture_output=True,
-        text=True,
-    )
+
+def probe_duration(file_path: Path) -> float:
+    """Get the duration of a media file in seconds."""
+    result = run_ffprobe([
+        "-v", "quiet",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(file_path),
+    ])
     return float(result.stdout.strip())
 
 
+def media_duration(file_path: Path) -> float | None:
+    """Duration of a media file in seconds, or None if it cannot be probed.
+
+    For sizing process timeouts, where a missing duration just means the base timeout.
+    """
+    try:
+        return probe_duration(file_path)
+    except (RuntimeError, ValueError):
+        return None
+
+
+def probe_has_audio(file_path: Path) -> bool:
+    """Return True if the media file has at least one audio stream."""
+    result = run_ffprobe([
+        "-v", "error",
+        "-select_streams", "a",
+        "-show_entries", "stream=index",
+        "-of", "csv=p=0",
+        str(file_path),
+    ])
+    return bool(result.stdout.strip())
+
+
+def probe_video_size(file_path: Path) -> tuple[int, int]:
+    """Return (width, height) of the first video stream."""
+    result = run_ffprobe([
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "stream=width,height",
+        "-of", "csv=p=0:s=x",
+        str(file_path),
+    ])
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed (exit {result.returncode}):\n{result.stderr[-500:]}")
+    width, height = result.stdout.strip().split("x")[:2]
+    return int(width), int(height)
+
+
+def probe_video_packets(file_path: Path) -> list[tuple[float, bool]]:
+    """List (pts_time, is_keyframe) for every video packet, in presentation order.
+
+    Reads packet headers only, so it is fast even for long files.
+    """
+    result = run_ffprobe([
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        str(file_path),
+    ])
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed (exit {result.returncode}):\n{result.stderr[-500:]}")
+
+    packets = []
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(",")
+        if pts and pts != "N/A":
+            packets.append((float(pts), "K" in flags))
+    packets.sort()
+    return packets
+
+
 def create_color_video(
     output: Path,
     color: str,
@@ -132,81 +218,107 @@ def add_text_overlay(
     start: float | None = None,
     end: float | None = None,
     font_path: str | None = None,
+    animation: str = "none",
+    duration: float | None = None,
 ) -> Path:
     """Add a text overlay to a video using FFmpeg drawtext filter.
 
     Uses textfile= with a temporary UTF-8 file for reliable Japanese text rendering
     on Windows, where passing Unicode directly via command line can cause mojibake.
-    """
-    import tempfile
 
+    Animations are drawtext expressions evaluated per frame in the same pass: fades
+    and slides animate ``alpha``/``y``, and typewriter chains one drawtext per
+    revealed prefix, each enabled in its own time window. ``duration`` (the clip
+    length, probed if omitted) places a fade_out that has no ``end``.
+    """
     # Position mapping
     pos_map = {
-        "center": "x=(w-text_w)/2:y=(h-text_h)/2",
-        "top_center": "x=(w-text_w)/2:y=h*0.05",
-        "bottom_center": "x=(w-text_w)/2:y=h*0.85",
-        "top_left": "x=w*0.05:y=h*0.05",
-        "top_right": "x=w*0.95-text_w:y=h*0.05",
-        "bottom_left": "x=w*0.05:y=h*0.85",
-        "bottom_right": "x=w*0.95-text_w:y=h*0.85",
+        "center": ("(w-text_w)/2", "(h-text_h)/2"),
+        "top_center": ("(w-text_w)/2", "h*0.05"),
+        "bottom_center": ("(w-text_w)/2", "h*0.85"),
+        "top_left": ("w*0.05", "h*0.05"),
+        "top_right": ("w*0.95-text_w", "h*0.05"),
+        "bottom_left": ("w*0.05", "h*0.85"),
+        "bottom_right": ("w*0.95-text_w", "h*0.85"),
     }
-    pos_expr = pos_map.get(position, pos_map["bottom_center"])
-
-    # Write text to a temp file (UTF-8 with BOM for FFmpeg on Windows)
-    text_file = output.parent / f"_text_{output.stem}.txt"
-    text_file.write_text(text, encoding="utf-8-sig")
+    x_expr, y_expr = pos_map.get(position, pos_map["bottom_center"])
+    y_offset = y_offset_expr(animation, start)
+    if y_offset is not None:
+        y_expr = f"{y_expr}+{escape_expr(y_offset)}"
+
+    alpha = None
+    if animation != "none":
+        if duration is None and end is None and animation == "fade_out":
+            duration = probe_duration(input_video)
+        alpha = alpha_expr(animation, start, end, duration or 0.0)
+
+    if animation == "typewriter":
+        pieces = typewriter_steps(text, start, end)
+    else:
+        pieces = [(text, start, end)]
+
+    # Write each text to a temp file (UTF-8 with BOM for FFmpeg on Windows)
+    text_files = []
+    for i, (piece, _, _) in enumerate(pieces):
+        text_file = output.parent / f"_text_{output.stem}_{i}.txt"
+        text_file.write_text(piece, encoding="utf-8-sig")
+        text_files.append(text_file)
 
     try:
         # Use just the filename and set cwd to avoid Windows path colon issues
-        text_filename = text_file.name
-        work_dir = text_file.parent
-
-        # Build drawtext filter - use font= (name) to avoid fontfile path colon issues
-        parts = [f"textfile={text_filename}"]
-        parts.append(f"font={font}")
-
-        parts.append(f"fontsize={font_size}")
-
-        # Convert hex color to FFmpeg format
-        hex_c = color.lstrip("#")
-        parts.append(f"fontcolor=0x{hex_c}")
-
-        parts.append(pos_expr)
-
-        if bg_color:
-            hex_bg = bg_color.lstrip("#")
-            if len(hex_bg) == 8:
-                alpha = int(hex_bg[6:], 16) / 255
-                parts.append(f"box=1:boxcolor=0x{hex_bg[:6]}@{alpha:.2f}:boxborderw=10")
-            else:
-                parts.append(f"box=1:boxcolor=0x{hex_bg}@0.5:boxborderw=10")
-
-        if border_color and border_width > 0:
-            hex_border = border_color.lstrip("#")
-            parts.append(f"bordercolor=0x{hex_border}:borderw={border_width}")
-
-        # Enable/disable timing
-        if start is not None or end is not None:
-            enable_parts = []
-            if start is not None:
-                enable_parts.append(f"gte(t\\,{start})")
-            if end is not None:
-                enable_parts.append(f"lte(t\\,{end})")
-            enable_expr = "*".join(enable_parts)
-            parts.append(f"enable={enable_expr}")
-
-        drawtext = "drawtext=" + ":".join(parts)
+        work_dir = output.parent
+
+        filters = []
+        for text_file, (_, piece_start, piece_end) in zip(text_files, pieces):
+            # Build drawtext filter - use font= (name) to avoid fontfile path colon issues
+            parts = [f"textfile={text_file.name}"]
+            parts.append(f"font={font}")
+
+            parts.append(f"fontsize={font_size}")
+
+            # Convert hex color to FFmpeg format
+            hex_c = color.lstrip("#")
+            parts.append(f"fontcolor=0x{hex_c}")
+
+            parts.append(f"x={x_expr}:y={y_expr}")
+            if alpha is not None:
+                parts.append(f"alpha={escape_expr(alpha)}")
+
+            if bg_color:
+                hex_bg = bg_color.lstrip("#")
+                if len(hex_bg) == 8:
+                    box_alpha = int(hex_bg[6:], 16) / 255
+                    parts.append(f"box=1:boxcolor=0x{hex_bg[:6]}@{box_alpha:.2f}:boxborderw=10")
+                else:
+                    parts.append(f"box=1:boxcolor=0x{hex_bg}@0.5:boxborderw=10")
+
+            if border_color and border_width > 0:
+                hex_border = border_color.lstrip("#")
+                parts.append(f"bordercolor=0x{hex_border}:borderw={border_width}")
+
+            # Enable/disable timing
+            if piece_start is not None or piece_end is not None:
+                enable_parts = []
+                if piece_start is not None:
+                    enable_parts.append(f"gte(t\\,{piece_start})")
+                if piece_end is not None:
+                    enable_parts.append(f"lte(t\\,{piece_end})")
+                enable_expr = "*".join(enable_parts)
+                parts.append(f"enable={enable_expr}")
+
+            filters.append("drawtext=" + ":".join(parts))
 
         run_ffmpeg([
             "-i", str(input_video.resolve()),
-            "-vf", drawtext,
+            "-vf", ",".join(filters),
             "-c:v", "libx264",
             "-pix_fmt", "yuv420p",
             "-c:a", "copy",
             str(output.resolve()),
         ], cwd=work_dir)
     finally:
-        text_file.unlink(missing_ok=True)
+        for text_file in text_files:
+            text_file.unlink(missing_ok=True)
 
     return output
 
@@ -224,55 +336,17 @@ def _escape_ffmpeg_path(p: Path) -> str:
     return s
 
 
-# Common Japanese font paths on Windows
-_WINDOWS_FONT_CANDIDATES = [
-    ("Yu Gothic", "C:/Windows/Fonts/YuGothM.ttc"),
-    ("Yu Gothic", "C:/Windows/Fonts/yugothic.ttf"),
-    ("Meiryo", "C:/Windows/Fonts/meiryo.ttc"),
-    ("MS Gothic", "C:/Windows/Fonts/msgothic.ttc"),
-    ("Noto Sans CJK JP", "C:/Windows/Fonts/NotoSansCJKjp-Regular.otf"),
-    ("Noto Sans JP", "C:/Windows/Fonts/NotoSansJP-Regular.otf"),
-]
-
-
-def _resolve_font_path(font_name: str, explicit_path: str | None = None) -> str | None:
-    """Resolve a font name to an actual file path on the system."""
-    if explicit_path:
-        if Path(explicit_path).exists():
-            return explicit_path
-
-    # Try known Windows font paths
-    for name, path in _WINDOWS_FONT_CANDIDATES:
-        if font_name.lower() in name.lower() and Path(path).exists():
-            return path
-
-    # Fallback: try generic Windows font directory search
-    fonts_dir = Path("C:/Windows/Fonts")
-    if fonts_dir.exists():
-        for candidate in fonts_dir.iterdir():
-            if font_name.lower().replace(" ", "") in candidate.stem.lower():
-                return str(candidate)
-
-    return None
-
-
 def concat_videos(output: Path, video_files: list[Path]) -> Path:
     """Concatenate multiple video files using the concat demuxer."""
     if not video_files:
         raise ValueError("No video files to concatenate")
 
     if len(video_files) == 1:
-        import shutil as _shutil
-        _shutil.copy2(video_files[0], output)
+        from .output import place_file
+        place_file(video_files[0], output)
         return output
 
-    # Create concat list file
-    list_file = output.parent / "_concat_list.txt"
-    with open(list_file, "w", encoding="utf-8") as f:
-        for vf in video_files:
-            # Use forward slashes for FFmpeg on Windows
-            safe_path = str(vf.resolve()).replace("\\", "/")
-            f.write(f"file '{safe_path}'\n")
+    list_file = write_concat_list(output.parent / "_concat_list.txt", video_files)
 
     try:
         run_ffmpeg([
@@ -288,6 +362,82 @@ def concat_videos(output: Path, video_files: list[Path]) -> Path:
     return output
 
 
+def write_concat_list(list_file: Path, video_files: list[Path]) -> Path:
+    """Write a concat demuxer list file."""
+    with open(list_file, "w", encoding="utf-8") as f:
+        for vf in video_files:
+            # Use forward slashes for FFmpeg on Windows
+            safe_path = str(vf.resolve()).replace("\\", "/")
+            f.write(f"file '{safe_path}'\n")
+    return list_file
+
+
+def _bgm_filter(
+    audio_volume: float,
+    fade_in: float,
+    fade_out: float,
+    video_duration: float | None,
+) -> str:
+    """Build the BGM volume/fade filter chain."""
+    audio_filters = [f"volume={audio_volume}"]
+
+    if fade_in > 0:
+        audio_filters.append(f"afade=t=in:st=0:d={fade_in}")
+
+    if fade_out > 0 and video_duration:
+        fade_start = max(0, video_duration - fade_out)
+        audio_filters.append(f"afade=t=out:st={fade_start}:d={fade_out}")
+
+    return ",".join(audio_filters)
+
+
+def mux_final(
+    output: Path,
+    video_files: list[Path],
+    audio_path: Path | None = None,
+    work_dir: Path | None = None,
+    subtitle_path: Path | None = None,
+    duration: float | None = None,
+) -> Path:
+    """Concatenate scene clips, add the audio bed and finalize the container in one pass.
+
+    Both streams are copied (the bed is prepared to the timeline length beforehand,
+    see ``render.audio.prepare_bgm``), so the clips are read once and written once,
+    and ``+faststart`` is applied while writing instead of by a separate remux.
+    ``work_dir`` holds the concat list (defaults to the output's directory).
+    ``subtitle_path`` is added as a soft subtitle stream in the same pass.
+    ``duration`` (the timeline length) scales the FFmpeg timeout.
+    """
+    if not video_files:
+        raise ValueError("No video files to concatenate")
+
+    list_dir = work_dir or output.parent
+    list_file = write_concat_list(list_dir / f"_concat_{output.stem}.txt", video_files)
+
+    args = ["-f", "concat", "-safe", "0", "-i", str(list_file)]
+    if audio_path is not None:
+        args += ["-i", str(audio_path)]
+    if subtitle_path is not None:
+        args += ["-i", str(subtitle_path)]
+    if audio_path is not None:
+        args += ["-map", "0:v", "-map", "1:a", "-c:a", "copy"]
+    elif subtitle_path is not None:
+        args += ["-map", "0:v", "-map", "0:a?"]
+    if subtitle_path is not None:
+        from .subtitles import subtitle_codec
+
+        index = 2 if audio_path is not None else 1
+        args += ["-map", f"{index}:s", "-c:s", subtitle_codec(output)]
+    args += ["-c:v", "copy", "-movflags", "+faststart", str(output)]
+
+    try:
+        run_ffmpeg(args, duration=duration)
+    finally:
+        list_file.unlink(missing_ok=True)
+
+    return output
+
+
 def mix_audio(
     video_path: Path,
     audio_path: Path,
@@ -298,16 +448,7 @@ def mix_audio(
     video_duration: float | None = None,
 ) -> Path:
     """Mix an audio track into a video file."""
-    audio_filters = [f"volume={audio_volume}"]
-
-    if fade_in > 0:
-        audio_filters.append(f"afade=t=in:st=0:d={fade_in}")
-
-    if fade_out > 0 and video_duration:
-        fade_start = max(0, video_duration - fade_out)
-        audio_filters.append(f"afade=t=out:st={fade_start}:d={fade_out}")
-
-    af = ",".join(audio_filters)
+    af = _bgm_filter(audio_volume, fade_in, fade_out, video_duration)
 
     run_ffmpeg([
         "-i", str(video_path),
@@ -334,16 +475,7 @@ def add_audio_to_video(
     video_duration: float | None = None,
 ) -> Path:
     """Add audio to a video that has no audio stream."""
-    audio_filters = [f"volume={audio_volume}"]
-
-    if fade_in > 0:
-        audio_filters.append(f"afade=t=in:st=0:d={fade_in}")
-
-    if fade_out > 0 and video_duration:
-        fade_start = max(0, video_duration - fade_out)
-        audio_filters.append(f"afade=t=out:st={fade_start}:d={fade_out}")
-
-    af = ",".join(audio_filters)
+    af = _bgm_filter(audio_volume, fade_in, fade_out, video_duration)
 
     run_ffmpeg([
         "-i", str(video_path),
@@ -0,0 +1,346 @@
+"""Cross-platform font index.
+
+The standard font directories of Linux, macOS and Windows are scanned once; family,
+style and full names are read straight from each face's ``name`` table, and whether
+it covers Japanese from its ``cmap``. The index is persisted under the cache dir and
+rebuilt only when a font directory's mtime changes, so lookups are dictionary hits.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+FONT_EXTENSIONS = {".ttf", ".otf", ".ttc", ".otc"}
+# A face "covers CJK" if it maps all of these (hiragana, katakana, two common kanji)
+CJK_PROBE = "あア漢字"
+# Preferred styles when a lookup names only the family
+REGULAR_STYLES = ("regular", "medium", "book", "normal", "roman", "standard", "w3", "r")
+
+
+@dataclass
+class FontFace:
+    """One face inside a font file (``index`` > 0 only in collections)."""
+
+    path: str
+    index: int
+    family: str
+    style: str
+    names: list[str] = field(default_factory=list)
+    cjk: bool = False
+
+
+def font_dirs() -> list[Path]:
+    """Standard font directories for this platform (existing ones only)."""
+    home = Path.home()
+    if sys.platform == "win32":
+        windir = Path(os.environ.get("WINDIR", "C:/Windows"))
+        local = Path(os.environ.get("LOCALAPPDATA", home / "AppData" / "Local"))
+        dirs = [windir / "Fonts", local / "Microsoft" / "Windows" / "Fonts"]
+    elif sys.platform == "darwin":
+        dirs = [
+            Path("/System/Library/Fonts"),
+            Path("/Library/Fonts"),
+            home / "Library" / "Fonts",
+        ]
+    else:
+        data_home = Path(os.environ.get("XDG_DATA_HOME", home / ".local" / "share"))
+        dirs = [
+            Path("/usr/share/fonts"),
+            Path("/usr/local/share/fonts"),
+            data_home / "fonts",
+            home / ".fonts",
+        ]
+    return [d for d in dirs if d.is_dir()]
+
+
+def normalize(name: str) -> str:
+    """Lookup key for a font name: case- and separator-insensitive."""
+    return "".join(c for c in name.casefold() if c not in " -_")
+
+
+# --- sfnt table parsing ---
+
+
+def _tables(data: bytes, offset: int) -> dict[bytes, tuple[int, int]]:
+    (num_tables,) = struct.unpack_from(">H", data, offset + 4)
+    tables = {}
+    for i in range(num_tables):
+        tag, _, table_offset, length = struct.unpack_from(">4sIII", data, offset + 12 + 16 * i)
+        tables[tag] = (table_offset, length)
+    return tables
+
+
+def _face_offsets(data: bytes) -> list[int]:
+    tag = data[:4]
+    if tag == b"ttcf":
+        (count,) = struct.unpack_from(">I", data, 8)
+        return list(struct.unpack_from(f">{count}I", data, 12))
+    if tag in (b"\x00\x01\x00\x00", b"OTTO", b"true"):
+        return [0]
+    raise ValueError("not an sfnt font")
+
+
+def _read_names(data: bytes, table: tuple[int, int]) -> dict[int, list[str]]:
+    """nameID -> decoded strings, English (Windows 0x409) first."""
+    base = table[0]
+    _, count, string_offset = struct.unpack_from(">HHH", data, base)
+    found: dict[int, list[tuple[int, str]]] = {}
+    for i in range(count):
+        platform, encoding, language, name_id, length, offset = struct.unpack_from(
+            ">HHHHHH", data, base + 6 + 12 * i
+        )
+        if name_id not in (1, 2, 4, 6, 16, 17):
+            continue
+        raw = data[base + string_offset + offset:base + string_offset + offset + length]
+        if platform in (0, 3):
+            text = raw.decode("utf-16-be", errors="ignore")
+            rank = 0 if (platform, language) == (3, 0x409) else 1
+        elif platform == 1 and encoding == 0:
+            text = raw.decode("mac_roman", errors="ignore")
+            rank = 2
+        else:
+            continue
+        text = text.strip("\x00 ")
+        if text:
+            found.setdefault(name_id, []).append((rank, text))
+    return {
+        k: list(dict.fromkeys(t for _, t in sorted(v, key=lambda x: x[0])))
+        for k, v in found.items()
+    }
+
+
+def _read_cmap_ranges(data: bytes, table: tuple[int, int]) -> list[tuple[int, int]]:
+    """Sorted, merged code point ranges mapped by the best Unicode cmap subtable."""
+    base = table[0]
+    _, count = struct.unpack_from(">HH", data, base)
+    subtables = {}
+    for i in range(count):
+        platform, _, offset = struct.unpack_from(">HHI", data, base + 4 + 8 * i)
+        (fmt,) = struct.unpack_from(">H", data, base + offset)
+        if platform in (0, 3) and fmt in (4, 12):
+            subtables.setdefault(fmt, base + offset)
+
+    ranges: list[tuple[int, int]] = []
+    if 12 in subtables:
+        sub = subtables[12]
+        (groups,) = struct.unpack_from(">I", data, sub + 12)
+        for i in range(groups):
+            start, end, _ = struct.unpack_from(">III", data, sub + 16 + 12 * i)
+            ranges.append((start, end))
+    elif 4 in subtables:
+        sub = subtables[4]
+        (seg_x2,) = struct.unpack_from(">H", data, sub + 6)
+        segs = seg_x2 // 2
+        ends = struct.unpack_from(f">{segs}H", data, sub + 14)
+        starts = struct.unpack_from(f">{segs}H", data, sub + 16 + seg_x2)
+        ranges = [(s, e) for s, e in zip(starts, ends, strict=True) if s != 0xFFFF]
+
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _covers(ranges: list[tuple[int, int]], char: str) -> bool:
+    cp = ord(char)
+    i = bisect.bisect_right(ranges, (cp, sys.maxunicode + 1)) - 1
+    return i >= 0 and ranges[i][0] <= cp <= ranges[i][1]
+
+
+def read_faces(path: Path) -> list[FontFace]:
+    """Read every face in a font file from its ``name`` and ``cmap`` tables."""
+    data = path.read_bytes()
+    faces = []
+    for index, offset in enumerate(_face_offsets(data)):
+        tables = _tables(data, offset)
+        if b"name" not in tables:
+            continue
+        names = _read_names(data, tables[b"name"])
+        families = names.get(16) or names.get(1)
+        if not families:
+            continue
+        style = (names.get(17) or names.get(2) or ["Regular"])[0]
+        cjk = False
+        if b"cmap" in tables:
+            ranges = _read_cmap_ranges(data, tables[b"cmap"])
+            cjk = all(_covers(ranges, c) for c in CJK_PROBE)
+        aliases = [*families, *names.get(1, []), *names.get(4, []), *names.get(6, [])]
+        faces.append(FontFace(
+            path=str(path),
+            index=index,
+            family=families[0],
+            style=style,
+            names=list(dict.fromkeys(aliases)),
+            cjk=cjk,
+        ))
+    return faces
+
+
+@functools.lru_cache(maxsize=64)
+def _file_faces(path: str, mtime_ns: int) -> tuple[FontFace, ...]:
+    """Faces of an explicitly given font file, parsed once per version of the file."""
+    try:
+        return tuple(read_faces(Path(path)))
+    except (OSError, ValueError, struct.error):
+        return ()
+
+
+@functools.lru_cache(maxsize=64)
+def _coverage(path: str, index: int) -> tuple[tuple[int, int], ...]:
+    data = Path(path).read_bytes()
+    tables = _tables(data, _face_offsets(data)[index])
+    if b"cmap" not in tables:
+        return ()
+    return tuple(_read_cmap_ranges(data, tables[b"cmap"]))
+
+
+def missing_glyphs(path: str | Path, text: str, index: int = 0) -> list[str]:
+    """Characters of ``text`` (ignoring whitespace) the face has no glyph for."""
+    try:
+        ranges = list(_coverage(str(path), index))
+    except (OSError, ValueError, struct.error):
+        return []  # unreadable cmap: let the renderer decide
+    return sorted({c for c in text if not c.isspace() and not _covers(ranges, c)})
+
+
+# --- the index ---
+
+
+class FontIndex:
+    """Name -> face lookup over every installed font.
+
+    Usage:
+        face = FontIndex.load().find("Noto Sans CJK JP")
+    """
+
+    def __init__(self, faces: list[FontFace]):
+        self.faces = faces
+        self._by_name: dict[str, FontFace] = {}
+        self._by_family_style: dict[tuple[str, str], FontFace] = {}
+        # Regular-ish faces first, so they win a family-only lookup
+        for face in sorted(faces, key=_style_rank):
+            for name in [*face.names, Path(face.path).stem]:
+                self._by_name.setdefault(normalize(name), face)
+            self._by_family_style.setdefault((normalize(face.family), normalize(face.style)), face)
+
+    def find(self, name: str, style: str | None = None) -> FontFace | None:
+        """Face for a family, full or PostScript name (or file stem), if installed."""
+        if style:
+            face = self._by_family_style.get((normalize(name), normalize(style)))
+            if face:
+                return face
+        return self._by_name.get(normalize(name))
+
+    def cjk_faces(self) -> list[FontFace]:
+        """Faces that cover Japanese text."""
+        return [f for f in self.faces if f.cjk]
+
+    @classmethod
+    def build(cls, dirs: list[Path] | None = None) -> FontIndex:
+        """Scan ``dirs`` (default: the platform's font directories)."""
+        faces = []
+        for path in _font_files(font_dirs() if dirs is None else dirs):
+            try:
+                faces.extend(read_faces(path))
+            except (OSError, ValueError, struct.error) as e:
+                logger.debug("Skipping font %s: %s", path, e)
+        return cls(faces)
+
+    @classmethod
+    def load(cls, cache_dir: Path | None = None, dirs: list[Path] | None = None) -> FontIndex:
+        """Load the on-disk index, rebuilding it if any font directory changed."""
+        if cache_dir is None:
+            from ..config import Config
+
+            cache_dir = Config.load().cache_dir
+        dirs = font_dirs() if dirs is None else dirs
+        index_file = Path(cache_dir) / "fonts" / "index.json"
+        stamp = _dir_stamp(dirs)
+
+        try:
+            cached = json.loads(index_file.read_text(encoding="utf-8"))
+            if cached.get("version") == INDEX_VERSION and cached.get("dirs") == stamp:
+                return cls([FontFace(**f) for f in cached["faces"]])
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+
+        logger.info("Indexing fonts in %s", ", ".join(map(str, dirs)) or "(no font dirs)")
+        index = cls.build(dirs)
+        from .output import atomic_output
+
+        payload = {
+            "version": INDEX_VERSION,
+            "dirs": stamp,
+            "faces": [asdict(f) for f in index.faces],
+        }
+        try:
+            with atomic_output(index_file) as partial:
+                partial.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        except OSError as e:
+            logger.warning("Could not write font index %s: %s", index_file, e)
+        return index
+
+
+def _style_rank(face: FontFace) -> int:
+    style = normalize(face.style)
+    return REGULAR_STYLES.index(style) if style in REGULAR_STYLES else len(REGULAR_STYLES)
+
+
+def _font_files(dirs: list[Path]):
+    for root in dirs:
+        for dirpath, _, filenames in os.walk(root, followlinks=True):
+            for name in sorted(filenames):
+                if Path(name).suffix.lower() in FONT_EXTENSIONS:
+                    yield Path(dirpath) / name
+
+
+def _dir_stamp(dirs: list[Path]) -> dict[str, int]:
+    """mtime of every font directory and subdirectory (adding a font bumps its dir)."""
+    stamp = {}
+    for root in dirs:
+        for dirpath, _, _ in os.walk(root, followlinks=True):
+            with contextlib.suppress(OSError):
+                stamp[dirpath] = os.stat(dirpath).st_mtime_ns
+    return stamp
+
+
+_index: FontIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_font_index() -> FontIndex:
+    """The process-wide font index, loaded on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FontIndex.load()
+        return _index
+
+
+def resolve_font(name: str, explicit_path: str | None = None) -> FontFace | None:
+    """Resolve a font name (or an explicit file) to an installed face."""
+    if explicit_path and Path(explicit_path).is_file():
+        path = Path(explicit_path)
+        faces = _file_faces(str(path), path.stat().st_mtime_ns)
+        wanted = normalize(name)
+        for face in faces:
+            if wanted in map(normalize, face.names):
+                return face
+        return faces[0] if faces else FontFace(path=str(path), index=0, family=name, style="")
+    return get_font_index().find(name)
@@ -0,0 +1,113 @@
+"""Job isolation helpers - render slots shared across processes, and cancellation."""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.2
+
+
+class RenderCancelled(RuntimeError):
+    """A render was cancelled before it finished."""
+
+
+class SlotLimiter:
+    """Limits concurrent renders on one machine, across threads and processes.
+
+    Each slot is a lock file under ``lock_dir``; holding an OS-level lock on one of
+    the files is holding the slot. Locks are released by the OS if the holder dies,
+    so a crashed render never leaks a slot.
+    """
+
+    def __init__(self, slots: int, lock_dir: Path):
+        self.slots = max(1, slots)
+        self.lock_dir = Path(lock_dir)
+
+    @contextlib.contextmanager
+    def acquire(
+        self,
+        timeout: float | None = None,
+        cancel: threading.Event | None = None,
+    ) -> Iterator[int]:
+        """Wait for a free slot and hold it for the duration of the block.
+
+        Raises:
+            TimeoutError: No slot became free within ``timeout`` seconds.
+            RenderCancelled: ``cancel`` was set while waiting.
+        """
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        while True:
+            for slot in range(self.slots):
+                with open(self.lock_dir / f"slot_{slot}.lock", "a+b") as f:
+                    if not _try_lock(f):
+                        continue
+                    try:
+                        yield slot
+                    finally:
+                        _unlock(f)
+                    return
+            if cancel is not None and cancel.is_set():
+                raise RenderCancelled("Cancelled while waiting for a render slot")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"No render slot free after {timeout}s")
+            if not waited:
+                logger.info("All %d render slot(s) busy; waiting...", self.slots)
+                waited = True
+            time.sleep(POLL_INTERVAL)
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(f) -> bool:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(f) -> bool:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+_remotion_limiter: SlotLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def remotion_slots() -> SlotLimiter:
+    """The machine-wide limiter for Remotion renders (``VIDEOFORGE_REMOTION_SLOTS``)."""
+    global _remotion_limiter
+    with _limiter_lock:
+        if _remotion_limiter is None:
+            from ..config import Config
+
+            config = Config.load()
+            _remotion_limiter = SlotLimiter(
+                config.remotion_slots, config.cache_dir / "locks" / "remotion"
+            )
+        return _remotion_limiter
@@ -0,0 +1,106 @@
+"""Output file placement - atomic writes and zero-copy moves of rendered media."""
+
+from __future__ import annotations
+
+import contextlib
+import errno
+import itertools
+import logging
+import os
+import shutil
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# ioctl request number for FICLONE on Linux (copy-on-write clone of a whole file)
+_FICLONE = 0x40049409
+
+_partial_ids = itertools.count(1)
+
+
+def partial_path(output: Path) -> Path:
+    """Return a fresh temp path to write ``output`` to.
+
+    The file lives in the same directory (so the final rename is atomic) and keeps
+    the original suffix so FFmpeg still picks the right container format. Each call
+    gets its own name (process id plus a counter), so threads writing the same
+    target, e.g. two jobs preparing the same cached BGM bed, never share a file.
+    """
+    return output.with_name(
+        f".{output.stem}.{os.getpid()}-{next(_partial_ids)}.partial{output.suffix}"
+    )
+
+
+@contextlib.contextmanager
+def atomic_output(output: Path) -> Iterator[Path]:
+    """Yield a temp path beside ``output`` and rename it into place on success.
+
+    Readers never observe a half-written file at ``output``; on failure the
+    partial file is removed and ``output`` is left untouched. The caller may
+    create a directory at the temp path instead (e.g. for HLS segments): it then
+    replaces the directory at ``output`` as a whole.
+    """
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = partial_path(output)
+    try:
+        yield tmp
+        if tmp.is_dir() and output.is_dir():
+            old = partial_path(output)
+            os.replace(output, old)
+            os.replace(tmp, output)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(tmp, output)
+    finally:
+        if tmp.is_dir():
+            shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            tmp.unlink(missing_ok=True)
+
+
+def place_file(src: Path, dst: Path) -> Path:
+    """Place a copy of ``src`` at ``dst`` without copying bytes when possible.
+
+    Tries, in order: a hardlink, a reflink (copy-on-write clone), and finally a
+    regular copy. The destination is written atomically in every case.
+    """
+    src, dst = Path(src), Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_output(dst) as tmp:
+        tmp.unlink(missing_ok=True)
+        if _try_hardlink(src, tmp):
+            logger.debug("Hardlinked %s -> %s", src, dst)
+        elif _try_reflink(src, tmp):
+            logger.debug("Reflinked %s -> %s", src, dst)
+        else:
+            shutil.copy2(src, tmp)
+            logger.debug("Copied %s -> %s", src, dst)
+    return dst
+
+
+def _try_hardlink(src: Path, dst: Path) -> bool:
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        return False
+
+
+def _try_reflink(src: Path, dst: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError as e:
+        if e.errno not in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY):
+            logger.debug("Reflink failed (%s); falling back to copy.", e)
+        dst.unlink(missing_ok=True)
+        return False
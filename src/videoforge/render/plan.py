@@ -0,0 +1,470 @@
+"""Render plans - a spec compiled into the task DAG a render would execute.
+
+``build_plan`` builds the task graph ``RenderEngine`` would run for the spec (scene
+clips, transitions, narration, BGM, final mux) without running it, then adds the
+exports that follow (platform variants, ABR ladder). Each task lists the tasks it
+depends on, whether its result is already in the cache, and an estimate of CPU
+seconds and bytes written to the work directory from a ``CostModel``.
+``record_timings`` calibrates the model from the task times of a real render.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from ..config import Config
+from ..schema import ExportCodec, SceneType, VideoSpec
+from .audio import bgm_cache_path
+from .compositor import overlay_font, overlay_parts
+from .engine import RenderEngine
+from .output import atomic_output
+from .text_layer import layer_path
+
+logger = logging.getLogger(__name__)
+
+PLAN_ENGINES = ("ffmpeg", "hybrid", "remotion")
+
+# CPU seconds per unit of work. Video operations are per megapixel-frame (one frame
+# at 1 Mpx; a 1080p frame is ~2.07), "bgm" per second of audio, "raster" per
+# rasterized layer, "asset" per fitted asset, "bundle" per bundle build.
+# Defaults are rough libx264-medium / headless-Chrome figures on one core;
+# ``CostModel.load`` overrides them with measured rates (``record_timings`` measures
+# wall seconds, so calibrated rates include the parallelism of the machine).
+DEFAULT_CPU_RATES: dict[str, float] = {
+    "color": 0.0015,
+    "image": 0.004,
+    "video": 0.01,
+    "composite": 0.008,
+    "drawtext": 0.008,
+    "remotion": 0.03,
+    "xfade": 0.01,
+    "mux": 0.0002,
+    "burn": 0.01,
+    "encode:h264": 0.01,
+    "encode:h265": 0.04,
+    "encode:vp9": 0.06,
+    "encode:av1": 0.12,
+    "variant": 0.01,
+    "abr": 0.012,
+    "bgm": 0.02,
+    "asset": 0.5,
+    "raster": 0.05,
+    "bundle": 60.0,
+}
+# Bytes written per megapixel-frame of intermediate H.264 (~5 Mbit/s at 1080p30)
+DEFAULT_BYTES_PER_MPX_FRAME = 10_000.0
+# Solid-colour clips compress to almost nothing
+COLOR_BYTES_FACTOR = 0.05
+
+
+@dataclass
+class CostModel:
+    """CPU-seconds rates per operation and intermediate-video size per megapixel-frame."""
+
+    cpu: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_CPU_RATES))
+    bytes_per_mpx_frame: float = DEFAULT_BYTES_PER_MPX_FRAME
+    samples: dict[str, int] = field(default_factory=dict)  # timings behind each rate
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> CostModel:
+        """Defaults, overridden by a calibration JSON file if ``path`` exists.
+
+        The file holds ``{"cpu": {op: rate, ...}, "bytes_per_mpx_frame": n,
+        "samples": {op: count, ...}}``; missing entries keep their defaults.
+        """
+        model = cls()
+        if path is not None and Path(path).exists():
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            model.cpu.update({k: float(v) for k, v in data.get("cpu", {}).items()})
+            model.bytes_per_mpx_frame = float(
+                data.get("bytes_per_mpx_frame", model.bytes_per_mpx_frame)
+            )
+            model.samples.update({k: int(v) for k, v in data.get("samples", {}).items()})
+        return model
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        with atomic_output(path) as partial:
+            partial.write_text(
+                json.dumps(asdict(self), indent=2, sort_keys=True), encoding="utf-8"
+            )
+        return path
+
+    def cpu_seconds(self, op: str, units: float) -> float:
+        return self.cpu.get(op, 0.0) * units
+
+    def video_bytes(self, mpx_frames: float, factor: float = 1.0) -> int:
+        return int(self.bytes_per_mpx_frame * mpx_frames * factor)
+
+
+def default_cost_model_path(cache_dir: Path) -> Path:
+    """Calibration file read by ``videoforge plan`` when none is given."""
+    return Path(cache_dir) / "plan" / "cost_model.json"
+
+
+@dataclass
+class Task:
+    """One unit of work in a render plan."""
+
+    id: str
+    kind: str  # "ffmpeg" / "tts" / "remotion" / "pillow" / "python"
+    op: str  # cost-model operation
+    description: str
+    deps: list[str] = field(default_factory=list)
+    cached: bool = False
+    cpu_seconds: float = 0.0
+    temp_bytes: int = 0
+    units: float = 0.0  # of ``op``, the work its cost-model rate applies to
+
+
+@dataclass
+class RenderPlan:
+    """Tasks in a valid execution order (every task after its dependencies)."""
+
+    title: str
+    engine: str
+    duration: float
+    tasks: list[Task] = field(default_factory=list)
+    costs: CostModel | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def cpu_seconds(self) -> float:
+        return sum(t.cpu_seconds for t in self.tasks)
+
+    @property
+    def temp_bytes(self) -> int:
+        return sum(t.temp_bytes for t in self.tasks)
+
+    def get(self, task_id: str) -> Task | None:
+        return next((t for t in self.tasks if t.id == task_id), None)
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "engine": self.engine,
+            "duration": round(self.duration, 3),
+            "cpu_seconds": round(self.cpu_seconds, 2),
+            "temp_bytes": self.temp_bytes,
+            "cache_hits": sum(t.cached for t in self.tasks),
+            "tasks": [
+                {**asdict(t), "cpu_seconds": round(t.cpu_seconds, 3)} for t in self.tasks
+            ],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+
+    def to_table(self) -> str:
+        """Fixed-width table of the tasks plus a totals line."""
+        rows = [("TASK", "KIND", "CACHE", "CPU s", "TEMP", "DEPENDS ON")]
+        for t in self.tasks:
+            rows.append((
+                t.id,
+                t.kind,
+                "hit" if t.cached else "miss",
+                f"{t.cpu_seconds:.1f}",
+                format_bytes(t.temp_bytes),
+                ", ".join(t.deps) or "-",
+            ))
+        widths = [max(len(r[i]) for r in rows) for i in range(5)]
+        lines = [
+            "  ".join(cell.ljust(w) for cell, w in zip(row[:5], widths)) + "  " + row[5]
+            for row in rows
+        ]
+        lines.append(
+            f"{len(self.tasks)} tasks, {sum(t.cached for t in self.tasks)} cached, "
+            f"~{self.cpu_seconds:.0f} CPU s, ~{format_bytes(self.temp_bytes)} temp"
+        )
+        return "\n".join(lines)
+
+
+def format_bytes(n: int) -> str:
+    size = float(n)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{n} B"
+
+
+def record_timings(plan: RenderPlan, timings: dict[str, float], path: Path) -> CostModel:
+    """Fold a render's task times (seconds per task id) into the calibration at ``path``.
+
+    Each timed task that did work updates the rate of its ``op`` as a running mean
+    over every timing recorded so far. The part of the task's estimate that belongs
+    to other operations (e.g. overlay rasters folded into a scene) is subtracted
+    first. Returns the updated model, saved to ``path``.
+    """
+    model = CostModel.load(path)
+    costs = plan.costs or model
+    for task in plan.tasks:
+        seconds = timings.get(task.id)
+        if seconds is None or task.cached or task.units <= 0:
+            continue
+        other = task.cpu_seconds - costs.cpu_seconds(task.op, task.units)
+        rate = max(seconds - other, 0.0) / task.units
+        count = model.samples.get(task.op, 0)
+        model.cpu[task.op] = (model.cpu.get(task.op, 0.0) * count + rate) / (count + 1)
+        model.samples[task.op] = count + 1
+    model.save(path)
+    return model
+
+
+def build_plan(
+    spec: VideoSpec,
+    config: Config | None = None,
+    engine: str = "ffmpeg",
+    base_dir: Path | None = None,
+    shards: int = 1,
+    cost_model: CostModel | None = None,
+) -> RenderPlan:
+    """Compile ``spec`` into the tasks a render with ``engine`` would run.
+
+    For ``ffmpeg`` and ``hybrid`` the tasks are those of the task graph
+    ``RenderEngine`` builds for the render (same ids and dependencies, so progress
+    events and resume manifests match the plan), followed by the export steps that
+    run on the finished file.
+
+    Args:
+        spec: The video specification.
+        config: Configuration (fonts, cache directory). Loaded if None.
+        engine: ``ffmpeg``, ``hybrid`` or ``remotion`` (as for ``videoforge render``).
+        base_dir: Base directory for resolving relative asset paths.
+        shards: Remotion engine only: number of frame-range shards.
+        cost_model: Rates for the estimates. Defaults to the calibrated model in
+            the cache directory, if any.
+    """
+    if engine not in PLAN_ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (use {', '.join(PLAN_ENGINES)})")
+    config = config or Config.load()
+    costs = cost_model or CostModel.load(default_cost_model_path(config.cache_dir))
+    timeline = spec.timeline
+    width, height = spec.video.resolution
+    mpx = width * height / 1e6
+    fps = spec.video.fps
+    plan = RenderPlan(spec.video.title, engine, timeline.duration, costs=costs)
+
+    def add(
+        task_id, kind, op, description, deps=(), cached=False, units=0.0, temp=0, extra=0.0
+    ):
+        cpu = 0.0 if cached else costs.cpu_seconds(op, units) + extra
+        task = Task(
+            task_id, kind, op, description, list(deps), cached, cpu,
+            0 if cached else temp, units,
+        )
+        plan.tasks.append(task)
+        return task
+
+    def frames(seconds: float) -> float:
+        return mpx * fps * seconds
+
+    if engine == "remotion":
+        _plan_remotion(spec, config, add, frames, costs, shards)
+        _plan_exports(spec, add, "render", streaming=False)
+        return plan
+
+    # The graph the engine would run; its tasks are built but never called
+    renderer = RenderEngine(config, hybrid=engine == "hybrid")
+    graph, engines = renderer.plan_tasks(spec, base_dir)
+    last = next(reversed(graph.tasks))
+
+    captions = spec.export.subtitles
+    bundle_pending = "remotion" in engines and not _bundle_cached(config)
+    xfade_seconds = _xfade_spans(timeline)
+    for task in graph.tasks.values():
+        kind, _, rest = task.id.partition(":")
+        if kind == "scene":
+            i = int(rest)
+            scene = spec.scenes[i]
+            n = frames(scene.duration)
+            if engines[i] == "remotion":
+                bundle = bundle_pending and i == engines.index("remotion")
+                add(
+                    task.id, "remotion", "remotion",
+                    f"Remotion scene, {scene.duration:g}s, muted"
+                    + (" (+ bundle build)" if bundle else ""),
+                    task.deps, units=n, temp=costs.video_bytes(n),
+                    extra=costs.cpu_seconds("bundle", 1) if bundle else 0.0,
+                )
+                continue
+            overlays = [] if captions else scene.text_overlays
+            _plan_scene(task, scene, overlays, config, costs, add, n)
+        elif kind == "asset":
+            scene = spec.scenes[int(rest.rpartition(":")[2])]
+            add(task.id, "ffmpeg", "asset", f"fit {Path(scene.source).name}", task.deps, units=1)
+        elif kind == "join":
+            i = int(rest)
+            transition = timeline.transitions[i]
+            if transition is None:
+                add(task.id, "python", "join", "hard cut" if i else "first clip", task.deps)
+                continue
+            n = frames(xfade_seconds[i])
+            add(
+                task.id, "ffmpeg", "xfade", f"{transition[0]} {transition[1]:g}s into scene {i}",
+                task.deps, units=n, temp=costs.video_bytes(n),
+            )
+        elif kind == "narration":
+            segments = len(spec.audio.narration)
+            add(
+                task.id, "python", "narration",
+                f"{segments} segment(s); TTS is not part of the render yet"
+                if segments else "no narration",
+                task.deps,
+            )
+        elif kind == "bgm":
+            _plan_bgm(task, spec, config, base_dir, add)
+        elif kind == "mux":
+            _plan_mux(task, spec, add, frames(timeline.duration), costs)
+        else:
+            add(task.id, "python", kind, kind, task.deps)
+
+    _plan_exports(spec, add, last)
+    return plan
+
+
+def _xfade_spans(timeline) -> dict[int, float]:
+    """Seconds each xfade re-encodes: the run of scenes joined so far, plus the next."""
+    spans = {}
+    origin = 0.0
+    for i, transition in enumerate(timeline.transitions):
+        if transition is None:
+            origin = timeline.starts[i]
+        else:
+            spans[i] = timeline.ends[i] - origin
+    return spans
+
+
+def _plan_scene(task, scene, overlays, config: Config, costs: CostModel, add, n: float) -> None:
+    """An FFmpeg scene clip: the base clip and its text overlays, in one task."""
+    op = scene.type.value if scene.type != SceneType.AI_GENERATE else "color"
+    description = f"{op} clip, {scene.duration:g}s"
+    temp = costs.video_bytes(n, COLOR_BYTES_FACTOR if op == "color" else 1.0)
+    extra = 0.0
+    layers = _raster_status(overlays, config) if overlays else None
+    if layers is not None:
+        total, cached = layers
+        description += f" + {total} text layer(s), {cached} cached"
+        extra = costs.cpu_seconds("raster", total - cached) + costs.cpu_seconds("composite", n)
+    elif overlays:
+        description += f" + drawtext x{len(overlays)}"
+        extra = costs.cpu_seconds("drawtext", n) * len(overlays)
+    if overlays:
+        temp += costs.video_bytes(n)
+    add(task.id, "ffmpeg", op, description, task.deps, units=n, temp=temp, extra=extra)
+
+
+def _raster_status(overlays, config: Config) -> tuple[int, int] | None:
+    """(layers, already cached) for pre-rasterized overlays, or None for drawtext."""
+    total = cached = 0
+    for overlay in overlays:
+        face = overlay_font(overlay, config.default_font, config.default_font_path)
+        if face is None:
+            return None
+        for part in overlay_parts(overlay):
+            try:
+                path = layer_path(part, Path(face.path), config.cache_dir, face.index)
+            except OSError:
+                return None
+            total += 1
+            cached += path.exists()
+    return total, cached
+
+
+def _plan_bgm(task, spec: VideoSpec, config: Config, base_dir: Path | None, add) -> None:
+    bgm = spec.audio.bgm
+    duration = spec.timeline.duration
+    source = Path(bgm.source) if bgm and bgm.source else None
+    if source is not None and not source.is_absolute() and base_dir:
+        source = base_dir / source
+    if source is None or not source.exists():
+        add(task.id, "python", "bgm", "no BGM", task.deps)
+        return
+    cached = bgm_cache_path(source, bgm, duration, config.cache_dir).exists()
+    add(
+        task.id, "ffmpeg", "bgm", f"BGM bed, {duration:g}s", task.deps,
+        cached=cached, units=duration,
+    )
+
+
+def _plan_mux(task, spec: VideoSpec, add, total: float, costs: CostModel) -> None:
+    """The final task: concat + audio (+ soft captions), then burn and encode if needed."""
+    captions = spec.export.subtitles
+    codec = spec.export.codec
+    direct = codec == ExportCodec.H264 and captions != "burn"
+    steps = ["concat + audio"]
+    extra = 0.0
+    temp = 0 if direct else costs.video_bytes(total)
+    if captions == "soft":
+        steps.append(f"{spec.export.subtitle_format} captions")
+    if captions == "burn":
+        steps.append("burn captions (libass)")
+        extra += costs.cpu_seconds("burn", total)
+        if codec != ExportCodec.H264:
+            temp += costs.video_bytes(total)
+    if codec != ExportCodec.H264:
+        steps.append(f"{codec.value} chunked encode")
+        extra += costs.cpu_seconds(f"encode:{codec.value}", total)
+        if captions == "soft":
+            extra += costs.cpu_seconds("mux", total)
+    add(
+        task.id, "ffmpeg", "mux", " + ".join(steps), task.deps,
+        units=total, temp=temp, extra=extra,
+    )
+
+
+def _bundle_cached(config: Config) -> bool:
+    from .remotion import cached_bundle
+
+    try:
+        return cached_bundle(config.cache_dir) is not None
+    except (OSError, RuntimeError):
+        return False
+
+
+def _plan_bundle(config: Config, add) -> None:
+    add("bundle", "remotion", "bundle", "Remotion bundle", cached=_bundle_cached(config), units=1)
+
+
+def _plan_remotion(spec, config, add, frames, costs, shards) -> None:
+    from .remotion_shards import plan_shards
+
+    _plan_bundle(config, add)
+    fps = spec.video.fps
+    ranges = plan_shards(spec, shards) if shards > 1 else []
+    if len(ranges) > 1:
+        for k, (first, last) in enumerate(ranges):
+            n = frames((last - first + 1) / fps)
+            add(
+                f"shard:{k}", "remotion", "remotion", f"frames {first}-{last}", ["bundle"],
+                units=n, temp=costs.video_bytes(n),
+            )
+        add(
+            "render", "ffmpeg", "mux", f"join {len(ranges)} shards",
+            [f"shard:{k}" for k in range(len(ranges))], units=frames(spec.timeline.duration),
+        )
+        return
+    n = frames(spec.timeline.total_frames / fps)
+    add("render", "remotion", "remotion", "Remotion composition", ["bundle"], units=n)
+
+
+def _plan_exports(spec, add, last: str, streaming: bool = True) -> None:
+    """Steps 6-7: platform variants and ABR renditions from the final file."""
+    from ..export.fanout import resolve_presets
+    from ..export.ladder import resolve_ladder
+
+    duration = spec.timeline.duration
+    for name, preset in resolve_presets(spec.export.platforms).items():
+        w, h = preset.resolution
+        n = w * h / 1e6 * preset.fps * duration
+        add(f"variant:{name}", "ffmpeg", "variant", f"{name} variant", [last], units=n)
+    if streaming and spec.export.streaming:
+        rungs = resolve_ladder(spec.export.renditions)
+        n = sum(r.resolution[0] * r.resolution[1] / 1e6 * r.fps * duration for r in rungs)
+        add(
+            "abr", "ffmpeg", "abr",
+            f"{'/'.join(spec.export.streaming)} ladder, {len(rungs)} rendition(s)", [last],
+            units=n,
+        )
@@ -0,0 +1,289 @@
+"""Subprocess runner for ffmpeg, ffprobe and npx.
+
+Every external tool runs through ``run_process``:
+
+- its diagnostic output is streamed into a bounded ring buffer (only the tail is
+  kept, as bytes, and decoded once for error messages), so a chatty hour-long
+  encode costs no memory;
+- the timeout scales with the content being processed (``scaled_timeout``);
+- on timeout, cancel or interrupt the whole process group is killed, so nothing
+  keeps running in the background;
+- optional ``nice`` and CPU affinity keep a packed render host responsive.
+
+Cancellation is picked up from the caller's ``cancel`` event, or from the one set
+for the current thread with ``cancel_scope`` (the render scheduler does this for
+each task), so deep call chains need not pass it along. ``thread_budget`` works the
+same way for the number of threads each FFmpeg process may use.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from .jobs import POLL_INTERVAL, RenderCancelled
+
+logger = logging.getLogger(__name__)
+
+TAIL_BYTES = 64 * 1024
+DEFAULT_TIMEOUT = 600.0
+DEFAULT_TIMEOUT_PER_SECOND = 10.0  # seconds allowed per second of content
+# How long to wait for the output readers once the process has exited; a grandchild
+# that inherited the pipes (and outlives its parent) would otherwise block forever
+READER_JOIN_TIMEOUT = 5.0
+
+
+class ProcessTimeout(RuntimeError):
+    """A process ran longer than its timeout and was killed."""
+
+
+@dataclass
+class ProcessSettings:
+    """Limits applied to every process started by ``run_process``."""
+
+    timeout: float = DEFAULT_TIMEOUT
+    timeout_per_second: float = DEFAULT_TIMEOUT_PER_SECOND
+    nice: int = 0
+    cpus: frozenset[int] | None = None
+
+
+def parse_cpu_list(value: str) -> frozenset[int] | None:
+    """Parse a CPU list such as ``0-3,6`` (as taken by ``taskset -c``); empty -> None."""
+    cpus: set[int] = set()
+    for part in value.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        try:
+            cpus.update(range(int(first), int(last or first) + 1))
+        except ValueError:
+            raise ValueError(f"Invalid CPU list: {value!r} (e.g. 0-3,6)") from None
+    return frozenset(cpus) or None
+
+
+_settings: ProcessSettings | None = None
+_settings_lock = threading.Lock()
+
+
+def process_settings() -> ProcessSettings:
+    """Process limits from the configuration (``VIDEOFORGE_FFMPEG_TIMEOUT`` etc.)."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            from ..config import Config
+
+            config = Config.load()
+            _settings = ProcessSettings(
+                timeout=config.ffmpeg_timeout,
+                timeout_per_second=config.ffmpeg_timeout_per_second,
+                nice=config.process_nice,
+                cpus=parse_cpu_list(config.process_cpus),
+            )
+        return _settings
+
+
+def scaled_timeout(duration: float | None = None) -> float:
+    """Timeout for processing ``duration`` seconds of content (the base if unknown)."""
+    settings = process_settings()
+    return settings.timeout + settings.timeout_per_second * max(0.0, duration or 0.0)
+
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def cancel_scope(cancel: threading.Event | None) -> Iterator[None]:
+    """Make ``cancel`` the default cancel event of processes started in this thread."""
+    previous = getattr(_local, "cancel", None)
+    _local.cancel = cancel
+    try:
+        yield
+    finally:
+        _local.cancel = previous
+
+
+def current_cancel() -> threading.Event | None:
+    """The cancel event set for this thread by ``cancel_scope``, if any."""
+    return getattr(_local, "cancel", None)
+
+
+@contextlib.contextmanager
+def thread_budget(threads: int | None) -> Iterator[None]:
+    """Limit FFmpeg processes started in this thread to ``threads`` threads each."""
+    previous = getattr(_local, "threads", None)
+    _local.threads = threads
+    try:
+        yield
+    finally:
+        _local.threads = previous
+
+
+def current_threads() -> int | None:
+    """The per-process thread budget set for this thread by ``thread_budget``, if any."""
+    return getattr(_local, "threads", None)
+
+
+class OutputTail:
+    """Keeps the last ``limit`` bytes written to it."""
+
+    def __init__(self, limit: int = TAIL_BYTES):
+        self.limit = limit
+        self._buf = bytearray()
+        self.truncated = False
+
+    def write(self, data: bytes) -> None:
+        self._buf += data
+        if len(self._buf) > 2 * self.limit:  # trim in batches, not on every chunk
+            del self._buf[:-self.limit]
+            self.truncated = True
+
+    def text(self) -> str:
+        data = bytes(self._buf[-self.limit:])
+        if self.truncated or len(self._buf) > self.limit:
+            data = data.partition(b"\n")[2] or data  # drop the cut-off first line
+        return data.decode("utf-8", errors="replace")
+
+
+def _pump(stream, sink) -> None:
+    """Copy ``stream`` into ``sink`` (a callable taking bytes) until EOF."""
+    with stream:
+        for chunk in iter(lambda: stream.read1(65536), b""):
+            sink(chunk)
+
+
+def run_process(
+    cmd: list[str],
+    cwd: Path | None = None,
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
+    capture_stdout: bool = False,
+    name: str | None = None,
+) -> subprocess.CompletedProcess:
+    """Run ``cmd`` to completion and return its exit code and output.
+
+    Args:
+        cmd: Command and arguments.
+        cwd: Working directory.
+        timeout: Seconds before the process is killed (default: the base timeout).
+        cancel: Kills the process when set; defaults to ``current_cancel()``.
+        capture_stdout: Return stdout (decoded) in ``stdout``; otherwise stdout is
+            merged into the diagnostic tail.
+        name: Tool name for messages (default: the executable's name).
+
+    Returns:
+        A ``CompletedProcess`` whose ``stderr`` is the tail of the diagnostic output.
+        A non-zero exit code is not an error here; callers decide.
+
+    Raises:
+        ProcessTimeout: The process ran past ``timeout``.
+        RenderCancelled: ``cancel`` was set.
+    """
+    settings = process_settings()
+    name = name or Path(cmd[0]).stem
+    timeout = settings.timeout if timeout is None else timeout
+    cancel = cancel or current_cancel()
+    tail = OutputTail()
+    out = bytearray()
+
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE if capture_stdout else subprocess.STDOUT,
+        **new_process_group(settings),
+    )
+    readers = [threading.Thread(target=_pump, args=(proc.stdout, tail.write), daemon=True)]
+    if capture_stdout:
+        readers = [
+            threading.Thread(target=_pump, args=(proc.stdout, out.extend), daemon=True),
+            threading.Thread(target=_pump, args=(proc.stderr, tail.write), daemon=True),
+        ]
+    for reader in readers:
+        reader.start()
+
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                proc.wait(timeout=POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if cancel is not None and cancel.is_set():
+                raise RenderCancelled(f"{name} cancelled")
+            if time.monotonic() >= deadline:
+                raise ProcessTimeout(f"{name} timed out after {timeout:.0f}s")
+    finally:
+        if proc.poll() is None:
+            kill_tree(proc)
+        for reader in readers:
+            reader.join(READER_JOIN_TIMEOUT)
+        if any(reader.is_alive() for reader in readers):
+            # Closing the pipes here would block on the reader's buffer; the reader
+            # closes its pipe itself once the last holder exits
+            logger.warning("%s exited but a child still holds its output open", name)
+
+    stdout = out.decode("utf-8", errors="replace") if capture_stdout else None
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, tail.text())
+
+
+def new_process_group(settings: ProcessSettings | None = None) -> dict:
+    """Popen kwargs that put the child in its own process group / session.
+
+    On POSIX the child also gets the nice level and CPU affinity of ``settings``
+    (default: ``process_settings()``) before it executes, so every thread it starts
+    inherits them.
+    """
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    kwargs: dict = {"start_new_session": True}
+    limits = _limits(settings or process_settings())
+    if limits is not None:
+        kwargs["preexec_fn"] = limits
+    return kwargs
+
+
+def kill_tree(proc: subprocess.Popen) -> None:
+    """Kill a process and everything it spawned (npx -> node -> browser)."""
+    if sys.platform == "win32":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True, check=False
+        )
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    proc.wait()
+
+
+def _limits(settings: ProcessSettings) -> Callable[[], None] | None:
+    """A ``preexec_fn`` applying the nice level and CPU affinity, or None if unset.
+
+    Runs in the forked child, where logging is unsafe; a limit the system refuses
+    is skipped.
+    """
+    nice = settings.nice if hasattr(os, "setpriority") else 0
+    cpus = settings.cpus if hasattr(os, "sched_setaffinity") else None
+    if not (nice or cpus):
+        return None
+
+    def limit() -> None:
+        if nice:
+            with contextlib.suppress(OSError):
+                os.setpriority(os.PRIO_PROCESS, 0, nice)
+        if cpus:
+            with contextlib.suppress(OSError):
+                os.sched_setaffinity(0, cpus)
+
+    return limit
@@ -2,17 +2,37 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
-import subprocess
+import os
 import shutil
+import tempfile
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from ..schema import VideoSpec
+from .jobs import remotion_slots
+from .output import atomic_output
+from .process import run_process
+from .remotion_worker import RemotionWorker, job_timeout
+
+if TYPE_CHECKING:
+    from ..schema import VideoSpec
 
 logger = logging.getLogger(__name__)
 
 REMOTION_DIR = Path(__file__).resolve().parent.parent.parent.parent / "remotion"
+ENTRY_POINT = "src/index.ts"
+
+# Files whose contents determine the webpack bundle
+BUNDLE_INPUTS = ("src", "package-lock.json", "package.json", "tsconfig.json", "remotion.config.ts")
+# Older bundles beyond this many are pruned after a new one is built
+BUNDLES_TO_KEEP = 3
+# Bundles replaced by a rebuild may still be read by running renders; they are
+# pruned once they have been retired this long
+RETIRED_BUNDLE_SECONDS = 24 * 3600.0
 
 
 def find_remotion_dir() -> Path:
@@ -34,15 +54,157 @@ def is_remotion_installed() -> bool:
         return False
 
 
+def bundle_hash(remotion_dir: Path | None = None) -> str:
+    """Hash the Remotion sources and lockfile that go into the webpack bundle."""
+    remotion_dir = remotion_dir or find_remotion_dir()
+    h = hashlib.sha256()
+    for name in BUNDLE_INPUTS:
+        root = remotion_dir / name
+        files = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else [root]
+        for f in files:
+            if not f.exists():
+                continue
+            h.update(f.relative_to(remotion_dir).as_posix().encode())
+            h.update(b"\0")
+            h.update(f.read_bytes())
+            h.update(b"\0")
+    return h.hexdigest()[:24]
+
+
+def _bundle_root(cache_dir: Path | None) -> Path:
+    if cache_dir is None:
+        from ..config import Config
+
+        cache_dir = Config.load().cache_dir
+    return Path(cache_dir) / "remotion-bundles"
+
+
+def cached_bundle(cache_dir: Path | None = None) -> Path | None:
+    """Return the cached bundle for the current sources, or None if it isn't built."""
+    bundle_dir = _bundle_root(cache_dir) / bundle_hash()
+    return bundle_dir if (bundle_dir / "index.html").exists() else None
+
+
+def ensure_bundle(cache_dir: Path | None = None, force: bool = False) -> Path:
+    """Bundle the Remotion project once and return the cached bundle directory.
+
+    The bundle is keyed by a hash of ``remotion/src`` and the lockfile, so it is
+    rebuilt only when the compositions or dependencies change. Renders pass the
+    bundle directory as their serve URL and skip webpack entirely.
+
+    A rebuild (``force``) is built beside the bundle and renamed into place; the
+    bundle it replaces is moved aside and pruned later, so renders still reading
+    it are not broken.
+    """
+    remotion_dir = find_remotion_dir()
+    root = _bundle_root(cache_dir)
+    bundle_dir = root / bundle_hash(remotion_dir)
+    if not force and (bundle_dir / "index.html").exists():
+        return bundle_dir
+
+    if not is_remotion_installed():
+        raise RuntimeError(
+            "Remotion dependencies not installed. Run: cd remotion && npm install"
+        )
+    npx = shutil.which("npx")
+    if not npx:
+        raise RuntimeError("npx not found. Please install Node.js.")
+
+    root.mkdir(parents=True, exist_ok=True)
+    build_dir = Path(tempfile.mkdtemp(prefix=".bundle_", dir=root))
+    cmd = [npx, "remotion", "bundle", ENTRY_POINT, "--out-dir", str(build_dir)]
+    logger.info("Remotion bundle command: %s", " ".join(cmd))
+
+    try:
+        result = run_process(cmd, cwd=remotion_dir, name="Remotion bundle")
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Remotion bundle failed (exit {result.returncode}):\n{result.stderr[-500:]}"
+            )
+        if bundle_dir.exists() and (force or not (bundle_dir / "index.html").exists()):
+            _retire_bundle(bundle_dir)
+        try:
+            os.replace(build_dir, bundle_dir)
+        except OSError:
+            # Another process finished the same bundle first; use theirs
+            logger.info("Bundle %s already present.", bundle_dir.name)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    _prune_bundles(root, keep=bundle_dir)
+    logger.info("Remotion bundle ready: %s", bundle_dir)
+    return bundle_dir
+
+
+def _retire_bundle(bundle_dir: Path) -> None:
+    """Move a bundle out of the way of its rebuild; ``_prune_bundles`` removes it later."""
+    retired = Path(tempfile.mkdtemp(prefix=f".retired_{bundle_dir.name}_", dir=bundle_dir.parent))
+    try:
+        os.replace(bundle_dir, retired / bundle_dir.name)
+    except OSError as e:
+        logger.debug("Could not retire bundle %s: %s", bundle_dir.name, e)
+    os.utime(retired)  # retirement time, for pruning
+
+
+def _prune_bundles(root: Path, keep: Path) -> None:
+    """Remove all but the most recent bundles, and bundles retired long enough ago."""
+    bundles = sorted(
+        (p for p in root.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in bundles[BUNDLES_TO_KEEP:]:
+        if old != keep:
+            shutil.rmtree(old, ignore_errors=True)
+    cutoff = time.time() - RETIRED_BUNDLE_SECONDS
+    for retired in root.glob(".retired_*"):
+        if retired.stat().st_mtime < cutoff:
+            shutil.rmtree(retired, ignore_errors=True)
+
+
+def serve_url_args(use_bundle: bool = True, cache_dir: Path | None = None) -> list[str]:
+    """Serve-URL argument for ``remotion render``: the cached bundle, if usable."""
+    if not use_bundle:
+        return []
+    try:
+        return [str(ensure_bundle(cache_dir))]
+    except RuntimeError as e:
+        logger.warning("Remotion bundle cache unavailable, bundling per render: %s", e)
+        return []
+
+
+def scene_frame_ranges(spec: VideoSpec) -> list[tuple[int, int]]:
+    """Frame range [start, end) of each scene, matching VideoForgeComposition.tsx.
+
+    Taken from the spec's compiled timeline, whose per-scene frame counts are also
+    passed to the composition (``scene_frames``) so both sides cut on the same frames.
+    """
+    return spec.timeline.frame_ranges()
+
+
+def total_frames(spec: VideoSpec) -> int:
+    """Total composition length in frames."""
+    return spec.timeline.total_frames
+
+
 def videospec_to_props(spec: VideoSpec) -> dict:
     """Convert a VideoSpec to Remotion input props (JSON-serializable dict)."""
-    return spec.model_dump(mode="json", exclude_none=True)
+    props = spec.model_dump(mode="json", exclude_none=True)
+    props["scene_frames"] = spec.timeline.frames
+    return props
 
 
 def render_with_remotion(
     spec: VideoSpec,
     output_path: Path,
     composition_id: str = "VideoForgeComposition",
+    use_bundle: bool = True,
+    cache_dir: Path | None = None,
+    worker: RemotionWorker | None = None,
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
+    muted: bool = False,
+    base_dir: Path | None = None,
 ) -> Path:
     """Render a video using Remotion.
 
@@ -50,74 +212,62 @@ def render_with_remotion(
         spec: The VideoSpec to render.
         output_path: Where to save the output video.
         composition_id: Remotion composition ID to render.
+        use_bundle: Render from the cached pre-built bundle instead of re-bundling.
+        cache_dir: Root cache directory for bundles. Defaults to the configured one.
+        worker: Persistent render worker to use instead of spawning ``npx``.
+        timeout: Seconds before the render is killed. Defaults to the process
+            timeout scaled to the video's length (``VIDEOFORGE_FFMPEG_TIMEOUT`` plus
+            ``VIDEOFORGE_FFMPEG_TIMEOUT_PER_SECOND`` per second).
+        cancel: Set this event to abort the render (the process tree is killed).
+        muted: Leave out the audio track (for clips that are muxed with audio later).
+        base_dir: Base directory for resolving relative asset paths. Local assets
+            are served to the browser over a local HTTP server during the render.
 
     Returns:
         Path to the rendered video.
     """
-    remotion_dir = find_remotion_dir()
-
-    if not is_remotion_installed():
-        raise RuntimeError(
-            "Remotion dependencies not installed. Run: cd remotion && npm install"
-        )
-
-    # Write props to temp JSON file
-    props = videospec_to_props(spec)
-    props_file = remotion_dir / ".tmp_props.json"
-    props_file.write_text(json.dumps(props, ensure_ascii=False), encoding="utf-8")
+    from .asset_server import serve_spec_assets
 
-    # Calculate total frames
     fps = spec.video.fps
-    total_frames = sum(int(s.duration * fps) for s in spec.scenes)
+    frame_count = total_frames(spec)
     width, height = spec.video.resolution
 
-    output_path = Path(output_path).resolve()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    try:
-        npx = shutil.which("npx")
-        if not npx:
-            raise RuntimeError("npx not found. Please install Node.js.")
-
-        cmd = [
-            npx, "remotion", "render",
+    with serve_spec_assets(spec, videospec_to_props(spec), base_dir, cache_dir) as props:
+        return _render(
             composition_id,
-            str(output_path),
-            "--props", str(props_file),
-            "--width", str(width),
-            "--height", str(height),
-            "--fps", str(fps),
-            "--frames", f"0-{total_frames - 1}",
-            "--codec", "h264",
-        ]
-
-        logger.info("Remotion render command: %s", " ".join(cmd))
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=remotion_dir,
-            timeout=600,
+            props,
+            output_path,
+            use_bundle=use_bundle,
+            cache_dir=cache_dir,
+            worker=worker,
+            timeout=timeout,
+            cancel=cancel,
+            cli_args=[
+                "--width", str(width),
+                "--height", str(height),
+                "--fps", str(fps),
+                "--frames", f"0-{frame_count - 1}",
+                *(["--muted"] if muted else []),
+            ],
+            overrides={
+                "width": width,
+                "height": height,
+                "fps": fps,
+                "durationInFrames": frame_count,
+                "muted": muted,
+            },
         )
 
-        if result.returncode != 0:
-            logger.error("Remotion stderr:\n%s", result.stderr)
-            raise RuntimeError(
-                f"Remotion render failed (exit {result.returncode}):\n{result.stderr[-500:]}"
-            )
-
-        logger.info("Remotion render complete: %s", output_path)
-        return output_path
-
-    finally:
-        props_file.unlink(missing_ok=True)
-
 
 def render_template(
     template_id: str,
     props: dict,
     output_path: Path,
+    use_bundle: bool = True,
+    cache_dir: Path | None = None,
+    worker: RemotionWorker | None = None,
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
 ) -> Path:
     """Render a pre-built Remotion template.
 
@@ -125,10 +275,48 @@ def render_template(
         template_id: Composition ID (e.g. "YouTubeIntro", "TikTokShort").
         props: Template-specific props.
         output_path: Where to save the output.
+        use_bundle: Render from the cached pre-built bundle instead of re-bundling.
+        cache_dir: Root cache directory for bundles. Defaults to the configured one.
+        worker: Persistent render worker to use instead of spawning ``npx``.
+        timeout: Seconds before the render is killed. Defaults to the base process
+            timeout (``VIDEOFORGE_FFMPEG_TIMEOUT``), as the length is up to the template.
+        cancel: Set this event to abort the render (the process tree is killed).
 
     Returns:
         Path to the rendered video.
     """
+    return _render(
+        template_id,
+        props,
+        output_path,
+        use_bundle=use_bundle,
+        cache_dir=cache_dir,
+        worker=worker,
+        timeout=timeout,
+        cancel=cancel,
+    )
+
+
+def _render(
+    composition_id: str,
+    props: dict,
+    output_path: Path,
+    use_bundle: bool,
+    cache_dir: Path | None,
+    worker: RemotionWorker | None,
+    timeout: float | None,
+    cancel: threading.Event | None,
+    cli_args: list[str] | None = None,
+    overrides: dict | None = None,
+) -> Path:
+    """Render one composition in its own job directory.
+
+    The render process holds one of the machine's Remotion slots while it runs (a
+    worker takes it only once the job is its turn). Every job gets a private
+    directory for its props file and logs, and writes its output beside the
+    destination before renaming it into place, so any number of renders can run
+    concurrently on one machine.
+    """
     remotion_dir = find_remotion_dir()
 
     if not is_remotion_installed():
@@ -136,44 +324,60 @@ def render_template(
             "Remotion dependencies not installed. Run: cd remotion && npm install"
         )
 
-    props_file = remotion_dir / ".tmp_props.json"
-    props_file.write_text(json.dumps(props, ensure_ascii=False), encoding="utf-8")
-
     output_path = Path(output_path).resolve()
     output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    try:
-        npx = shutil.which("npx")
-        if not npx:
-            raise RuntimeError("npx not found.")
-
-        cmd = [
-            npx, "remotion", "render",
-            template_id,
-            str(output_path),
-            "--props", str(props_file),
-            "--codec", "h264",
-        ]
-
-        logger.info("Remotion template render: %s", " ".join(cmd))
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=remotion_dir,
-            timeout=600,
-        )
-
-        if result.returncode != 0:
-            raise RuntimeError(
-                f"Remotion render failed:\n{result.stderr[-500:]}"
-            )
-
-        return output_path
-
-    finally:
-        props_file.unlink(missing_ok=True)
+    timeout = job_timeout(overrides or {}) if timeout is None else timeout
+
+    with atomic_output(output_path) as partial:
+        if worker is not None:
+            job = {
+                "serveUrl": str(ensure_bundle(cache_dir)),
+                "composition": composition_id,
+                "props": props,
+                "output": str(partial),
+                "codec": "h264",
+                **(overrides or {}),
+            }
+            logger.info("Remotion worker render: %s -> %s", composition_id, output_path)
+            worker.render(job, timeout=timeout, cancel=cancel)
+        else:
+            npx = shutil.which("npx")
+            if not npx:
+                raise RuntimeError("npx not found. Please install Node.js.")
+            serve_url = serve_url_args(use_bundle, cache_dir)
+
+            with tempfile.TemporaryDirectory(prefix="videoforge_remotion_") as job_dir:
+                props_file = Path(job_dir) / "props.json"
+                props_file.write_text(json.dumps(props, ensure_ascii=False), encoding="utf-8")
+                cmd = [
+                    npx, "remotion", "render",
+                    *serve_url,
+                    composition_id,
+                    str(partial),
+                    "--props", str(props_file),
+                    *(cli_args or []),
+                    "--codec", "h264",
+                ]
+                logger.info("Remotion render command: %s", " ".join(cmd))
+                with remotion_slots().acquire(cancel=cancel):
+                    _run_job(cmd, remotion_dir, timeout, cancel)
+
+    logger.info("Remotion render complete: %s", output_path)
+    return output_path
+
+
+def _run_job(
+    cmd: list[str],
+    cwd: Path,
+    timeout: float,
+    cancel: threading.Event | None,
+) -> None:
+    """Run a Remotion CLI process, killing its whole process tree on timeout or cancel."""
+    result = run_process(cmd, cwd=cwd, timeout=timeout, cancel=cancel, name="Remotion render")
+    if result.returncode != 0:
+        tail = result.stderr[-500:]
+        logger.error("Remotion output:\n%s", result.stderr)
+        raise RuntimeError(f"Remotion render failed (exit {result.returncode}):\n{tail}")
 
 
 def list_compositions() -> list[str]:
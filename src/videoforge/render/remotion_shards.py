@@ -0,0 +1,220 @@
+"""Frame-range sharded Remotion rendering.
+
+A VideoSpec render is split into contiguous frame ranges on scene boundaries, each
+shard is rendered by its own Node worker (on this host or on several hosts sharing
+``work_dir``), and the shard files are joined with the concat demuxer. Shards are
+rendered without audio; the BGM bed is muxed once over the joined video, so there
+are no audio gaps or clicks at the shard boundaries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ..schema import VideoSpec
+from .asset_server import resolve_local, serve_spec_assets
+from .audio import prepare_bgm
+from .ffmpeg import mux_final
+from .output import atomic_output
+from .remotion import ensure_bundle, scene_frame_ranges, videospec_to_props
+from .remotion_worker import RemotionWorker
+
+logger = logging.getLogger(__name__)
+
+
+def plan_shards(spec: VideoSpec, shards: int) -> list[tuple[int, int]]:
+    """Split the composition into at most ``shards`` inclusive frame ranges.
+
+    Cuts fall on the scene boundary closest to each equal split, so every shard
+    holds whole scenes. Specs with fewer scenes than ``shards`` get fewer shards.
+    """
+    ranges = [r for r in scene_frame_ranges(spec) if r[1] > r[0]]
+    if not ranges:
+        return []
+    total = ranges[-1][1]
+    boundaries = [start for start, _ in ranges[1:]]
+    shards = max(1, min(shards, len(ranges)))
+
+    cuts = [0]
+    for k in range(1, shards):
+        ideal = total * k / shards
+        candidates = [b for b in boundaries if b > cuts[-1]]
+        if not candidates:
+            break
+        cuts.append(min(candidates, key=lambda b: abs(b - ideal)))
+    cuts.append(total)
+    return [(cuts[i], cuts[i + 1] - 1) for i in range(len(cuts) - 1)]
+
+
+def spec_digest(spec: VideoSpec) -> str:
+    """Short content hash of the spec, used to keep shards of different specs apart."""
+    props = json.dumps(videospec_to_props(spec), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(props.encode()).hexdigest()[:12]
+
+
+def shard_path(work_dir: Path, spec: VideoSpec, index: int, count: int) -> Path:
+    """Deterministic shard file name, so hosts sharing ``work_dir`` agree on it."""
+    return Path(work_dir) / f"shard_{spec_digest(spec)}_{index:03d}_of_{count:03d}.mp4"
+
+
+def render_shard(
+    spec: VideoSpec,
+    index: int,
+    shards: int,
+    work_dir: Path,
+    concurrency: int | None = None,
+    worker: RemotionWorker | None = None,
+    cache_dir: Path | None = None,
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
+    base_dir: Path | None = None,
+) -> Path | None:
+    """Render one shard of ``spec`` into ``work_dir``.
+
+    An already-rendered shard is reused, so a shared work directory doubles as a
+    checkpoint. Returns None if ``index`` is beyond the effective shard count.
+    The render holds one of this host's Remotion slots while it runs, and local
+    assets (relative to ``base_dir``) are served to it over a local HTTP server.
+    """
+    plan = plan_shards(spec, shards)
+    if index >= len(plan):
+        logger.info("Shard %d skipped: spec only splits into %d shard(s).", index, len(plan))
+        return None
+
+    first, last = plan[index]
+    target = shard_path(work_dir, spec, index, len(plan))
+    if target.exists():
+        logger.info("Shard %d/%d already rendered: %s", index + 1, len(plan), target.name)
+        return target
+
+    width, height = spec.video.resolution
+    job = {
+        "serveUrl": str(ensure_bundle(cache_dir)),
+        "composition": "VideoForgeComposition",
+        "codec": "h264",
+        "width": width,
+        "height": height,
+        "fps": spec.video.fps,
+        "durationInFrames": plan[-1][1] + 1,
+        "frameRange": [first, last],
+        "muted": True,  # the audio is muxed once over the joined shards
+    }
+    if concurrency:
+        job["concurrency"] = concurrency
+
+    logger.info("Rendering shard %d/%d: frames %d-%d", index + 1, len(plan), first, last)
+    owned = worker is None
+    worker = worker or RemotionWorker()
+    try:
+        with serve_spec_assets(spec, videospec_to_props(spec), base_dir, cache_dir) as props, \
+                atomic_output(target) as partial:
+            worker.render(
+                {**job, "props": props, "output": str(partial.resolve())},
+                timeout=timeout,
+                cancel=cancel,
+            )
+    finally:
+        if owned:
+            worker.close()
+    return target
+
+
+def shard_audio(
+    spec: VideoSpec, duration: float, base_dir: Path | None, cache_dir: Path | None
+) -> Path | None:
+    """The spec's BGM bed, ``duration`` seconds long, or None without BGM."""
+    bgm = spec.audio.bgm
+    if not (bgm and bgm.source):
+        return None
+    source = resolve_local(bgm.source, base_dir)
+    if source is None:
+        logger.warning("BGM file not found: %s", bgm.source)
+        return None
+    return prepare_bgm(source, bgm, duration, cache_dir=cache_dir)
+
+
+def join_shards(
+    spec: VideoSpec,
+    shards: int,
+    work_dir: Path,
+    output_path: Path,
+    base_dir: Path | None = None,
+    cache_dir: Path | None = None,
+) -> Path:
+    """Concatenate all shards of ``spec`` from ``work_dir`` into ``output_path``.
+
+    The BGM bed (relative to ``base_dir``; cached under ``cache_dir``) is muxed in
+    the same pass.
+    """
+    plan = plan_shards(spec, shards)
+    parts = [shard_path(work_dir, spec, i, len(plan)) for i in range(len(plan))]
+    missing = [p.name for p in parts if not p.exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing shard(s) in {work_dir}: {', '.join(missing)}")
+
+    duration = (plan[-1][1] + 1) / spec.video.fps if plan else 0.0
+    bed = shard_audio(spec, duration, base_dir, cache_dir)
+    output_path = Path(output_path)
+    with atomic_output(output_path) as partial:
+        mux_final(partial, parts, audio_path=bed, work_dir=Path(work_dir), duration=duration)
+    logger.info("Joined %d shard(s) into %s", len(parts), output_path)
+    return output_path
+
+
+def render_sharded(
+    spec: VideoSpec,
+    output_path: Path,
+    shards: int = 4,
+    concurrency: int | None = None,
+    work_dir: Path | None = None,
+    cache_dir: Path | None = None,
+    timeout: float | None = None,
+    base_dir: Path | None = None,
+) -> Path:
+    """Render ``spec`` with Remotion as parallel shards and join them.
+
+    Args:
+        spec: The VideoSpec to render.
+        output_path: Where to save the output video.
+        shards: Number of shards (and Node worker processes).
+        concurrency: Browser tabs per shard (Remotion ``concurrency``).
+        work_dir: Directory for shard files. A shared directory lets other hosts
+            render shards too (``videoforge remotion shard``); a temp dir otherwise.
+        cache_dir: Root cache directory for the Remotion bundle.
+        timeout: Seconds each shard may take before it is killed (default: the
+            process timeout scaled to the shard's length).
+        base_dir: Base directory for resolving relative asset paths.
+
+    Returns:
+        Path to the rendered video.
+    """
+    plan = plan_shards(spec, shards)
+    if not plan:
+        raise ValueError("VideoSpec has no frames to render")
+    ensure_bundle(cache_dir)  # build once before the shards race for it
+
+    def run(directory: Path) -> Path:
+        with ThreadPoolExecutor(max_workers=len(plan)) as pool:
+            futures = [
+                pool.submit(
+                    render_shard, spec, i, len(plan), directory,
+                    concurrency=concurrency, cache_dir=cache_dir, timeout=timeout,
+                    base_dir=base_dir,
+                )
+                for i in range(len(plan))
+            ]
+            for f in futures:
+                f.result()
+        return join_shards(spec, len(plan), directory, output_path, base_dir, cache_dir)
+
+    if work_dir is not None:
+        Path(work_dir).mkdir(parents=True, exist_ok=True)
+        return run(Path(work_dir))
+    with tempfile.TemporaryDirectory(prefix="videoforge_shards_") as tmpdir:
+        return run(Path(tmpdir))
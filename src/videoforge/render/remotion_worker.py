@@ -0,0 +1,269 @@
+"""Persistent Remotion render worker - a long-lived Node process with a warm browser.
+
+Spawning ``npx remotion render`` per job pays for Node startup, npx resolution and
+a browser launch every time. ``RemotionWorker`` starts ``remotion/worker.mjs`` once
+and sends it jobs as newline-delimited JSON over stdin/stdout.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import logging
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import Self
+
+from .jobs import POLL_INTERVAL, RenderCancelled, remotion_slots
+from .process import ProcessTimeout, kill_tree, new_process_group, scaled_timeout
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = "worker.mjs"
+STARTUP_TIMEOUT = 60.0
+STDERR_TAIL_LINES = 50  # kept for error messages when the worker fails to start
+
+
+class WorkerCrashed(RuntimeError):
+    """The Node worker exited or closed its pipes while a job was running."""
+
+
+def job_timeout(job: dict) -> float:
+    """Timeout for a render job, scaled to the length of video it renders."""
+    fps = job.get("fps")
+    if "frameRange" in job:
+        first, last = job["frameRange"]
+        frames = last - first + 1
+    else:
+        frames = job.get("durationInFrames")
+    return scaled_timeout(frames / fps if frames and fps else None)
+
+
+class RemotionWorker:
+    """Client for a persistent Node render worker.
+
+    The worker is started lazily on the first job and restarted automatically if it
+    dies; a job interrupted by a crash is retried once on a fresh worker. Jobs on one
+    worker run sequentially; use several workers for parallel renders.
+
+    Usage:
+        with RemotionWorker() as worker:
+            worker.render({"serveUrl": ..., "composition": "YouTubeIntro", ...})
+    """
+
+    def __init__(self, remotion_dir: Path | None = None, node: str | None = None):
+        self._remotion_dir = remotion_dir
+        self._node = node
+        self._proc: subprocess.Popen | None = None
+        self._messages: queue.Queue[dict | None] = queue.Queue()
+        self._stderr: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.restarts = 0
+
+    # --- lifecycle ---
+
+    def start(self) -> None:
+        """Start the Node worker if it is not already running."""
+        if self._proc is not None and self._proc.poll() is None:
+            return
+
+        from .remotion import find_remotion_dir
+
+        remotion_dir = self._remotion_dir or find_remotion_dir()
+        if not (remotion_dir / "node_modules").exists():
+            raise RuntimeError(
+                "Remotion dependencies not installed. Run: cd remotion && npm install"
+            )
+        node = self._node or shutil.which("node")
+        if not node:
+            raise RuntimeError("node not found. Please install Node.js.")
+
+        if self._proc is not None:
+            self.restarts += 1
+            logger.warning("Restarting Remotion worker (restart #%d)", self.restarts)
+
+        self._messages = queue.Queue()
+        self._stderr = deque(maxlen=STDERR_TAIL_LINES)
+        self._proc = subprocess.Popen(
+            [node, str(remotion_dir / WORKER_SCRIPT)],
+            cwd=remotion_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            **new_process_group(),  # so node and its headless browser die together
+        )
+        threading.Thread(
+            target=self._read_stdout, args=(self._proc, self._messages), daemon=True
+        ).start()
+        threading.Thread(
+            target=self._drain_stderr, args=(self._proc, self._stderr), daemon=True
+        ).start()
+
+        try:
+            ready = self._next_message(self._messages, time.monotonic() + STARTUP_TIMEOUT)
+        except TimeoutError:
+            self._kill()
+            tail = "".join(self._stderr)[-500:]
+            raise RuntimeError(
+                f"Remotion worker did not start within {STARTUP_TIMEOUT:.0f}s:\n{tail}"
+            ) from None
+        if ready.get("event") != "ready":
+            raise WorkerCrashed(f"Unexpected worker handshake: {ready}")
+        logger.info("Remotion worker started (pid %s)", ready.get("pid"))
+
+    def close(self) -> None:
+        """Ask the worker to shut down, killing it if it does not exit promptly."""
+        proc, self._proc = self._proc, None
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            proc.stdin.write(json.dumps({"type": "shutdown"}) + "\n")
+            proc.stdin.flush()
+            proc.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            kill_tree(proc)
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    # --- jobs ---
+
+    def render(
+        self,
+        job: dict,
+        timeout: float | None = None,
+        on_progress: Callable[[float], None] | None = None,
+        cancel: threading.Event | None = None,
+    ) -> Path:
+        """Render one job and return its output path.
+
+        Args:
+            job: Render job fields (see ``remotion/worker.mjs``); ``type`` and ``id``
+                are filled in.
+            timeout: Seconds to wait for the job; the worker is killed on expiry.
+                Defaults to ``job_timeout(job)``.
+            on_progress: Called with progress in [0, 1] as frames are rendered.
+            cancel: Set this event to abort the job. The worker is killed (it cannot
+                interrupt a render midway) and restarts on the next job.
+
+        The job takes one of the machine's Remotion slots (``remotion_slots``) only
+        once it has the worker, so callers queued behind it hold no slot.
+        """
+        timeout = job_timeout(job) if timeout is None else timeout
+        with self._lock, remotion_slots().acquire(cancel=cancel):
+            try:
+                return self._render_once(job, timeout, on_progress, cancel)
+            except WorkerCrashed as e:
+                logger.warning("Remotion worker crashed (%s); retrying job once.", e)
+                self._kill()
+                return self._render_once(job, timeout, on_progress, cancel)
+
+    def _render_once(
+        self,
+        job: dict,
+        timeout: float,
+        on_progress: Callable[[float], None] | None,
+        cancel: threading.Event | None = None,
+    ) -> Path:
+        self.start()
+        job_id = str(next(self._ids))
+        message = {**job, "type": "render", "id": job_id}
+        try:
+            self._proc.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self._proc.stdin.flush()
+        except OSError as e:
+            raise WorkerCrashed(str(e)) from e
+
+        deadline = time.monotonic() + timeout
+        while True:
+            if cancel is not None and cancel.is_set():
+                self._kill()
+                raise RenderCancelled("Remotion render cancelled")
+            wait_until = deadline
+            if cancel is not None:
+                wait_until = min(deadline, time.monotonic() + POLL_INTERVAL)
+            try:
+                msg = self._next_message(self._messages, wait_until)
+            except TimeoutError:
+                if time.monotonic() < deadline:
+                    continue
+                self._kill()
+                raise ProcessTimeout(f"Remotion render timed out after {timeout:.0f}s") from None
+            if msg.get("id") != job_id:
+                continue
+            if msg.get("event") == "progress":
+                if on_progress:
+                    on_progress(float(msg.get("progress", 0.0)))
+                continue
+            if msg.get("ok"):
+                return Path(msg["output"])
+            raise RuntimeError(f"Remotion render failed:\n{str(msg.get('error'))[-500:]}")
+
+    def _kill(self) -> None:
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            kill_tree(proc)
+
+    # --- I/O ---
+
+    @staticmethod
+    def _next_message(messages: queue.Queue, deadline: float | None) -> dict:
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            msg = messages.get(timeout=remaining)
+        except queue.Empty:
+            raise TimeoutError from None
+        if msg is None:
+            raise WorkerCrashed("worker exited")
+        return msg
+
+    @staticmethod
+    def _read_stdout(proc: subprocess.Popen, messages: queue.Queue) -> None:
+        for line in proc.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                messages.put(json.loads(line))
+            except json.JSONDecodeError:
+                logger.debug("remotion worker: %s", line)
+        messages.put(None)  # EOF: the worker is gone
+
+    @staticmethod
+    def _drain_stderr(proc: subprocess.Popen, tail: deque[str]) -> None:
+        for line in proc.stderr:
+            tail.append(line)
+            logger.debug("remotion worker: %s", line.rstrip())
+
+
+_shared_worker: RemotionWorker | None = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_worker() -> RemotionWorker:
+    """Return a process-wide worker, started on first use and closed at exit."""
+    global _shared_worker
+    with _shared_lock:
+        if _shared_worker is None:
+            _shared_worker = RemotionWorker()
+            atexit.register(_shared_worker.close)
+        return _shared_worker
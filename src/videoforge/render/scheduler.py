@@ -0,0 +1,259 @@
+"""Dependency-aware task scheduler with separate CPU and I/O worker pools.
+
+A ``TaskGraph`` holds named tasks and the tasks they depend on. ``run`` starts each
+task as soon as its dependencies have finished: encodes go to the CPU pool (sized so
+concurrent FFmpeg processes don't oversubscribe the machine), audio preparation,
+asset fitting and stream-copy muxes to the I/O pool. A task receives its
+dependencies' results as positional arguments, in the order they were declared.
+
+Failed tasks are retried (with a short backoff) for transient errors (I/O errors and
+process timeouts); a task that still fails, or a set ``cancel`` event, stops the
+graph: nothing new is started, queued tasks are dropped, processes of running ones
+are killed (see ``process.cancel_scope``), and the error is raised.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from .jobs import POLL_INTERVAL, RenderCancelled
+from .process import ProcessTimeout, cancel_scope, thread_budget
+
+logger = logging.getLogger(__name__)
+
+POOLS = ("cpu", "io")
+DEFAULT_IO_WORKERS = 4
+RETRY_BACKOFF = 1.0  # seconds, multiplied by the attempt number
+# Errors worth another attempt: I/O hiccups and hung processes. Other failures (a
+# bad spec, FFmpeg rejecting its input) would only fail the same way again.
+RETRYABLE = (OSError, ProcessTimeout)
+
+
+class TaskFailed(RuntimeError):
+    """A task failed (after exhausting its retries, for a transient error)."""
+
+    def __init__(self, task_id: str, error: BaseException):
+        super().__init__(f"Task {task_id} failed: {error}")
+        self.task_id = task_id
+        self.error = error
+
+
+def default_cpu_workers() -> int:
+    """CPU-pool size: FFmpeg encodes are multi-threaded, so half the cores."""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+@dataclass
+class GraphTask:
+    """A node of a ``TaskGraph``."""
+
+    id: str
+    fn: Callable[..., Any]
+    deps: list[str] = field(default_factory=list)
+    pool: str = "cpu"
+    retries: int = 0
+    attempts: int = 0
+    seconds: float = 0.0  # wall time of the successful attempt
+    started: float | None = None  # time.monotonic() of the first attempt
+    finished: float | None = None
+
+
+class TaskGraph:
+    """Tasks with dependencies, run by ``run`` on CPU and I/O thread pools."""
+
+    def __init__(self) -> None:
+        self.tasks: dict[str, GraphTask] = {}
+        self.failed: dict[str, BaseException] = {}  # by ``run(keep_going=True)``
+
+    def add(
+        self,
+        task_id: str,
+        fn: Callable[..., Any],
+        deps: list[str] | tuple[str, ...] = (),
+        pool: str = "cpu",
+        retries: int = 0,
+    ) -> str:
+        """Add a task; its dependencies must already be in the graph.
+
+        Args:
+            task_id: Unique name.
+            fn: Called with the results of ``deps`` as positional arguments.
+            deps: Tasks that must finish first.
+            pool: ``cpu`` for encodes, ``io`` for I/O-bound or light work.
+            retries: Extra attempts after a retryable failure.
+        """
+        if task_id in self.tasks:
+            raise ValueError(f"Duplicate task: {task_id}")
+        if pool not in POOLS:
+            raise ValueError(f"Unknown pool: {pool} (use cpu or io)")
+        missing = [d for d in deps if d not in self.tasks]
+        if missing:
+            raise ValueError(f"Task {task_id} depends on unknown task(s): {', '.join(missing)}")
+        self.tasks[task_id] = GraphTask(task_id, fn, list(deps), pool, retries)
+        return task_id
+
+    def run(
+        self,
+        cpu_workers: int | None = None,
+        io_workers: int = DEFAULT_IO_WORKERS,
+        cancel: threading.Event | None = None,
+        done: dict[str, Any] | None = None,
+        on_result: Callable[[str, Any], None] | None = None,
+        keep_going: bool = False,
+        threads: int | None = None,
+    ) -> dict[str, Any]:
+        """Run every task once its dependencies are done; return results by task id.
+
+        Args:
+            cpu_workers: Size of the CPU pool (default: half the cores).
+            io_workers: Size of the I/O pool.
+            cancel: Set to stop the graph.
+            done: Results of tasks finished earlier (e.g. by a resumed render);
+                these are not run again.
+            on_result: Called with each task's id and result as it finishes, from
+                the calling thread.
+            keep_going: On failure, skip only the failed task's dependents and go on
+                with the rest; errors are left in ``failed`` instead of raised.
+            threads: Threads each FFmpeg process of a task may use (see
+                ``process.thread_budget``). None leaves FFmpeg's default (all cores).
+
+        Raises:
+            TaskFailed: A task failed, after its retries if transient (other tasks are
+                stopped).
+            RenderCancelled: ``cancel`` was set.
+        """
+        cancel = cancel or threading.Event()
+        self.failed = {}
+        results: dict[str, Any] = {t: r for t, r in (done or {}).items() if t in self.tasks}
+        dependents: dict[str, list[str]] = {t: [] for t in self.tasks}
+        for task in self.tasks.values():
+            for dep in task.deps:
+                dependents[dep].append(task.id)
+        # Run what is not done yet and still needed: tasks are in dependency order,
+        # so walking back from the end sees each task's dependents first
+        needed: set[str] = set()
+        for task_id in reversed(self.tasks):
+            if task_id not in results and (
+                not dependents[task_id] or any(c in needed for c in dependents[task_id])
+            ):
+                needed.add(task_id)
+        waiting = {t: set(self.tasks[t].deps) - results.keys() for t in self.tasks if t in needed}
+
+        limits = {"cpu": cpu_workers or default_cpu_workers(), "io": max(1, io_workers)}
+        pools = {
+            "cpu": ThreadPoolExecutor(limits["cpu"], "videoforge-cpu"),
+            "io": ThreadPoolExecutor(limits["io"], "videoforge-io"),
+        }
+        # Tasks are handed to a pool only when it has a free worker, so the order
+        # below decides what runs next: tasks unblocked by a finished dependency go
+        # first (a join waiting on a fresh clip beats the next scene encode)
+        ready: dict[str, deque[str]] = {pool: deque() for pool in POOLS}
+        busy = dict.fromkeys(POOLS, 0)
+        running: dict[Future, str] = {}
+        error: BaseException | None = None
+
+        def dispatch() -> None:
+            for pool in POOLS:
+                while ready[pool] and busy[pool] < limits[pool]:
+                    task = self.tasks[ready[pool].popleft()]
+                    args = [results[d] for d in task.deps]
+                    future = pools[pool].submit(self._attempt, task, args, cancel, threads)
+                    running[future] = task.id
+                    busy[pool] += 1
+
+        try:
+            for task_id in [t for t, deps in waiting.items() if not deps]:
+                del waiting[task_id]
+                ready[self.tasks[task_id].pool].append(task_id)
+            dispatch()
+            while running:
+                finished, _ = wait(running, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if cancel.is_set() and error is None:
+                    error = RenderCancelled("Render cancelled")
+                for future in finished:
+                    task_id = running.pop(future)
+                    busy[self.tasks[task_id].pool] -= 1
+                    try:
+                        results[task_id] = future.result()
+                    except (TaskFailed, RenderCancelled) as e:
+                        if keep_going and not isinstance(e, RenderCancelled):
+                            logger.error("Task %s failed: %s", task_id, e)
+                            self.failed[task_id] = e
+                            self._skip_dependents(task_id, waiting, dependents)
+                            continue
+                        if error is None:
+                            error = e
+                            cancel.set()
+                        continue
+                    if on_result is not None:
+                        on_result(task_id, results[task_id])
+                    for child in reversed(dependents[task_id]):
+                        if child not in waiting:
+                            continue
+                        waiting[child].discard(task_id)
+                        if not waiting[child]:
+                            del waiting[child]
+                            ready[self.tasks[child].pool].appendleft(child)
+                if error is None:
+                    dispatch()
+            if error is None and waiting:
+                raise RuntimeError(f"Unfinished tasks: {', '.join(sorted(waiting))}")
+        except BaseException:
+            cancel.set()  # e.g. Ctrl-C: stop retries and queued work
+            raise
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        if error is not None:
+            raise error
+        return results
+
+    @staticmethod
+    def _skip_dependents(
+        task_id: str, waiting: dict[str, set[str]], dependents: dict[str, list[str]]
+    ) -> None:
+        stack = list(dependents[task_id])
+        while stack:
+            child = stack.pop()
+            if waiting.pop(child, None) is not None:
+                stack.extend(dependents[child])
+
+    @staticmethod
+    def _attempt(
+        task: GraphTask, args: list[Any], cancel: threading.Event, threads: int | None
+    ) -> Any:
+        while True:
+            if cancel.is_set():
+                raise RenderCancelled(f"Task {task.id} cancelled")
+            task.attempts += 1
+            started = time.monotonic()
+            if task.started is None:
+                task.started = started
+            try:
+                # running ffmpeg processes are killed on cancel
+                with cancel_scope(cancel), thread_budget(threads):
+                    result = task.fn(*args)
+            except RenderCancelled:
+                raise
+            except Exception as e:
+                if not isinstance(e, RETRYABLE) or task.attempts > task.retries:
+                    raise TaskFailed(task.id, e) from e
+                logger.warning(
+                    "Task %s failed (attempt %d/%d): %s; retrying",
+                    task.id, task.attempts, task.retries + 1, e,
+                )
+                if cancel.wait(RETRY_BACKOFF * task.attempts):
+                    raise RenderCancelled(f"Task {task.id} cancelled") from e
+                continue
+            task.finished = time.monotonic()
+            task.seconds = task.finished - started
+            return result
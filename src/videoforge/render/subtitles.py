@@ -0,0 +1,319 @@
+"""Subtitle output - text overlays and narration as ASS, WebVTT or SRT.
+
+Instead of burning every telop into its scene with drawtext, overlays can be written
+as a subtitle file on the video timeline and either muxed as a soft subtitle stream
+(a caption fix is then a remux) or burned in with one libass ``subtitles`` pass.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..schema import Animation, NarrationSegment, Scene, TextOverlay, VideoSpec
+from ..timeline import Timeline
+from .animation import (
+    FADE_SECONDS,
+    SLIDE_DISTANCE,
+    SLIDE_FADE_SECONDS,
+    SLIDE_SECONDS,
+    typewriter_steps,
+)
+from .ffmpeg import run_ffmpeg
+from .output import atomic_output
+
+logger = logging.getLogger(__name__)
+
+SUBTITLE_FORMATS = ("ass", "vtt", "srt")
+SUBTITLE_MODES = ("soft", "burn")
+
+# Subtitle codec for a soft track, by output container
+_CONTAINER_CODECS = {".mp4": "mov_text", ".mov": "mov_text", ".m4v": "mov_text",
+                     ".mkv": "ass", ".webm": "webvtt"}
+
+# (ASS \an alignment, x fraction, y fraction) matching drawtext's placements
+_ASS_PLACEMENT = {
+    "center": (5, 0.5, 0.5),
+    "top_center": (8, 0.5, 0.05),
+    "bottom_center": (8, 0.5, 0.85),
+    "top_left": (7, 0.05, 0.05),
+    "top_right": (9, 0.95, 0.05),
+    "bottom_left": (7, 0.05, 0.85),
+    "bottom_right": (9, 0.95, 0.85),
+}
+
+# WebVTT cue settings per placement
+_VTT_SETTINGS = {
+    "center": "line:50% position:50% align:center",
+    "top_center": "line:5% position:50% align:center",
+    "bottom_center": "line:85% position:50% align:center",
+    "top_left": "line:5% position:5% align:start",
+    "top_right": "line:5% position:95% align:end",
+    "bottom_left": "line:85% position:5% align:start",
+    "bottom_right": "line:85% position:95% align:end",
+}
+
+
+@dataclass
+class Cue:
+    """One subtitle event on the video timeline."""
+
+    start: float
+    end: float
+    text: str
+    overlay: TextOverlay | None = None  # None for narration
+
+
+def overlay_cues(scene: Scene, offset: float) -> list[Cue]:
+    """Cues for the overlays of a scene that starts at ``offset`` on the timeline."""
+    cues = []
+    for overlay in scene.text_overlays:
+        start = offset + (overlay.start or 0.0)
+        end = offset + (scene.duration if overlay.end is None else overlay.end)
+        if end > start:
+            cues.append(Cue(start, end, overlay.content, overlay))
+    return cues
+
+
+def narration_cues(narration: list[NarrationSegment], timeline: Timeline) -> list[Cue]:
+    """Cues for narration segments, each spanning the scene it belongs to."""
+    cues = []
+    for segment in narration:
+        i = timeline.index_of(segment.scene)
+        if i is None:
+            logger.warning("Narration for unknown scene %r skipped in subtitles", segment.scene)
+            continue
+        cues.append(Cue(timeline.starts[i], timeline.ends[i], segment.text))
+    return cues
+
+
+def collect_cues(spec: VideoSpec) -> list[Cue]:
+    """Every overlay and narration segment of ``spec`` as timeline cues, in time order."""
+    timeline = spec.timeline
+    cues = []
+    for scene, offset in zip(timeline.scenes, timeline.starts):
+        cues.extend(overlay_cues(scene, offset))
+    cues.extend(narration_cues(spec.audio.narration, timeline))
+    cues.sort(key=lambda c: c.start)
+    return cues
+
+
+# --- writers ---
+
+
+def _clock(seconds: float, sep: str) -> str:
+    ms = round(max(0.0, seconds) * 1000)
+    h, rem = divmod(ms, 3_600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+
+def to_srt(cues: list[Cue]) -> str:
+    """SubRip text. Positions and animations are not representable and are dropped."""
+    blocks = []
+    for i, cue in enumerate(cues, 1):
+        blocks.append(
+            f"{i}\n{_clock(cue.start, ',')} --> {_clock(cue.end, ',')}\n{cue.text}\n"
+        )
+    return "\n".join(blocks)
+
+
+def to_vtt(cues: list[Cue]) -> str:
+    """WebVTT text, with overlay positions as cue settings."""
+    blocks = ["WEBVTT\n"]
+    for cue in cues:
+        timing = f"{_clock(cue.start, '.')} --> {_clock(cue.end, '.')}"
+        if cue.overlay is not None:
+            timing += " " + _VTT_SETTINGS.get(cue.overlay.position.value, "")
+        text = cue.text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        blocks.append(f"{timing.rstrip()}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def _ass_color(color: str, default_alpha: float = 1.0) -> tuple[str, str]:
+    """``(&HBBGGRR&, &HAA&)`` override values for ``#RRGGBB[AA]``."""
+    hex_c = color.lstrip("#")
+    r, g, b = hex_c[0:2], hex_c[2:4], hex_c[4:6]
+    alpha = int(hex_c[6:8], 16) if len(hex_c) == 8 else round(default_alpha * 255)
+    return f"&H{b}{g}{r}&".upper(), f"&H{255 - alpha:02X}&"
+
+
+def _ass_time(seconds: float) -> str:
+    cs = round(max(0.0, seconds) * 100)
+    h, rem = divmod(cs, 360_000)
+    m, rem = divmod(rem, 6000)
+    s, cs = divmod(rem, 100)
+    return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
+
+
+def _ass_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}").replace("\n", "\\N")
+
+
+def _ass_events(cue: Cue, width: int, height: int) -> list[str]:
+    overlay = cue.overlay
+    if overlay is None:
+        start, end = _ass_time(cue.start), _ass_time(cue.end)
+        return [f"Dialogue: 0,{start},{end},Narration,,0,0,0,,{_ass_text(cue.text)}"]
+
+    align, fx, fy = _ASS_PLACEMENT.get(overlay.position.value, _ASS_PLACEMENT["bottom_center"])
+    x, y = round(width * fx), round(height * fy)
+    fill, fill_alpha = _ass_color(overlay.color)
+    tags = [f"\\an{align}", f"\\fn{overlay.font}", f"\\fs{overlay.font_size}",
+            f"\\1c{fill}", f"\\1a{fill_alpha}"]
+    style = "Box" if overlay.bg_color else "Default"
+    if overlay.bg_color:
+        box, box_alpha = _ass_color(overlay.bg_color, 0.5)
+        tags += [f"\\3c{box}", f"\\3a{box_alpha}", "\\bord10"]
+    elif overlay.border_color and overlay.border_width > 0:
+        border, border_alpha = _ass_color(overlay.border_color)
+        tags += [f"\\3c{border}", f"\\3a{border_alpha}", f"\\bord{overlay.border_width}"]
+    else:
+        tags.append("\\bord0")
+
+    animation = overlay.animation
+    if animation in (Animation.SLIDE_UP, Animation.SLIDE_DOWN):
+        dy = SLIDE_DISTANCE if animation == Animation.SLIDE_UP else -SLIDE_DISTANCE
+        tags.append(f"\\move({x},{y + dy},{x},{y},0,{round(SLIDE_SECONDS * 1000)})")
+        tags.append(f"\\fad({round(SLIDE_FADE_SECONDS * 1000)},0)")
+    else:
+        tags.append(f"\\pos({x},{y})")
+    if animation == Animation.FADE_IN:
+        tags.append(f"\\fad({round(FADE_SECONDS * 1000)},0)")
+    elif animation == Animation.FADE_OUT:
+        tags.append(f"\\fad(0,{round(FADE_SECONDS * 1000)})")
+
+    if animation == Animation.TYPEWRITER:
+        pieces = [
+            (prefix, shown_from, cue.end if shown_until is None else shown_until)
+            for prefix, shown_from, shown_until in typewriter_steps(cue.text, cue.start, cue.end)
+        ]
+    else:
+        pieces = [(cue.text, cue.start, cue.end)]
+
+    override = "{" + "".join(tags) + "}"
+    return [
+        f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},{style},,0,0,0,,"
+        f"{override}{_ass_text(text)}"
+        for text, start, end in pieces
+    ]
+
+
+def to_ass(cues: list[Cue], width: int, height: int, font: str = "Yu Gothic") -> str:
+    """Advanced SubStation Alpha script with overlay styling, placement and animation.
+
+    ``PlayRes`` equals the video size, so font sizes and positions are in pixels as
+    in the spec. Overlays with a ``bg_color`` use the opaque-box style.
+    """
+    style_fields = (
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+        "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+        "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding"
+    )
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 2",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        style_fields,
+        (
+            f"Style: Default,{font},48,&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,"
+            "0,0,0,0,100,100,0,0,1,0,0,2,0,0,0,1"
+        ),
+        (
+            f"Style: Box,{font},48,&H00FFFFFF,&H00FFFFFF,&H80000000,&H80000000,"
+            "0,0,0,0,100,100,0,0,3,10,0,2,0,0,0,1"
+        ),
+        (
+            f"Style: Narration,{font},40,&H00FFFFFF,&H00FFFFFF,&H00000000,&H80000000,"
+            f"0,0,0,0,100,100,0,0,1,2,0,2,{width // 20},{width // 20},{height // 20},1"
+        ),
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    for cue in cues:
+        lines.extend(_ass_events(cue, width, height))
+    return "\n".join(lines) + "\n"
+
+
+def write_subtitles(
+    spec: VideoSpec,
+    output: Path,
+    fmt: str = "ass",
+    font: str = "Yu Gothic",
+    cues: list[Cue] | None = None,
+) -> Path:
+    """Write the spec's overlays and narration to ``output`` as ``fmt``.
+
+    ``cues`` overrides ``collect_cues(spec)`` (streamed renders collect them as
+    scenes arrive).
+    """
+    if fmt not in SUBTITLE_FORMATS:
+        raise ValueError(f"Unknown subtitle format: {fmt} (use {', '.join(SUBTITLE_FORMATS)})")
+    if cues is None:
+        cues = collect_cues(spec)
+    width, height = spec.video.resolution
+    if fmt == "ass":
+        text = to_ass(cues, width, height, font)
+    elif fmt == "vtt":
+        text = to_vtt(cues)
+    else:
+        text = to_srt(cues)
+    with atomic_output(Path(output)) as partial:
+        partial.write_text(text, encoding="utf-8")
+    logger.info("Wrote %d subtitle cue(s): %s", len(cues), output)
+    return Path(output)
+
+
+# --- muxing / burning ---
+
+
+def subtitle_codec(output: Path) -> str:
+    """Subtitle codec a soft track needs in ``output``'s container."""
+    try:
+        return _CONTAINER_CODECS[Path(output).suffix.lower()]
+    except KeyError:
+        raise ValueError(f"No soft subtitle support for {Path(output).suffix} files") from None
+
+
+def mux_subtitles(video: Path, subtitle_file: Path, output: Path) -> Path:
+    """Add ``subtitle_file`` as a soft subtitle stream; audio and video are copied."""
+    run_ffmpeg([
+        "-i", str(video),
+        "-i", str(subtitle_file),
+        "-map", "0:v", "-map", "0:a?", "-map", "1:s",
+        "-c:v", "copy", "-c:a", "copy",
+        "-c:s", subtitle_codec(output),
+        "-movflags", "+faststart",
+        str(output),
+    ])
+    return output
+
+
+def burn_subtitles(
+    video: Path, subtitle_file: Path, output: Path, duration: float | None = None
+) -> Path:
+    """Burn ``subtitle_file`` into the picture in one libass ``subtitles`` pass.
+
+    The filter is given a bare file name and run from the subtitle's directory, which
+    sidesteps filter-graph path escaping (drive-letter colons on Windows).
+    ``duration`` (the video's length) scales the FFmpeg timeout.
+    """
+    subtitle_file = Path(subtitle_file).resolve()
+    run_ffmpeg([
+        "-i", str(Path(video).resolve()),
+        "-vf", f"subtitles={subtitle_file.name}",
+        "-c:v", "libx264",
+        "-pix_fmt", "yuv420p",
+        "-c:a", "copy",
+        "-movflags", "+faststart",
+        str(Path(output).resolve()),
+    ], cwd=subtitle_file.parent, duration=duration)
+    return output
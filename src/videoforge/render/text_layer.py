@@ -0,0 +1,228 @@
+"""Pre-rasterized text overlay layers.
+
+Each ``TextOverlay`` is drawn once with Pillow into a premultiplied RGBA PNG, cached
+by a hash of everything that affects its pixels, and composited onto the scene with
+ffmpeg's ``overlay`` filter. Repeated telops - within a video or across renders - are
+rasterized exactly once, and a scene's overlays are all composited in one pass.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..schema import TextOverlay
+from .animation import escape_expr, opacity_ramp, y_offset_expr
+from .ffmpeg import run_ffmpeg
+from .output import atomic_output
+
+logger = logging.getLogger(__name__)
+
+# Padding around the text when a background box is drawn (drawtext's boxborderw)
+BOX_PADDING = 10
+# drawtext's default box opacity when bg_color has no alpha component
+DEFAULT_BOX_ALPHA = 0.5
+
+
+@dataclass(frozen=True)
+class TextLayer:
+    """A rasterized overlay and where/when to composite it."""
+
+    image: Path
+    position: str
+    padding: int
+    start: float | None = None
+    end: float | None = None
+    animation: str = "none"
+
+
+def layer_key(overlay: TextOverlay, font_path: Path, face_index: int = 0) -> str:
+    """Cache key covering every input that changes the rasterized pixels.
+
+    Position and timing are applied at composite time, so they are not part of it.
+    """
+    st = font_path.stat()
+    parts = {
+        "content": overlay.content,
+        "font": [str(font_path.resolve()), face_index, st.st_size, st.st_mtime_ns],
+        "size": overlay.font_size,
+        "color": overlay.color,
+        "bg": overlay.bg_color,
+        "border": [overlay.border_color, overlay.border_width],
+        "padding": BOX_PADDING,
+    }
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+
+def layer_path(
+    overlay: TextOverlay, font_path: Path, cache_dir: Path, face_index: int = 0
+) -> Path:
+    """Where the rasterized ``overlay`` is (or will be) cached."""
+    return Path(cache_dir) / "text" / f"{layer_key(overlay, font_path, face_index)}.png"
+
+
+def parse_color(color: str, default_alpha: float = 1.0) -> tuple[int, int, int, int]:
+    """Parse ``#RRGGBB`` / ``#RRGGBBAA`` into an RGBA tuple."""
+    hex_c = color.lstrip("#")
+    if len(hex_c) not in (6, 8):
+        raise ValueError(f"Invalid color: {color!r}")
+    r, g, b = (int(hex_c[i:i + 2], 16) for i in (0, 2, 4))
+    a = int(hex_c[6:8], 16) if len(hex_c) == 8 else round(default_alpha * 255)
+    return r, g, b, a
+
+
+def rasterize_overlay(
+    overlay: TextOverlay,
+    font_path: Path,
+    cache_dir: Path | None = None,
+    face_index: int = 0,
+) -> TextLayer:
+    """Rasterize ``overlay`` to a cached premultiplied RGBA PNG.
+
+    Args:
+        overlay: The text overlay to draw.
+        font_path: Font file to draw it with.
+        cache_dir: Root cache directory. Defaults to the configured one.
+        face_index: Face within a font collection (.ttc).
+    """
+    if cache_dir is None:
+        from ..config import Config
+
+        cache_dir = Config.load().cache_dir
+    font_path = Path(font_path)
+    padding = BOX_PADDING if overlay.bg_color else 0
+    image = layer_path(overlay, font_path, cache_dir, face_index)
+
+    if not image.exists():
+        with atomic_output(image) as partial:
+            _draw(overlay, font_path, padding, face_index).save(partial, format="PNG")
+        logger.debug("Rasterized overlay %r -> %s", overlay.content[:20], image.name)
+
+    return TextLayer(
+        image=image,
+        position=overlay.position.value,
+        padding=padding,
+        start=overlay.start,
+        end=overlay.end,
+        animation=overlay.animation.value,
+    )
+
+
+def _draw(overlay: TextOverlay, font_path: Path, padding: int, face_index: int = 0):
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.truetype(str(font_path), overlay.font_size, index=face_index)
+    stroke = overlay.border_width if overlay.border_color else 0
+    probe = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    left, top, right, bottom = probe.multiline_textbbox(
+        (0, 0), overlay.content, font=font, stroke_width=stroke
+    )
+    size = (right - left + 2 * padding, bottom - top + 2 * padding)
+
+    bg = parse_color(overlay.bg_color, DEFAULT_BOX_ALPHA) if overlay.bg_color else (0, 0, 0, 0)
+    img = Image.new("RGBA", size, bg)
+    draw = ImageDraw.Draw(img)
+    draw.multiline_text(
+        (padding - left, padding - top),
+        overlay.content,
+        font=font,
+        fill=parse_color(overlay.color),
+        stroke_width=stroke,
+        stroke_fill=parse_color(overlay.border_color) if stroke else None,
+    )
+    # Store premultiplied samples in a plain RGBA PNG; composited with alpha=premultiplied
+    return Image.frombytes("RGBA", img.size, img.convert("RGBa").tobytes())
+
+
+def overlay_position(position: str, padding: int) -> tuple[str, str]:
+    """``overlay`` x/y expressions matching drawtext's placement of the same text."""
+    p = padding
+    xs = {
+        "center": "(W-w)/2",
+        "left": f"W*0.05-{p}",
+        "right": f"W*0.95-w+{p}",
+    }
+    ys = {
+        "center": "(H-h)/2",
+        "top": f"H*0.05-{p}",
+        "bottom": f"H*0.85-{p}",
+    }
+    placements = {
+        "center": ("center", "center"),
+        "top_center": ("center", "top"),
+        "bottom_center": ("center", "bottom"),
+        "top_left": ("left", "top"),
+        "top_right": ("right", "top"),
+        "bottom_left": ("left", "bottom"),
+        "bottom_right": ("right", "bottom"),
+    }
+    x, y = placements.get(position, placements["bottom_center"])
+    return xs[x], ys[y]
+
+
+def build_composite_filter(layers: list[TextLayer], duration: float) -> str:
+    """Chain one ``overlay`` per layer; input 0 is the video, input i+1 layer i.
+
+    Animations are evaluated per frame inside the same graph: fades scale colour and
+    alpha together (keeping the layer premultiplied), slides offset ``y``.
+    """
+    chains = []
+    current = "[0:v]"
+    for i, layer in enumerate(layers, 1):
+        source = f"[{i}:v]"
+        ramp = opacity_ramp(layer.animation, layer.start, layer.end, duration)
+        if ramp is not None:
+            direction, st, length = ramp
+            fade = f"fade=t={direction}:st={st}:d={length}"
+            chains.append(f"{source}format=rgba,{fade}:alpha=1,{fade}[a{i}]")
+            source = f"[a{i}]"
+
+        x, y = overlay_position(layer.position, layer.padding)
+        offset = y_offset_expr(layer.animation, layer.start)
+        if offset is not None:
+            y = f"{y}+{escape_expr(offset)}"
+        opts = [f"x={x}", f"y={y}", "alpha=premultiplied"]
+        if layer.start is not None or layer.end is not None:
+            conditions = []
+            if layer.start is not None:
+                conditions.append(f"gte(t\\,{layer.start})")
+            if layer.end is not None:
+                conditions.append(f"lte(t\\,{layer.end})")
+            opts.append(f"enable={'*'.join(conditions)}")
+        label = "[vout]" if i == len(layers) else f"[v{i}]"
+        chains.append(f"{current}{source}overlay={':'.join(opts)}{label}")
+        current = label
+    return ";".join(chains)
+
+
+def composite_layers(
+    input_video: Path,
+    output: Path,
+    layers: list[TextLayer],
+    duration: float,
+    fps: int,
+) -> Path:
+    """Composite all ``layers`` onto ``input_video`` in a single ffmpeg pass."""
+    if not layers:
+        raise ValueError("No layers to composite")
+    args = ["-i", str(input_video)]
+    for layer in layers:
+        if opacity_ramp(layer.animation, layer.start, layer.end, duration) is not None:
+            # Fades need a timed stream rather than a single still frame
+            args += ["-loop", "1", "-framerate", str(fps), "-t", str(duration)]
+        args += ["-i", str(layer.image)]
+    run_ffmpeg([
+        *args,
+        "-filter_complex", build_composite_filter(layers, duration),
+        "-map", "[vout]",
+        "-map", "0:a?",
+        "-c:v", "libx264",
+        "-pix_fmt", "yuv420p",
+        "-c:a", "copy",
+        str(output),
+    ])
+    return output
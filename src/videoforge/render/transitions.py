@@ -45,5 +45,5 @@ def apply_xfade(
         "-c:v", "libx264",
         "-pix_fmt", "yuv420p",
         str(output),
-    ])
+    ], duration=offset + duration)
     return output
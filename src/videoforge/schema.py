@@ -4,9 +4,12 @@ from __future__ import annotations
 
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+if TYPE_CHECKING:
+    from .timeline import Timeline
 
 
 class SceneType(str, Enum):
@@ -153,6 +156,20 @@ class ExportConfig(BaseModel):
     platform: ExportPlatform = ExportPlatform.YOUTUBE
     quality: str = "high"  # low / medium / high
     output_path: Optional[str] = None
+    platforms: list[str] = Field(default_factory=list)  # extra variants, e.g. ["tiktok"]
+    streaming: list[str] = Field(default_factory=list)  # ABR packaging: "hls" / "dash"
+    renditions: list[str] = Field(default_factory=list)  # ABR rungs; empty = full ladder
+    subtitles: Optional[str] = None  # overlays as captions: "soft" (track) / "burn" (libass)
+    subtitle_format: str = "ass"  # soft track / sidecar format: "ass" / "vtt" / "srt"
+
+
+class SpecHeader(BaseModel):
+    """Everything in a VideoSpec except its scenes: the first line of a JSONL spec."""
+
+    version: str = "1.0"
+    video: VideoMeta = Field(default_factory=VideoMeta)
+    audio: Audio = Field(default_factory=Audio)
+    export: ExportConfig = Field(default_factory=ExportConfig)
 
 
 class VideoSpec(BaseModel):
@@ -164,12 +181,37 @@ class VideoSpec(BaseModel):
     audio: Audio = Field(default_factory=Audio)
     export: ExportConfig = Field(default_factory=ExportConfig)
 
+    _timeline: Optional[tuple] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _fill_scene_ids(self) -> VideoSpec:
+        """Give id-less scenes their positional id (``scene_<i>``) before any lookup."""
+        for i, scene in enumerate(self.scenes):
+            if not scene.id:
+                scene.id = f"scene_{i}"
+        return self
+
+    @property
+    def timeline(self) -> Timeline:
+        """Compiled timeline index, rebuilt when the scene list or fps is replaced.
+
+        Mutating a scene in place is not tracked; assign a new ``scenes`` list instead.
+        """
+        from .timeline import Timeline
+
+        cached = self._timeline
+        if (
+            cached is None
+            or cached[0] is not self.scenes
+            or cached[1].fps != self.video.fps
+            or len(cached[1]) != len(self.scenes)
+        ):
+            cached = self._timeline = (self.scenes, Timeline(self.scenes, self.video.fps))
+        return cached[1]
+
     @property
     def total_duration(self) -> float:
-        return sum(s.duration for s in self.scenes)
+        return self.timeline.content_duration
 
     def get_scene(self, scene_id: str) -> Scene | None:
-        for s in self.scenes:
-            if s.id == scene_id:
-                return s
-        return None
+        return self.timeline.get(scene_id)
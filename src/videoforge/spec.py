@@ -1,23 +1,146 @@
-"""VideoSpec YAML parser and validator."""
+"""VideoSpec YAML parser and validator.
+
+Specs load from YAML (with libyaml's C loader when PyYAML was built with it), JSON,
+msgpack or JSONL. A JSONL spec is a ``SpecHeader`` line followed by one ``Scene`` per
+line; ``stream_spec`` validates it a scene at a time so rendering can start before
+the producer has finished writing it. Validated specs are cached as canonical JSON
+keyed by the file's content hash (and the videoforge version and schema, since the
+cached JSON has every default filled in), so re-loading an unchanged spec skips
+both YAML parsing and model building.
+"""
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import hashlib
+import logging
+import os
+import sys
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
-import yaml
 from pydantic import ValidationError
 
-from .schema import VideoSpec
+from . import __version__, schema
+from .render.output import atomic_output
+from .schema import Scene, SpecHeader, VideoSpec
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached representation changes
+SPEC_CACHE_VERSION = "1"
+# Least recently used specs beyond this many are pruned when a new one is cached
+SPEC_CACHE_ENTRIES = 256
+JSON_SUFFIXES = (".json",)
+MSGPACK_SUFFIXES = (".msgpack", ".mpk")
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
 
 
-def load_spec(path: str | Path) -> VideoSpec:
-    """Load and validate a VideoSpec from a YAML file."""
+def load_spec(
+    path: str | Path, cache_dir: Path | None = None, use_cache: bool = True
+) -> VideoSpec:
+    """Load and validate a VideoSpec from a YAML, JSON or msgpack file.
+
+    Args:
+        path: Spec file. ``.json`` and ``.msgpack``/``.mpk`` use the fast paths.
+        cache_dir: Root cache directory. Defaults to the configured one.
+        use_cache: Reuse (and store) the validated spec keyed by file content.
+            ``videoforge validate`` uses the cache too, which keeps repeated
+            validation of a large spec cheap.
+    """
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"VideoSpec file not found: {path}")
 
-    with open(path, encoding="utf-8") as f:
-        raw = yaml.safe_load(f)
+    data = path.read_bytes()
+    cached = None
+    if use_cache:
+        if cache_dir is None:
+            from .config import Config
+
+            cache_dir = Config.load().cache_dir
+        cached = Path(cache_dir) / "specs" / f"{spec_cache_key(data)}.json"
+        if cached.exists():
+            try:
+                spec = VideoSpec.model_validate_json(cached.read_bytes())
+            except (OSError, ValidationError) as e:
+                logger.debug("Ignoring unusable spec cache %s: %s", cached.name, e)
+            else:
+                with contextlib.suppress(OSError):
+                    os.utime(cached)  # recently used: pruned last
+                return spec
+
+    spec = _parse_bytes(data, path)
+
+    if cached is not None:
+        try:
+            with atomic_output(cached) as partial:
+                partial.write_text(spec.model_dump_json(), encoding="utf-8")
+            _prune_spec_cache(cached.parent)
+        except OSError as e:
+            logger.debug("Could not cache spec %s: %s", path, e)
+    return spec
+
+
+def spec_cache_key(data: bytes) -> str:
+    """Cache key for the raw bytes of a spec file under this version of the schema."""
+    prefix = f"{SPEC_CACHE_VERSION}|{__version__}|{_schema_fingerprint()}".encode()
+    return hashlib.sha256(prefix + b"\0" + data).hexdigest()[:32]
+
+
+@functools.cache
+def _schema_fingerprint() -> str:
+    """Hash of the schema module's source: changed defaults or validators miss the cache."""
+    try:
+        return hashlib.sha256(Path(schema.__file__).read_bytes()).hexdigest()[:16]
+    except (OSError, TypeError):
+        return ""
+
+
+def _prune_spec_cache(directory: Path) -> None:
+    """Remove the least recently used cached specs beyond ``SPEC_CACHE_ENTRIES``."""
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".json"):
+            with contextlib.suppress(OSError):
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+    if len(entries) <= SPEC_CACHE_ENTRIES:
+        return
+    entries.sort(reverse=True)
+    for _, old in entries[SPEC_CACHE_ENTRIES:]:
+        with contextlib.suppress(OSError):
+            os.unlink(old)
+
+
+def _parse_bytes(data: bytes, path: Path) -> VideoSpec:
+    suffix = path.suffix.lower()
+    if suffix in JSON_SUFFIXES:
+        if not data.strip():
+            raise ValueError(f"Empty VideoSpec file: {path}")
+        try:
+            # pydantic-core parses and validates JSON in one pass
+            return VideoSpec.model_validate_json(data)
+        except ValidationError as e:
+            raise ValueError(f"Invalid VideoSpec:\n{e}") from e
+
+    if suffix in JSONL_SUFFIXES:
+        header, scenes = parse_spec_lines(data.decode("utf-8").splitlines(), path)
+        return VideoSpec(**dict(header), scenes=list(scenes))
+
+    if suffix in MSGPACK_SUFFIXES:
+        try:
+            import msgpack
+        except ImportError as e:
+            raise RuntimeError(
+                "msgpack specs need the msgpack package: pip install 'videoforge[fast]'"
+            ) from e
+        raw = msgpack.unpackb(data, raw=False) if data else None
+    else:
+        import yaml
+
+        # libyaml is several times faster than the pure-Python loader on large specs
+        raw = yaml.load(data, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
 
     if raw is None:
         raise ValueError(f"Empty VideoSpec file: {path}")
@@ -25,6 +148,54 @@ def load_spec(path: str | Path) -> VideoSpec:
     return parse_spec(raw)
 
 
+def stream_spec(source: str | Path) -> tuple[SpecHeader, Iterator[Scene]]:
+    """Open a JSONL spec and return its header and a lazy iterator over its scenes.
+
+    Scenes are read and validated one line at a time, so memory stays flat however
+    long the spec is, and a producer can still be appending to it (or writing to
+    stdin, for ``-``) while earlier scenes render. The file is closed once the
+    iterator is exhausted or discarded.
+    """
+    if str(source) == "-":
+        return parse_spec_lines(sys.stdin, "<stdin>")
+    path = Path(source)
+    if not path.exists():
+        raise FileNotFoundError(f"VideoSpec file not found: {path}")
+    return parse_spec_lines(_read_lines(path), path)
+
+
+def _read_lines(path: Path) -> Iterator[str]:
+    with open(path, encoding="utf-8") as f:
+        yield from f
+
+
+def parse_spec_lines(
+    lines: Iterable[str], name: str | Path = "<spec>"
+) -> tuple[SpecHeader, Iterator[Scene]]:
+    """Validate the header line of a JSONL spec; scenes are validated as they are read.
+
+    Blank lines are skipped. Errors name the offending line.
+    """
+    numbered = ((n, line) for n, line in enumerate(lines, 1) if line.strip())
+    first = next(numbered, None)
+    if first is None:
+        raise ValueError(f"Empty VideoSpec file: {name}")
+    n, line = first
+    try:
+        header = SpecHeader.model_validate_json(line)
+    except ValidationError as e:
+        raise ValueError(f"Invalid VideoSpec header ({name}:{n}):\n{e}") from e
+
+    def scenes() -> Iterator[Scene]:
+        for n, line in numbered:
+            try:
+                yield Scene.model_validate_json(line)
+            except ValidationError as e:
+                raise ValueError(f"Invalid scene ({name}:{n}):\n{e}") from e
+
+    return header, scenes()
+
+
 def parse_spec(data: dict) -> VideoSpec:
     """Parse and validate a VideoSpec from a dictionary."""
     try:
@@ -35,6 +206,8 @@ def parse_spec(data: dict) -> VideoSpec:
 
 def dump_spec(spec: VideoSpec) -> str:
     """Serialize a VideoSpec to YAML string."""
+    import yaml
+
     data = spec.model_dump(mode="json", exclude_none=True)
     return yaml.dump(data, allow_unicode=True, default_flow_style=False, sort_keys=False)
 
@@ -0,0 +1,164 @@
+"""Tests for platform export presets and fan-out."""
+
+from pathlib import Path
+
+import pytest
+
+from videoforge.export.chunked import encoder_args, plan_chunks
+from videoforge.export.fanout import build_fanout_args, resolve_presets, variant_path
+from videoforge.export.ladder import build_ladder_args, resolve_ladder
+from videoforge.export.platforms import PRESETS, get_ffmpeg_args
+from videoforge.schema import ExportCodec, ExportConfig
+
+
+def test_get_ffmpeg_args_conforms_resolution_and_fps():
+    """Preset args should scale/pad to the preset size and set faststart."""
+    args = get_ffmpeg_args(PRESETS["tiktok"])
+    vf = args[args.index("-vf") + 1]
+    assert "scale=1080:1920" in vf
+    assert "fps=30" in vf
+    assert "+faststart" in args
+
+
+def test_resolve_presets_rejects_unknown():
+    """Unknown platform names should raise ValueError."""
+    assert list(resolve_presets(["YouTube", "tiktok"])) == ["youtube", "tiktok"]
+    with pytest.raises(ValueError):
+        resolve_presets(["myspace"])
+
+
+def test_fanout_splits_single_decode():
+    """All variants should come from one input and one split filter."""
+    master = Path("master.mp4")
+    presets = resolve_presets(["youtube", "tiktok", "instagram_reel", "twitter"])
+    outputs = {name: variant_path(master, name) for name in presets}
+    args = build_fanout_args(master, presets, outputs)
+
+    assert args.count("-i") == 1
+    graph = args[args.index("-filter_complex") + 1]
+    assert graph.startswith("[0:v]split=4[s0][s1][s2][s3]")
+    assert args.count("-map") == 8
+    for path in outputs.values():
+        assert str(path) in args
+    assert outputs["tiktok"] == Path("master_tiktok.mp4")
+
+
+def test_export_config_platforms_default():
+    """ExportConfig.platforms should default to no extra variants."""
+    assert ExportConfig().platforms == []
+    assert ExportConfig(platforms=["tiktok"]).platforms == ["tiktok"]
+
+
+def _packets(seconds: float, fps: int = 30, gop: int = 60) -> list[tuple[float, bool]]:
+    return [(i / fps, i % gop == 0) for i in range(int(seconds * fps))]
+
+
+def test_plan_chunks_cover_every_frame_on_keyframes():
+    """Chunks should start on keyframes and cover each frame exactly once."""
+    packets = _packets(120.0)
+    chunks = plan_chunks(packets, num_chunks=4)
+    assert len(chunks) == 4
+    assert sum(c.frames for c in chunks) == len(packets)
+    keyframe_times = {t for t, key in packets if key}
+    assert all(c.start in keyframe_times for c in chunks)
+    assert sum(c.duration for c in chunks) == pytest.approx(packets[-1][0])  # for timeouts
+
+
+def test_plan_chunks_respects_minimum_length():
+    """Short videos should not be split below the minimum chunk length."""
+    assert len(plan_chunks(_packets(15.0), num_chunks=8)) == 1
+    assert plan_chunks([], num_chunks=4) == []
+
+
+def test_encoder_args_per_codec():
+    """Each codec should map to its encoder and quality-dependent CRF."""
+    args = encoder_args(ExportCodec.AV1, "medium", threads=2)
+    assert args[:4] == ["-c:v", "libsvtav1", "-crf", "35"]
+    assert "-threads" in args
+    assert "-b:v" in encoder_args(ExportCodec.VP9)
+
+
+def test_ladder_hls_aligned_gops():
+    """HLS ladder should split one decode and force keyframes on segment boundaries."""
+    rungs = resolve_ladder(["1080p", "720p", "480p"])
+    args = build_ladder_args(Path("m.mp4"), rungs, Path("abr"), ["hls"], segment_seconds=4)
+    assert args.count("-i") == 1
+    assert args[args.index("-filter_complex") + 1].startswith("[0:v]split=3")
+    assert args[args.index("-g") + 1] == "120"
+    assert args[args.index("-sc_threshold") + 1] == "0"
+    assert args[args.index("-f") + 1] == "hls"
+    assert args[args.index("-var_stream_map") + 1] == (
+        "v:0,a:0,name:1080p v:1,a:1,name:720p v:2,a:2,name:480p"
+    )
+
+
+def test_ladder_dash_with_hls_playlist():
+    """Requesting both formats should use one DASH mux with an HLS playlist."""
+    rungs = resolve_ladder(["720p", "480p"])
+    args = build_ladder_args(
+        Path("m.mp4"), rungs, Path("abr"), ["hls", "dash"], has_audio=False
+    )
+    assert args[args.index("-f") + 1] == "dash"
+    assert args[args.index("-hls_playlist") + 1] == "1"
+    assert args[args.index("-adaptation_sets") + 1] == "id=0,streams=v"
+    with pytest.raises(ValueError):
+        resolve_ladder(["4320p"])
+
+
+def test_ladder_replaces_the_previous_one_only_when_complete(tmp_path, monkeypatch):
+    """Renditions go to a temp dir that replaces the old ladder only on success."""
+    from videoforge.export import ladder
+
+    def fake_ffmpeg(args, duration=None):
+        playlist = Path(args[-1])
+        for rung_dir in playlist.parent.parent.iterdir():
+            (rung_dir / "seg_00000.ts").write_bytes(b"ts")
+        (playlist.parent.parent / "master.m3u8").write_text("#EXTM3U")
+
+    monkeypatch.setattr(ladder, "probe_has_audio", lambda master: True)
+    monkeypatch.setattr(ladder, "media_duration", lambda master: 10.0)
+    monkeypatch.setattr(ladder, "run_ffmpeg", fake_ffmpeg)
+    out = tmp_path / "abr"
+    out.mkdir()
+    (out / "stale.ts").write_bytes(b"old")
+    entries = ladder.package_abr(
+        tmp_path / "m.mp4", out, ["hls"], ["1080p", "720p"], source_size=(1280, 720)
+    )
+    assert entries == {"hls": out / "master.m3u8"}
+    assert sorted(p.name for p in out.iterdir()) == ["720p", "master.m3u8"]
+    assert (out / "720p" / "seg_00000.ts").exists()
+
+    def failing_ffmpeg(args, duration=None):
+        raise RuntimeError("encoder crashed")
+
+    monkeypatch.setattr(ladder, "run_ffmpeg", failing_ffmpeg)
+    with pytest.raises(RuntimeError):
+        ladder.package_abr(tmp_path / "m.mp4", out, ["hls"], ["720p"])
+    assert sorted(p.name for p in out.iterdir()) == ["720p", "master.m3u8"]
+    assert [p.name for p in tmp_path.iterdir()] == ["abr"]
+
+
+def test_chunks_are_written_beside_the_output(tmp_path, monkeypatch):
+    """Chunk files go next to the output (or into ``work_dir``), never to /tmp."""
+    from videoforge.export import chunked
+
+    written = []
+
+    def fake_ffmpeg(args, duration=None, cancel=None):
+        written.append(Path(args[-1]))
+        Path(args[-1]).write_bytes(b"x")
+
+    packets = [(i / 30, i % 300 == 0) for i in range(1800)]  # 60s, keyframe every 10s
+    monkeypatch.setattr(chunked, "probe_video_packets", lambda master: packets)
+    monkeypatch.setattr(chunked, "run_ffmpeg", fake_ffmpeg)
+    out = tmp_path / "out" / "video.mp4"
+    chunked.encode_chunked(tmp_path / "m.mp4", out, ExportCodec.AV1, workers=2)
+    *parts, final = written
+    assert len(parts) > 1 and all(p.parent.parent == out.parent for p in parts)
+    assert final.parent == out.parent
+    assert [p.name for p in out.parent.iterdir()] == ["video.mp4"]
+
+    written.clear()
+    work = tmp_path / "work"
+    chunked.encode_chunked(tmp_path / "m.mp4", out, ExportCodec.AV1, workers=2, work_dir=work)
+    assert all(p.parent.parent == work for p in written[:-1])
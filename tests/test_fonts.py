@@ -0,0 +1,89 @@
+"""Tests for the font index and glyph coverage checks."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from videoforge.render import fonts
+from videoforge.render.compositor import check_overlay_fonts
+from videoforge.render.fonts import FontIndex, missing_glyphs, read_faces, resolve_font
+from videoforge.schema import Scene, TextOverlay
+
+
+def _system_font() -> Path:
+    for root in ("/usr/share/fonts", "/Library/Fonts", "/System/Library/Fonts", "C:/Windows/Fonts"):
+        if Path(root).exists():
+            found = next(Path(root).rglob("*.ttf"), None)
+            if found:
+                return found
+    pytest.skip("no font file available")
+
+
+@pytest.fixture
+def font_dir(tmp_path):
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    shutil.copy(_system_font(), fonts / "first.ttf")
+    return fonts
+
+
+def test_read_faces_uses_name_table(font_dir):
+    """Family and style should come from the font's own name table."""
+    [face] = read_faces(font_dir / "first.ttf")
+    assert face.family and face.style
+    assert face.family in face.names
+    assert face.index == 0
+
+
+def test_explicit_font_file_is_parsed_once(font_dir, monkeypatch):
+    """resolve_font with a path should reuse the parsed faces until the file changes."""
+    path = font_dir / "first.ttf"
+    calls = []
+    real = fonts.read_faces
+    monkeypatch.setattr(fonts, "read_faces", lambda p: calls.append(p) or real(p))
+    fonts._file_faces.cache_clear()
+    face = resolve_font("anything", str(path))
+    assert face.path == str(path)
+    for _ in range(100):
+        assert resolve_font("anything", str(path)) == face
+    assert len(calls) == 1
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    resolve_font("anything", str(path))
+    assert len(calls) == 2
+
+
+def test_index_lookup_and_persistence(font_dir, tmp_path):
+    """The index should be reused until a font directory changes."""
+    cache = tmp_path / "cache"
+    index = FontIndex.load(cache_dir=cache, dirs=[font_dir])
+    [face] = index.faces
+    assert index.find(face.family.upper().replace(" ", "-")) == face
+    assert index.find(face.family, face.style) == face
+    assert index.find("first") == face  # file stem alias
+    assert index.find("No Such Font") is None
+
+    index_file = cache / "fonts" / "index.json"
+    built = index_file.stat().st_mtime_ns
+    FontIndex.load(cache_dir=cache, dirs=[font_dir])
+    assert index_file.stat().st_mtime_ns == built
+
+    sub = font_dir / "more"
+    sub.mkdir()
+    shutil.copy(font_dir / "first.ttf", sub / "second.ttf")
+    os.utime(font_dir, ns=(built + 10**9, built + 10**9))
+    rebuilt = FontIndex.load(cache_dir=cache, dirs=[font_dir])
+    assert len(rebuilt.faces) == 2
+
+
+def test_missing_glyphs_rejects_uncovered_text(font_dir):
+    """Characters outside the cmap should be reported before rendering."""
+    path = font_dir / "first.ttf"
+    assert missing_glyphs(path, "Hello world") == []
+    if not read_faces(path)[0].cjk:
+        assert missing_glyphs(path, "Hi 日本") == ["日", "本"]
+        scenes = [Scene(id="s1", text_overlays=[TextOverlay(content="日本", font="Test")])]
+        [problem] = check_overlay_fonts(scenes, "Test", str(path))
+        assert "s1" in problem
@@ -0,0 +1,155 @@
+"""Tests for the persistent Remotion worker protocol (using a stand-in worker)."""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from videoforge.render import process, remotion_worker
+from videoforge.render.jobs import RenderCancelled, SlotLimiter
+from videoforge.render.process import ProcessSettings, ProcessTimeout
+from videoforge.render.remotion_worker import RemotionWorker, job_timeout
+
+# Speaks the worker.mjs protocol. Crashes on its first job if CRASH_ONCE exists.
+FAKE_WORKER = r'''
+import json, os, sys, time
+send = lambda m: (sys.stdout.write(json.dumps(m) + "\n"), sys.stdout.flush())
+send({"event": "ready", "pid": os.getpid()})
+for line in sys.stdin:
+    job = json.loads(line)
+    if job["type"] == "shutdown":
+        break
+    if os.path.exists("CRASH_ONCE"):
+        os.remove("CRASH_ONCE")
+        sys.exit(1)
+    if job.get("composition") == "Broken":
+        send({"id": job["id"], "ok": False, "error": "boom"})
+        continue
+    if job.get("composition") == "Browser":  # leaves a child behind, like headless Chrome
+        import subprocess
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        open(job["output"], "w").write(str(child.pid))
+        time.sleep(30)
+    if job.get("composition") == "Slow":
+        time.sleep(30)
+    if job.get("composition") == "Wait":
+        time.sleep(0.5)
+    send({"id": job["id"], "event": "progress", "progress": 0.5})
+    send({"id": job["id"], "ok": True, "output": job["output"]})
+'''
+
+
+@pytest.fixture(autouse=True)
+def slots(tmp_path, monkeypatch):
+    limiter = SlotLimiter(2, tmp_path / "locks")
+    monkeypatch.setattr(remotion_worker, "remotion_slots", lambda: limiter)
+    return limiter
+
+
+@pytest.fixture
+def worker_dir(tmp_path):
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "worker.mjs").write_text(FAKE_WORKER)
+    return tmp_path
+
+
+def test_worker_renders_and_reports_progress(worker_dir):
+    """Jobs should round-trip over the JSON protocol on one long-lived process."""
+    progress = []
+    with RemotionWorker(remotion_dir=worker_dir, node=sys.executable) as worker:
+        out = worker.render({"composition": "A", "output": "a.mp4"}, on_progress=progress.append)
+        assert out == Path("a.mp4")
+        worker.render({"composition": "B", "output": "b.mp4"})
+        assert worker.restarts == 0
+    assert progress == [0.5]
+    assert not worker.running
+
+
+def test_worker_surfaces_render_errors(worker_dir):
+    """A failed job should raise without killing the worker."""
+    with RemotionWorker(remotion_dir=worker_dir, node=sys.executable) as worker:
+        with pytest.raises(RuntimeError, match="boom"):
+            worker.render({"composition": "Broken", "output": "x.mp4"})
+        assert worker.running
+
+
+def test_worker_restarts_after_crash(worker_dir):
+    """A crash mid-job should restart the worker and retry the job once."""
+    (worker_dir / "CRASH_ONCE").write_text("")
+    with RemotionWorker(remotion_dir=worker_dir, node=sys.executable) as worker:
+        assert worker.render({"composition": "A", "output": "a.mp4"}) == Path("a.mp4")
+        assert worker.restarts == 1
+
+
+def test_worker_job_can_be_cancelled(worker_dir):
+    """Cancelling a running job should kill the worker; the next job restarts it."""
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    with RemotionWorker(remotion_dir=worker_dir, node=sys.executable) as worker:
+        with pytest.raises(RenderCancelled):
+            worker.render({"composition": "Slow", "output": "s.mp4"}, cancel=cancel)
+        assert not worker.running
+        assert worker.render({"composition": "A", "output": "a.mp4"}) == Path("a.mp4")
+        assert worker.restarts == 1
+
+
+def test_worker_job_timeout_scales_with_length(worker_dir, monkeypatch):
+    """The default job timeout grows with the frames rendered; expiry kills the worker."""
+    monkeypatch.setattr(process, "_settings", ProcessSettings(timeout=60, timeout_per_second=2))
+    assert job_timeout({"fps": 30, "durationInFrames": 2700}) == 60 + 2 * 90
+    assert job_timeout({"fps": 30, "durationInFrames": 2700, "frameRange": [0, 299]}) == 80
+    assert job_timeout({"composition": "YouTubeIntro"}) == 60
+    with RemotionWorker(remotion_dir=worker_dir, node=sys.executable) as worker:
+        with pytest.raises(ProcessTimeout):
+            worker.render({"composition": "Slow", "output": "s.mp4"}, timeout=0.3)
+        assert not worker.running
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX process groups")
+def test_worker_cancel_kills_its_child_processes(worker_dir, tmp_path):
+    """Cancelling should kill the whole process group, not just the worker."""
+    pid_file = tmp_path / "child.pid"
+    cancel = threading.Event()
+    with RemotionWorker(remotion_dir=worker_dir, node=sys.executable) as worker:
+        threading.Timer(1.0, cancel.set).start()
+        with pytest.raises(RenderCancelled):
+            worker.render({"composition": "Browser", "output": str(pid_file)}, cancel=cancel)
+    child = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(child, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.1)
+    else:
+        pytest.fail("child process outlived the worker")
+
+
+def test_queued_jobs_hold_no_render_slot(worker_dir, slots):
+    """Threads waiting for a busy worker should leave the machine's other slots free."""
+    with RemotionWorker(remotion_dir=worker_dir, node=sys.executable) as worker:
+        jobs = [{"composition": "Wait", "output": f"{n}.mp4"} for n in range(3)]
+        threads = [threading.Thread(target=worker.render, args=(job,)) for job in jobs]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        with slots.acquire(timeout=0.2):  # one slot rendering, the other still free
+            pass
+        for thread in threads:
+            thread.join()
+
+
+def test_worker_startup_timeout_reports_stderr(worker_dir, monkeypatch):
+    """A worker that never says ready should fail with its stderr, not a bare timeout."""
+    (worker_dir / "worker.mjs").write_text(
+        "import sys, time\nsys.stderr.write('cannot find module\\n')\nsys.stderr.flush()\n"
+        "time.sleep(30)\n"
+    )
+    monkeypatch.setattr(remotion_worker, "STARTUP_TIMEOUT", 0.5)
+    worker = RemotionWorker(remotion_dir=worker_dir, node=sys.executable)
+    with pytest.raises(RuntimeError, match="cannot find module"):
+        worker.start()
+    assert not worker.running
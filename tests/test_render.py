@@ -1,6 +1,45 @@
 """Tests for rendering functions (basic unit tests)."""
 
+import json
+import os
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from videoforge.render import audio, engine, ffmpeg, process, remotion, scheduler
+from videoforge.render.animation import alpha_expr, typewriter_steps, y_offset_expr
+from videoforge.render.asset_server import AssetServer, fit_asset, parse_range, serve_spec_assets
+from videoforge.render.audio import bgm_cache_key, build_bgm_filter, prepare_bgm
+from videoforge.render.jobs import RenderCancelled, SlotLimiter
+from videoforge.render.output import atomic_output, place_file
+from videoforge.render.process import (
+    ProcessSettings,
+    ProcessTimeout,
+    cancel_scope,
+    parse_cpu_list,
+    run_process,
+)
+from videoforge.render.remotion_shards import plan_shards
+from videoforge.render.scheduler import TaskFailed, TaskGraph
+from videoforge.render.subtitles import collect_cues, to_ass, to_srt, to_vtt
+from videoforge.render.text_layer import build_composite_filter, rasterize_overlay
 from videoforge.render.transitions import XFADE_MAP
+from videoforge.schema import (
+    BGM,
+    Animation,
+    Audio,
+    NarrationSegment,
+    Scene,
+    SpecHeader,
+    TextOverlay,
+    VideoMeta,
+    VideoSpec,
+)
 
 
 def test_xfade_map_has_expected_transitions():
@@ -15,3 +54,1094 @@ def test_xfade_map_values():
     """FFmpeg xfade names should be valid."""
     assert XFADE_MAP["fade"] == "fade"
     assert XFADE_MAP["wipe_left"] == "wipeleft"
+
+
+def test_atomic_output_renames_into_place(tmp_path):
+    """atomic_output should only create the target once the block succeeds."""
+    target = tmp_path / "out.mp4"
+    with atomic_output(target) as partial:
+        assert partial.parent == tmp_path
+        assert partial.suffix == ".mp4"
+        partial.write_bytes(b"data")
+        assert not target.exists()
+    assert target.read_bytes() == b"data"
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_atomic_output_cleans_up_on_failure(tmp_path):
+    """A failed write should leave neither the target nor the partial file."""
+    target = tmp_path / "out.mp4"
+    with pytest.raises(RuntimeError), atomic_output(target) as partial:
+        partial.write_bytes(b"half")
+        raise RuntimeError("boom")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_atomic_output_is_safe_across_threads(tmp_path):
+    """Threads writing the same target should each get their own partial file."""
+    target = tmp_path / "bgm_bed.m4a"
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def write() -> None:
+        try:
+            with atomic_output(target) as partial:
+                partial.write_bytes(b"x" * 100)
+                barrier.wait(5)  # every thread is inside its block before any renames
+        except (OSError, threading.BrokenBarrierError) as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert target.read_bytes() == b"x" * 100
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_place_file(tmp_path):
+    """place_file should reproduce the source content at the destination."""
+    src = tmp_path / "src.mp4"
+    src.write_bytes(b"video")
+    dst = place_file(src, tmp_path / "sub" / "dst.mp4")
+    assert dst.read_bytes() == b"video"
+    assert src.exists()
+
+
+def test_mux_final_single_pass(tmp_path, monkeypatch):
+    """mux_final should concat, add the BGM bed and set faststart in one FFmpeg call."""
+    calls = []
+    monkeypatch.setattr(ffmpeg, "run_ffmpeg", lambda args, **kw: calls.append(args))
+    clips = [tmp_path / "a.mp4", tmp_path / "b.mp4"]
+    ffmpeg.mux_final(
+        tmp_path / "out.mp4", clips, audio_path=tmp_path / "bgm.m4a", work_dir=tmp_path
+    )
+    assert len(calls) == 1
+    args = calls[0]
+    assert args[args.index("-f") + 1] == "concat"
+    assert "+faststart" in args
+    assert args[args.index("-c:a") + 1] == "copy"
+    assert not list(tmp_path.glob("_concat_*"))
+
+
+def test_bgm_filter_loop_and_fades():
+    """The BGM bed filter should normalize, then apply volume and both fades."""
+    af = build_bgm_filter(BGM(volume=0.5, fade_in=2.0, fade_out=3.0), duration=60.0)
+    assert af.startswith("loudnorm=")
+    assert "apad" not in af
+    assert "volume=0.5" in af
+    assert "afade=t=out:st=57.0:d=3.0" in af
+    assert "apad" in build_bgm_filter(BGM(loop=False), duration=60.0)
+
+
+def test_bgm_cache_key(tmp_path):
+    """The cache key should depend on content and parameters, not the file name."""
+    a = tmp_path / "a.mp3"
+    b = tmp_path / "b.mp3"
+    a.write_bytes(b"track")
+    b.write_bytes(b"track")
+    bgm = BGM(source="a.mp3")
+    assert bgm_cache_key(a, bgm, 10.0) == bgm_cache_key(b, bgm, 10.0)
+    assert bgm_cache_key(a, bgm, 10.0) != bgm_cache_key(a, bgm, 11.0)
+    assert bgm_cache_key(a, bgm, 10.0) != bgm_cache_key(a, BGM(fade_in=1.0), 10.0)
+
+
+def test_prepare_bgm_uses_stream_loop_and_cache(tmp_path, monkeypatch):
+    """prepare_bgm should loop in one pass and reuse the cached bed afterwards."""
+    calls = []
+
+    def fake_run(args, cwd=None):
+        calls.append(args)
+        Path(args[-1]).write_bytes(b"bed")
+
+    monkeypatch.setattr(audio, "run_ffmpeg", fake_run)
+    src = tmp_path / "bgm.mp3"
+    src.write_bytes(b"track")
+    bgm = BGM(source="bgm.mp3", loop=True)
+
+    first = prepare_bgm(src, bgm, 600.0, cache_dir=tmp_path / "cache")
+    second = prepare_bgm(src, bgm, 600.0, cache_dir=tmp_path / "cache")
+    assert first == second and first.read_bytes() == b"bed"
+    assert len(calls) == 1
+    assert calls[0][:2] == ["-stream_loop", "-1"]
+    assert calls[0][calls[0].index("-t") + 1] == "600.000"
+
+    # Without a cache dir: the configured cache, never the source's directory
+    monkeypatch.setenv("VIDEOFORGE_CACHE_DIR", str(tmp_path / "configured"))
+    default = prepare_bgm(src, bgm, 30.0)
+    assert default.parent == tmp_path / "configured" / "bgm"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bgm.mp3", "cache", "configured"]
+
+
+def test_bundle_hash_tracks_sources(tmp_path):
+    """The bundle key should change when sources or the lockfile change."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "index.ts").write_text("registerRoot(Root);")
+    (tmp_path / "package-lock.json").write_text("{}")
+
+    first = remotion.bundle_hash(tmp_path)
+    assert remotion.bundle_hash(tmp_path) == first
+    (tmp_path / "src" / "index.ts").write_text("registerRoot(Other);")
+    assert remotion.bundle_hash(tmp_path) != first
+
+
+def test_cached_bundle_lookup(tmp_path, monkeypatch):
+    """cached_bundle should only return a fully built bundle directory."""
+    monkeypatch.setattr(remotion, "bundle_hash", lambda remotion_dir=None: "abc")
+    assert remotion.cached_bundle(tmp_path) is None
+    bundle = tmp_path / "remotion-bundles" / "abc"
+    bundle.mkdir(parents=True)
+    assert remotion.cached_bundle(tmp_path) is None
+    (bundle / "index.html").write_text("<html></html>")
+    assert remotion.cached_bundle(tmp_path) == bundle
+
+
+def test_forced_rebuild_moves_the_old_bundle_aside(tmp_path, monkeypatch):
+    """A rebuild is renamed into place; the old bundle survives until it is pruned."""
+    builds = []
+
+    def fake_bundle(cmd, **kw):
+        out = Path(cmd[cmd.index("--out-dir") + 1])
+        (out / "index.html").write_text(f"build {len(builds)}")
+        builds.append(out)
+        return subprocess.CompletedProcess(cmd, 0, None, "")
+
+    monkeypatch.setattr(remotion, "find_remotion_dir", lambda: tmp_path)
+    monkeypatch.setattr(remotion, "bundle_hash", lambda remotion_dir=None: "abc")
+    monkeypatch.setattr(remotion, "is_remotion_installed", lambda: True)
+    monkeypatch.setattr(remotion.shutil, "which", lambda name: name)
+    monkeypatch.setattr(remotion, "run_process", fake_bundle)
+    bundle = remotion.ensure_bundle(tmp_path)
+    old_index = (bundle / "index.html").open()  # a render reading the old bundle
+    assert remotion.ensure_bundle(tmp_path, force=True) == bundle
+    assert (bundle / "index.html").read_text() == "build 1"
+    assert old_index.read() == "build 0"
+    old_index.close()
+    [retired] = (tmp_path / "remotion-bundles").glob(".retired_abc_*")
+    assert (retired / "abc" / "index.html").exists()
+
+    monkeypatch.setattr(remotion, "RETIRED_BUNDLE_SECONDS", -1)
+    remotion.ensure_bundle(tmp_path, force=True)
+    assert not retired.exists()
+
+
+def test_scene_frame_ranges_round_half_up():
+    """Frame math should match Math.round in VideoForgeComposition.tsx."""
+    spec = VideoSpec(
+        video=VideoMeta(fps=30),
+        scenes=[Scene(duration=1.05), Scene(duration=2.0), Scene(duration=0.0166)],
+    )
+    # 1.05 * 30 = 31.5 -> 32 (half up), 0.0166 * 30 = 0.498 -> 0
+    assert remotion.scene_frame_ranges(spec) == [(0, 32), (32, 92), (92, 92)]
+    assert remotion.total_frames(spec) == 92
+    assert remotion.videospec_to_props(spec)["scene_frames"] == [32, 60, 0]
+
+
+def test_plan_shards_on_scene_boundaries():
+    """Shards should cover every frame once and only cut on scene boundaries."""
+    spec = VideoSpec(scenes=[Scene(duration=d) for d in (5, 5, 10, 5, 5, 10)])
+    plan = plan_shards(spec, 3)
+    assert plan == [(0, 299), (300, 749), (750, 1199)]
+    starts = {start for start, _ in remotion.scene_frame_ranges(spec)}
+    assert all(first in starts for first, _ in plan)
+    assert len(plan_shards(spec, 20)) == 6
+    assert plan_shards(VideoSpec(), 4) == []
+
+
+def test_shards_render_muted_and_get_the_audio_once(tmp_path, monkeypatch):
+    """Shards carry no audio; the BGM bed is muxed once over the joined video."""
+    from videoforge.render import remotion_shards
+
+    jobs, muxed = [], {}
+
+    class FakeWorker:
+        def render(self, job, **kw):
+            jobs.append(job)
+            Path(job["output"]).write_bytes(b"shard")
+
+    def fake_mux(output, parts, **kw):
+        muxed.update(parts=parts, **kw)
+        output.write_bytes(b"joined")
+
+    monkeypatch.setattr(remotion_shards, "ensure_bundle", lambda cache_dir=None: tmp_path)
+    monkeypatch.setattr(remotion_shards, "mux_final", fake_mux)
+    monkeypatch.setattr(
+        remotion_shards, "prepare_bgm",
+        lambda source, bgm, duration, cache_dir=None: tmp_path / f"bed_{duration:g}.m4a",
+    )
+    (tmp_path / "bgm.mp3").write_bytes(b"")
+    spec = VideoSpec(
+        scenes=[Scene(duration=2.0), Scene(duration=3.0)],
+        audio=Audio(bgm=BGM(source="bgm.mp3")),
+    )
+    for i in range(2):
+        remotion_shards.render_shard(spec, i, 2, tmp_path, worker=FakeWorker())
+    assert [job["muted"] for job in jobs] == [True, True]
+
+    out = tmp_path / "out.mp4"
+    remotion_shards.join_shards(spec, 2, tmp_path, out, base_dir=tmp_path, cache_dir=tmp_path)
+    assert len(muxed["parts"]) == 2
+    assert muxed["audio_path"] == tmp_path / "bed_5.m4a"
+    assert out.read_bytes() == b"joined"
+
+
+def test_slot_limiter_blocks_when_full(tmp_path):
+    """A second job should wait for a slot, then time out or honour cancellation."""
+    limiter = SlotLimiter(1, tmp_path)
+    with limiter.acquire() as slot:
+        assert slot == 0
+        with pytest.raises(TimeoutError), limiter.acquire(timeout=0.3):
+            pass
+        cancel = threading.Event()
+        cancel.set()
+        with pytest.raises(RenderCancelled), limiter.acquire(cancel=cancel):
+            pass
+    with limiter.acquire(timeout=0.3) as slot:
+        assert slot == 0
+
+
+def test_remotion_jobs_use_private_props(tmp_path, monkeypatch):
+    """Concurrent renders must not share a props file inside the remotion dir."""
+    seen = []
+
+    def fake_run_job(cmd, cwd, timeout, cancel):
+        props = Path(cmd[cmd.index("--props") + 1])
+        seen.append((props, props.read_text(encoding="utf-8"), timeout))
+        Path(cmd[cmd.index("--props") - 1]).write_bytes(b"video")
+
+    monkeypatch.setattr(remotion, "is_remotion_installed", lambda: True)
+    monkeypatch.setattr(remotion, "serve_url_args", lambda *a: [])
+    monkeypatch.setattr(remotion, "remotion_slots", lambda: SlotLimiter(2, tmp_path / "locks"))
+    monkeypatch.setattr(remotion, "_run_job", fake_run_job)
+
+    remotion.render_template("A", {"n": 1}, tmp_path / "a.mp4", timeout=5)
+    remotion.render_template("B", {"n": 2}, tmp_path / "b.mp4", timeout=5)
+
+    assert (tmp_path / "a.mp4").read_bytes() == b"video"
+    assert seen[0][0] != seen[1][0]
+    assert remotion.find_remotion_dir() not in seen[0][0].parents
+    assert [text for _, text, _ in seen] == ['{"n": 1}', '{"n": 2}']
+    assert not seen[0][0].exists()
+    assert seen[0][2] == 5
+
+
+def test_run_job_kills_on_cancel(tmp_path):
+    """Cancelling a job should kill its process promptly and raise RenderCancelled."""
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+    with pytest.raises(RenderCancelled):
+        remotion._run_job(cmd, tmp_path, timeout=20, cancel=cancel)
+    with pytest.raises(RuntimeError, match="timed out"):
+        remotion._run_job(cmd, tmp_path, timeout=0.3, cancel=None)
+
+
+def test_graph_thread_budget_limits_each_ffmpeg(monkeypatch):
+    """Tasks of a graph run with ``threads`` pass that budget on to every FFmpeg."""
+    commands = []
+
+    def fake_run(cmd, **kw):
+        commands.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, None, "")
+
+    monkeypatch.setattr(ffmpeg, "find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(ffmpeg, "run_process", fake_run)
+    graph = TaskGraph()
+    graph.add("encode", lambda: ffmpeg.run_ffmpeg(["-i", "a.mp4", "out.mp4"]))
+    graph.add("own", lambda: ffmpeg.run_ffmpeg(["-i", "a.mp4", "-threads", "1", "b.mp4"]))
+    graph.run(cpu_workers=1, threads=3)
+    ffmpeg.run_ffmpeg(["-i", "a.mp4", "c.mp4"])  # outside the graph: no budget
+    assert commands == [
+        ["ffmpeg", "-y", "-filter_threads", "3", "-i", "a.mp4", "-threads", "3", "out.mp4"],
+        ["ffmpeg", "-y", "-i", "a.mp4", "-threads", "1", "b.mp4"],
+        ["ffmpeg", "-y", "-i", "a.mp4", "c.mp4"],
+    ]
+
+
+def test_run_process_keeps_a_bounded_stderr_tail(monkeypatch):
+    """Only the end of a chatty process's output is kept; stdout can be captured."""
+    monkeypatch.setattr(process, "_settings", ProcessSettings(timeout=20))
+    script = (
+        "import sys\n"
+        "for i in range(20000): print(f'frame={i} fps=30 speed=1.0x', file=sys.stderr)\n"
+        "print('42')\n"
+        "sys.exit(3)"
+    )
+    result = run_process([sys.executable, "-c", script], capture_stdout=True)
+    assert result.returncode == 3
+    assert result.stdout.strip() == "42"
+    assert len(result.stderr) <= process.TAIL_BYTES
+    assert result.stderr.startswith("frame=") and "frame=19999 " in result.stderr
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX pipes and process limits")
+def test_run_process_does_not_wait_for_lingering_children(monkeypatch):
+    """A grandchild holding the output pipe open must not keep the call from returning."""
+    import signal
+    import time
+
+    monkeypatch.setattr(process, "_settings", ProcessSettings(timeout=20))
+    monkeypatch.setattr(process, "READER_JOIN_TIMEOUT", 0.2)
+    script = (
+        "import subprocess, sys\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+        "print(child.pid, flush=True)"
+    )
+    started = time.monotonic()
+    result = run_process([sys.executable, "-c", script])
+    assert time.monotonic() - started < 10
+    os.kill(int(result.stderr.split()[0]), signal.SIGKILL)
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="needs nice and CPU affinity support"
+)
+def test_run_process_applies_limits_before_exec(monkeypatch):
+    """The nice level and CPU affinity are in place when the child starts."""
+    cpu = min(os.sched_getaffinity(0))
+    monkeypatch.setattr(
+        process, "_settings", ProcessSettings(nice=5, cpus=frozenset({cpu}))
+    )
+    script = "import os; print(os.nice(0), sorted(os.sched_getaffinity(0)))"
+    result = run_process([sys.executable, "-c", script], capture_stdout=True)
+    nice, cpus = result.stdout.split(" ", 1)
+    assert int(nice) >= 5
+    assert cpus.strip() == f"[{cpu}]"
+
+
+def test_run_process_cancel_scope_and_timeouts(monkeypatch):
+    """The thread's cancel scope kills the process; timeouts scale with ``-t``."""
+    monkeypatch.setattr(process, "_settings", ProcessSettings(timeout=60, timeout_per_second=2))
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+    with cancel_scope(cancel), pytest.raises(RenderCancelled):
+        run_process(cmd)
+    with pytest.raises(process.ProcessTimeout, match="timed out"):
+        run_process(cmd, timeout=0.3)
+
+    timeouts = []
+
+    def fake_run(cmd, timeout, **kw):
+        timeouts.append(timeout)
+        return subprocess.CompletedProcess(cmd, 0, None, "")
+
+    monkeypatch.setattr(ffmpeg, "find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(ffmpeg, "run_process", fake_run)
+    ffmpeg.run_ffmpeg(["-i", "in.png", "-t", "30", "out.mp4"])
+    ffmpeg.run_ffmpeg(["-i", "a.mp4", "out.mp4"], duration=100)
+    ffmpeg.run_ffmpeg(["-i", "a.mp4", "out.mp4"])
+    assert timeouts == [120, 260, 60]
+    assert parse_cpu_list("0-3, 6") == frozenset({0, 1, 2, 3, 6})
+    assert parse_cpu_list("") is None
+
+
+def test_hybrid_routes_only_animated_scenes_to_remotion(tmp_path, monkeypatch):
+    """Hybrid mode should send animated scenes to Remotion, alone and without transitions."""
+    spec = VideoSpec(scenes=[
+        Scene(id="static", text_overlays=[TextOverlay(content="a")]),
+        Scene(
+            id="anim",
+            transition_in="fade",
+            text_overlays=[TextOverlay(content="b", animation=Animation.FADE_IN)],
+        ),
+        Scene(id="plain"),
+    ])
+    remotion_specs = []
+
+    class FakeWorker:
+        def close(self):
+            pass
+
+    def fake_remotion(scene_spec, output, **kwargs):
+        remotion_specs.append(scene_spec)
+        assert kwargs["muted"]
+        return output
+
+    monkeypatch.setattr(engine, "RemotionWorker", FakeWorker)
+    monkeypatch.setattr(engine, "is_remotion_installed", lambda: True)
+    monkeypatch.setattr(engine, "render_with_remotion", fake_remotion)
+    monkeypatch.setattr(
+        engine, "render_scene", lambda scene, output_dir, **kw: output_dir / f"{scene.id}.mp4"
+    )
+
+    rendering = engine.RenderEngine(config=engine.Config(), hybrid=True)
+    graph = TaskGraph()
+    with rendering._scene_tasks(graph, spec, tmp_path, None) as scene_tasks:
+        results = graph.run()
+    clips = [results[task] for task in scene_tasks]
+
+    assert [c.name for c in clips] == ["static.mp4", "anim_remotion.mp4", "plain.mp4"]
+    [solo] = remotion_specs
+    assert [s.id for s in solo.scenes] == ["anim"]
+    assert solo.scenes[0].transition_in.value == "none"
+    assert spec.scenes[1].transition_in.value == "fade"
+
+
+def test_parse_range():
+    """Byte ranges should follow RFC 9110, clamped to the file size."""
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=500-5000", 1000) == (500, 999)
+    assert parse_range("bytes=1000-", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    assert parse_range("bytes=0-1,5-9", 1000) == (0, 999)
+
+
+def test_asset_server_serves_ranges(tmp_path):
+    """The server should answer range requests with 206 and cache headers."""
+    asset = tmp_path / "clip.mp4"
+    asset.write_bytes(bytes(range(256)) * 4)
+    with AssetServer() as server:
+        url = server.add(asset)
+        with urllib.request.urlopen(url) as resp:
+            assert resp.status == 200
+            assert resp.read() == asset.read_bytes()
+            assert "immutable" in resp.headers["Cache-Control"]
+            assert resp.headers["Accept-Ranges"] == "bytes"
+        request = urllib.request.Request(url, headers={"Range": "bytes=10-19"})
+        with urllib.request.urlopen(request) as resp:
+            assert resp.status == 206
+            assert resp.headers["Content-Range"] == "bytes 10-19/1024"
+            assert resp.read() == bytes(range(10, 20))
+
+
+def test_fit_asset_downscales_oversized_images(tmp_path):
+    """Images larger than the render size should be cached at cover size."""
+    from PIL import Image
+
+    big = tmp_path / "big.png"
+    Image.new("RGB", (4000, 3000), "red").save(big)
+    small = tmp_path / "small.png"
+    Image.new("RGB", (640, 360), "red").save(small)
+
+    fitted = fit_asset(big, "image", 1920, 1080, cache_dir=tmp_path / "cache")
+    assert fitted.parent == tmp_path / "cache" / "assets"
+    with Image.open(fitted) as img:
+        assert img.size == (1920, 1440)
+    assert fit_asset(big, "image", 1920, 1080, cache_dir=tmp_path / "cache") == fitted
+    assert fit_asset(small, "image", 1920, 1080, cache_dir=tmp_path / "cache") == small
+
+
+def test_serve_spec_assets_rewrites_local_sources(tmp_path):
+    """Local scene sources should point at the server; remote ones stay untouched."""
+    (tmp_path / "photo.jpg").write_bytes(b"jpeg")
+    spec = VideoSpec(scenes=[
+        Scene(type="image", source="photo.jpg"),
+        Scene(type="image", source="https://example.com/a.jpg"),
+        Scene(type="color"),
+    ])
+    props = remotion.videospec_to_props(spec)
+    with serve_spec_assets(spec, props, tmp_path, tmp_path / "cache") as served:
+        url = served["scenes"][0]["source"]
+        assert url.startswith("http://127.0.0.1:")
+        with urllib.request.urlopen(url) as resp:
+            assert resp.read() == b"jpeg"
+        assert served["scenes"][1]["source"] == "https://example.com/a.jpg"
+    assert props["scenes"][0]["source"] == "photo.jpg"
+
+
+def _any_font() -> Path:
+    for root in ("/usr/share/fonts", "/Library/Fonts", "C:/Windows/Fonts"):
+        for pattern in ("*.ttf", "*.otf"):
+            found = next(Path(root).rglob(pattern), None) if Path(root).exists() else None
+            if found:
+                return found
+    pytest.skip("no font file available")
+
+
+def test_rasterized_overlay_is_cached_and_premultiplied(tmp_path):
+    """Identical overlays should share one PNG; the PNG stores premultiplied alpha."""
+    from PIL import Image
+
+    font = _any_font()
+    overlay = TextOverlay(content="Hello", font_size=40, color="#FF0000", bg_color="#0000FF80")
+    layer = rasterize_overlay(overlay, font, cache_dir=tmp_path)
+    mtime = layer.image.stat().st_mtime_ns
+
+    moved = TextOverlay(**{**overlay.model_dump(), "position": "top_left", "start": 1.0})
+    again = rasterize_overlay(moved, font, cache_dir=tmp_path)
+    assert again.image == layer.image
+    assert again.image.stat().st_mtime_ns == mtime
+    assert again.position == "top_left"
+    assert layer.padding == 10
+
+    with Image.open(layer.image) as img:
+        _, _, b, a = img.getpixel((1, 1))  # inside the padding: box only
+    assert a == 0x80
+    assert b == round(0xFF * 0x80 / 255)
+
+    other = rasterize_overlay(TextOverlay(content="Hello", color="#00FF00"), font, tmp_path)
+    assert other.image != layer.image
+
+
+def test_composite_filter_single_pass(tmp_path):
+    """All layers should chain through one filter graph with premultiplied alpha."""
+    font = _any_font()
+    layers = [
+        rasterize_overlay(TextOverlay(content="A", position="center"), font, tmp_path),
+        rasterize_overlay(TextOverlay(content="B", end=2.0), font, tmp_path),
+    ]
+    graph = build_composite_filter(layers, 5.0)
+    assert graph.count("overlay=") == 2
+    assert "[0:v][1:v]overlay=x=(W-w)/2:y=(H-h)/2:alpha=premultiplied[v1]" in graph
+    assert graph.endswith("enable=lte(t\\,2.0)[vout]")
+
+
+def test_animation_expressions_match_remotion_timings():
+    """Fades, slides and typewriter windows should follow TextOverlay.tsx."""
+    assert alpha_expr("fade_in", 1.0, None, 5.0) == "clip((t-1.0)/0.5,0,1)"
+    assert alpha_expr("fade_out", None, None, 5.0) == "clip((5.0-t)/0.5,0,1)"
+    assert alpha_expr("none", None, None, 5.0) is None
+    assert y_offset_expr("slide_up", None) == "60*(1-clip((t-0.0)/0.4,0,1))"
+    assert y_offset_expr("slide_down", 2.0).startswith("-60*")
+
+    steps = typewriter_steps("abc", 1.0, 4.0)
+    assert [p for p, _, _ in steps] == ["a", "ab", "abc"]
+    assert [f for _, f, _ in steps] == [1.5, 2.0, 2.5]
+    assert steps[0][2] == 1.999 and steps[-1][2] == 4.0
+    assert len(typewriter_steps("x" * 500, None, None)) == 48
+
+
+def test_animated_layers_fade_in_graph(tmp_path):
+    """An animated layer should fade colour and alpha together and slide its y."""
+    font = _any_font()
+    layer = rasterize_overlay(
+        TextOverlay(content="Hi", animation=Animation.SLIDE_UP, start=1.0), font, tmp_path
+    )
+    graph = build_composite_filter([layer], 5.0)
+    assert "[1:v]format=rgba,fade=t=in:st=1.0:d=0.3:alpha=1,fade=t=in:st=1.0:d=0.3[a1]" in graph
+    assert "[0:v][a1]overlay=" in graph
+    assert "y=H*0.85-0+60*(1-clip((t-1.0)/0.4\\,0\\,1))" in graph
+
+
+def test_drawtext_typewriter_single_pass(tmp_path, monkeypatch):
+    """The drawtext fallback should chain one windowed drawtext per prefix in one run."""
+    calls = []
+    monkeypatch.setattr(ffmpeg, "run_ffmpeg", lambda args, **kw: calls.append(args))
+    ffmpeg.add_text_overlay(
+        tmp_path / "in.mp4", tmp_path / "out.mp4", "abc", "Sans", 40, "#FFFFFF",
+        "center", animation="typewriter", duration=5.0,
+    )
+    [args] = calls
+    vf = args[args.index("-vf") + 1]
+    assert vf.count("drawtext=") == 3
+    assert "enable=gte(t\\,0.5)*lte(t\\,0.999)" in vf
+    assert not list(tmp_path.glob("_text_*"))
+
+
+def _caption_spec() -> VideoSpec:
+    return VideoSpec(
+        video=VideoMeta(resolution=(1280, 720)),
+        scenes=[
+            Scene(id="a", duration=4.0, transition_out="fade", transition_duration=1.0,
+                  text_overlays=[TextOverlay(content="Hello", start=0.5, end=2.0)]),
+            Scene(id="b", duration=3.0, text_overlays=[
+                TextOverlay(content="World", position="top_left", animation="fade_in",
+                            bg_color="#00000080"),
+            ]),
+        ],
+        audio=Audio(narration=[NarrationSegment(scene="b", text="ナレーション")]),
+    )
+
+
+def test_subtitle_cues_follow_the_timeline():
+    """Cue times should include scene offsets minus transition overlaps."""
+    spec = _caption_spec()
+    assert spec.timeline.starts == [0.0, 3.0]
+    cues = collect_cues(spec)
+    assert [(c.start, c.end, c.text) for c in cues] == [
+        (0.5, 2.0, "Hello"), (3.0, 6.0, "World"), (3.0, 6.0, "ナレーション"),
+    ]
+
+
+def test_subtitle_writers():
+    """SRT, WebVTT and ASS output should carry timing, placement and styling."""
+    cues = collect_cues(_caption_spec())
+    srt = to_srt(cues)
+    assert srt.startswith("1\n00:00:00,500 --> 00:00:02,000\nHello\n")
+
+    vtt = to_vtt(cues)
+    assert vtt.startswith("WEBVTT\n")
+    assert "00:00:03.000 --> 00:00:06.000 line:5% position:5% align:start\nWorld" in vtt
+
+    ass = to_ass(cues, 1280, 720)
+    assert "PlayResX: 1280" in ass
+    world = next(line for line in ass.splitlines() if line.endswith("World"))
+    assert world.startswith("Dialogue: 0,0:00:03.00,0:00:06.00,Box,")
+    assert "\\an7" in world and "\\pos(64,36)" in world and "\\fad(500,0)" in world
+    assert "\\3a&H7F&" in world
+    assert "Narration,,0,0,0,,ナレーション" in ass
+
+
+def test_mux_final_adds_soft_subtitles(tmp_path, monkeypatch):
+    """A subtitle file should ride along in the same concat pass as a text stream."""
+    calls = []
+    monkeypatch.setattr(ffmpeg, "run_ffmpeg", lambda args, **kw: calls.append(args))
+    ffmpeg.mux_final(
+        tmp_path / "out.mp4", [tmp_path / "a.mp4"], audio_path=tmp_path / "bgm.m4a",
+        work_dir=tmp_path, subtitle_path=tmp_path / "out.ass",
+    )
+    [args] = calls
+    assert args.count("-i") == 3
+    assert args[args.index("-c:s") + 1] == "mov_text"
+    assert "2:s" in args
+    assert max(i for i, a in enumerate(args) if a == "-i") < args.index("-map")
+
+
+def test_clip_joiner_uses_timeline_offsets(tmp_path, monkeypatch):
+    """xfade offsets should be relative to each run; a failed one becomes a hard cut."""
+    calls = []
+
+    def fake_xfade(a, b, out, kind, duration, offset):
+        calls.append((kind, duration, offset))
+        if len(calls) == 2:
+            raise RuntimeError("xfade failed")
+        return out
+
+    monkeypatch.setattr(engine, "apply_xfade", fake_xfade)
+    spec = VideoSpec(scenes=[
+        Scene(duration=4.0, transition_out="fade", transition_duration=1.0),
+        Scene(duration=3.0, transition_out="dissolve", transition_duration=0.5),
+        Scene(duration=2.0, transition_duration=0.5),
+        Scene(duration=2.0, transition_in="fade"),
+    ])
+    joiner = engine._ClipJoiner(spec.timeline, tmp_path)
+    for i in range(4):
+        joiner.add(tmp_path / f"{i}.mp4")
+    assert calls == [("fade", 1.0, 3.0), ("dissolve", 0.5, 5.5), ("fade", 0.5, 1.5)]
+    assert joiner.clips == [tmp_path / "transition_1.mp4", tmp_path / "transition_3.mp4"]
+    assert joiner.duration == 6.0 + 3.5
+
+
+def test_render_stream_renders_scenes_as_they_arrive(tmp_path, monkeypatch):
+    """Each streamed scene should be rendered and joined before the next is read."""
+    events = []
+
+    def produce():
+        for i, d in enumerate((2.0, 3.0)):
+            events.append(f"read {i}")
+            yield Scene(duration=d, transition_out="fade", transition_duration=0.5,
+                        text_overlays=[TextOverlay(content=f"t{i}")])
+
+    def fake_render_scene(scene, output_dir, **kw):
+        events.append(f"render {scene.id}")
+        assert scene.text_overlays == []  # captions carry the text instead
+        return output_dir / f"{scene.id}.mp4"
+
+    muxed = {}
+
+    def fake_mux(output, clips, **kw):
+        muxed.update(clips=clips, **kw)
+        output.write_bytes(b"video")
+
+    monkeypatch.setattr(engine, "render_scene", fake_render_scene)
+    monkeypatch.setattr(engine, "apply_xfade", lambda a, b, out, *args: out)
+    monkeypatch.setattr(engine, "mux_final", fake_mux)
+    header = SpecHeader(export={"subtitles": "soft", "subtitle_format": "srt"})
+    out = tmp_path / "out" / "video.mp4"
+    engine.RenderEngine(config=engine.Config()).render_stream(header, produce(), out)
+
+    assert events == ["read 0", "render scene_0", "read 1", "render scene_1"]
+    assert [c.name for c in muxed["clips"]] == ["transition_1.mp4"]
+    srt = (tmp_path / "out" / "video.srt").read_text(encoding="utf-8")
+    assert "00:00:01,500 --> 00:00:04,500\nt1" in srt
+
+
+def test_task_graph_runs_tasks_after_their_dependencies(monkeypatch):
+    """Tasks get their dependencies' results; a transient failure is retried."""
+    monkeypatch.setattr(scheduler, "RETRY_BACKOFF", 0)
+    both_started = threading.Barrier(2, timeout=5)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ProcessTimeout("ffmpeg timed out")
+        return "clip"
+
+    def started(result):
+        both_started.wait()  # the encode and the audio task run side by side
+        return result
+
+    graph = TaskGraph()
+    graph.add("scene", lambda: started("raw"))
+    graph.add("bgm", lambda: started("bgm"), pool="io")
+    graph.add("flaky", flaky, retries=1)
+    graph.add("mux", lambda a, b, c: (a, b, c), deps=["flaky", "bgm", "scene"])
+
+    results = graph.run(cpu_workers=2)
+    assert results["mux"] == ("clip", "bgm", "raw")
+    assert graph.tasks["flaky"].attempts == 2
+
+    # FFmpeg rejecting its input would fail the same way again: no retry
+    graph = TaskGraph()
+    graph.add("bad", lambda: attempts.append(1) or 1 / 0, retries=1)
+    with pytest.raises(TaskFailed, match="bad") as info:
+        graph.run()
+    assert graph.tasks["bad"].attempts == 1
+    assert isinstance(info.value.error, ZeroDivisionError)
+    with pytest.raises(ValueError, match="unknown"):
+        graph.add("late", print, deps=["missing"])
+
+
+def test_task_graph_stops_on_failure_and_cancel():
+    """A failed task stops its dependents; setting ``cancel`` raises RenderCancelled."""
+    ran = []
+
+    def broken():
+        raise OSError("disk full")
+
+    graph = TaskGraph()
+    graph.add("broken", broken)
+    graph.add("after", lambda _: ran.append("after"), deps=["broken"])
+    with pytest.raises(TaskFailed, match="broken") as info:
+        graph.run()
+    assert isinstance(info.value.error, OSError)
+    assert ran == []
+
+    cancel = threading.Event()
+    graph = TaskGraph()
+    graph.add("slow", lambda: cancel.set() or ran.append("slow"))
+    graph.add("next", lambda _: ran.append("next"), deps=["slow"])
+    with pytest.raises(RenderCancelled):
+        graph.run(cancel=cancel)
+    assert ran == ["slow"]
+
+
+def test_render_prepares_bgm_while_scenes_encode(tmp_path, monkeypatch):
+    """BGM preparation should overlap scene encodes; a failed xfade re-sizes the bed."""
+    bgm_started = threading.Event()
+    beds = []
+
+    def fake_render_scene(scene, output_dir, **kw):
+        assert bgm_started.wait(5), "BGM waited for the scene encodes"
+        return output_dir / f"{scene.id}.mp4"
+
+    def fake_prepare_bgm(source, bgm, duration, cache_dir=None):
+        bgm_started.set()
+        beds.append(duration)
+        return tmp_path / f"bed_{len(beds)}.m4a"
+
+    def fake_xfade(*args):
+        raise RuntimeError("xfade failed")
+
+    muxed = {}
+
+    def fake_mux(output, clips, **kw):
+        muxed.update(clips=clips, **kw)
+        output.write_bytes(b"video")
+
+    monkeypatch.setattr(engine, "render_scene", fake_render_scene)
+    monkeypatch.setattr(engine, "prepare_bgm", fake_prepare_bgm)
+    monkeypatch.setattr(engine, "apply_xfade", fake_xfade)
+    monkeypatch.setattr(engine, "mux_final", fake_mux)
+    (tmp_path / "bgm.mp3").write_bytes(b"")
+    spec = VideoSpec(
+        scenes=[
+            Scene(duration=2.0, transition_out="fade", transition_duration=0.5),
+            Scene(duration=3.0),
+        ],
+        audio=Audio(bgm=BGM(source="bgm.mp3")),
+    )
+    out = tmp_path / "video.mp4"
+    engine.RenderEngine(config=engine.Config(render_workers=2)).render(spec, out, tmp_path)
+
+    assert beds == [4.5, 5.0]  # planned timeline, then the hard-cut length
+    assert [c.name for c in muxed["clips"]] == ["scene_0.mp4", "scene_1.mp4"]
+    assert muxed["audio_path"] == tmp_path / "bed_2.m4a"
+    assert out.read_bytes() == b"video"
+
+
+def test_resumed_render_skips_finished_tasks(tmp_path, monkeypatch):
+    """After a failed mux, ``resume`` should reuse the clips and joins on disk."""
+    rendered, joins = [], []
+
+    def fake_render_scene(scene, output_dir, **kw):
+        rendered.append(scene.id)
+        clip = output_dir / f"{scene.id}.mp4"
+        clip.write_bytes(b"clip")
+        return clip
+
+    def fake_xfade(a, b, out, *args):
+        joins.append(out.name)
+        out.write_bytes(b"joined")
+        return out
+
+    def failing_mux(output, clips, **kw):
+        raise RuntimeError("ffmpeg timed out")
+
+    def fake_mux(output, clips, **kw):
+        output.write_bytes(b"+".join(c.read_bytes() for c in clips))
+
+    monkeypatch.setattr(engine, "render_scene", fake_render_scene)
+    monkeypatch.setattr(engine, "apply_xfade", fake_xfade)
+    monkeypatch.setattr(engine, "mux_final", failing_mux)
+    config = engine.Config(cache_dir=tmp_path / "cache")
+    out = tmp_path / "video.mp4"
+    scenes = [Scene(duration=2.0, transition_out="fade"), Scene(), Scene()]
+
+    with pytest.raises(TaskFailed, match="mux"):
+        engine.RenderEngine(config).render(VideoSpec(scenes=scenes), out, resume=True)
+    assert rendered == ["scene_0", "scene_1", "scene_2"]
+    assert joins == ["transition_1.mp4"]
+
+    monkeypatch.setattr(engine, "mux_final", fake_mux)
+    rendered.clear()
+    spec = VideoSpec(scenes=[s.model_copy(update={"id": None}) for s in scenes])
+    engine.RenderEngine(config).render(spec, out, resume=True)
+    assert rendered == [] and joins == ["transition_1.mp4"]
+    assert out.read_bytes() == b"joined+clip"
+    assert not list((tmp_path / "cache" / "work").iterdir())
+
+
+def test_manifest_only_clears_its_own_work_dirs(tmp_path):
+    """A stale work dir is emptied; a directory of someone else's files is left alone."""
+    from videoforge.render.checkpoint import RenderManifest
+
+    work = tmp_path / "work"
+    RenderManifest.open(work, "old").record("scene:0", work / "clip.mp4")
+    (work / "clip.mp4").write_bytes(b"clip")
+    manifest = RenderManifest.open(work, "new")
+    assert [p.name for p in work.iterdir()] == ["manifest.json"]
+    assert manifest.completed() == {}
+
+    mine = tmp_path / "videos"
+    mine.mkdir()
+    (mine / "holiday.mp4").write_bytes(b"keep")
+    with pytest.raises(ValueError, match="not a videoforge work directory"):
+        RenderManifest.open(mine, "new", resume=False)
+    assert (mine / "holiday.mp4").read_bytes() == b"keep"
+
+
+def test_batch_shares_scenes_and_resumes_from_the_ledger(tmp_path, monkeypatch):
+    """Identical scenes render once; a failed job doesn't stop others; reruns skip done jobs."""
+    from videoforge.render.batch import JobLedger, jobs_from_specs, run_batch
+
+    rendered = []
+
+    def fake_render_scene(scene, output_dir, **kw):
+        rendered.append(scene.id)
+        if scene.id == "bad":
+            raise ValueError("Image not found")
+        clip = output_dir / f"{scene.id}.mp4"
+        clip.write_bytes(scene.color.encode())
+        return clip
+
+    def fake_mux(output, clips, **kw):
+        output.write_bytes(b"+".join(c.read_bytes() for c in clips))
+
+    monkeypatch.setattr(engine, "render_scene", fake_render_scene)
+    monkeypatch.setattr(engine, "mux_final", fake_mux)
+    specs = {
+        "a": [{"id": "intro", "color": "#111111"}, {"id": "a1", "color": "#aaaaaa"}],
+        "b": [{"id": "intro", "color": "#111111"}, {"id": "b1", "color": "#bbbbbb"}],
+        "c": [{"id": "bad", "color": "#cccccc"}],
+    }
+    paths = []
+    for name, scenes in specs.items():
+        paths.append(tmp_path / f"{name}.json")
+        paths[-1].write_text(json.dumps({"scenes": scenes}), encoding="utf-8")
+    config = engine.Config(cache_dir=tmp_path / "cache")
+    jobs = jobs_from_specs(paths, tmp_path / "out")
+    ledger = JobLedger(tmp_path / "out" / "ledger.json")
+
+    reports = run_batch(jobs, config, ledger=ledger, workers=2)
+    assert [(r.id, r.status) for r in reports] == [("a", "done"), ("b", "done"), ("c", "failed")]
+    assert "Image not found" in reports[2].error
+    assert sorted(rendered) == ["a1", "b1", "bad", "intro"]  # intro rendered once
+    assert (tmp_path / "out" / "b.mp4").read_bytes() == b"#111111+#bbbbbb"
+
+    rendered.clear()
+    ledger = JobLedger(tmp_path / "out" / "ledger.json")
+    reports = run_batch(jobs, config, ledger=ledger)
+    assert [r.status for r in reports] == ["skipped", "skipped", "failed"]
+    assert rendered == ["bad"]
+
+
+def test_daemon_runs_jobs_submitted_over_http(tmp_path, monkeypatch):
+    """The daemon queues JSON jobs, streams their events, serves results and cancels."""
+    from videoforge.render.daemon import RenderDaemon, make_server
+
+    release = threading.Event()
+
+    def fake_render_scene(scene, output_dir, **kw):
+        if scene.id == "slow":
+            release.wait(10)
+        clip = output_dir / f"{scene.id}.mp4"
+        clip.write_bytes(scene.id.encode())
+        return clip
+
+    def fake_mux(output, clips, **kw):
+        output.write_bytes(b"+".join(c.read_bytes() for c in clips))
+
+    monkeypatch.setattr(engine, "render_scene", fake_render_scene)
+    monkeypatch.setattr(engine, "mux_final", fake_mux)
+    config = engine.Config(cache_dir=tmp_path / "cache", output_dir=tmp_path / "out")
+    server = make_server(RenderDaemon(config), port=0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def call(path, body=None, method=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        request = urllib.request.Request(base + path, data=data, method=method, headers=headers)
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read()
+
+    try:
+        with server.daemon:
+            spec = {"scenes": [{"id": "a"}, {"id": "b"}]}
+            status, body = call("/jobs", {"spec": spec, "output": "first.mp4"})
+            assert status == 202
+            job_id = json.loads(body)["id"]
+            _, body = call(f"/jobs/{job_id}/events")
+            events = [json.loads(line) for line in body.splitlines()]
+            assert events[0]["event"] == "queued" and events[-1]["event"] == "done"
+            assert any(e["event"] == "progress" for e in events)
+            assert call(f"/jobs/{job_id}/result") == (200, b"a+b")
+            assert json.loads(call(f"/jobs/{job_id}")[1])["status"] == "done"
+
+            _, body = call("/jobs", {"scenes": [{"id": "slow"}]})
+            slow = json.loads(body)["id"]
+            _, body = call("/jobs", {"scenes": [{"id": "next"}]})
+            queued = json.loads(body)["id"]
+            call(f"/jobs/{queued}", method="DELETE")
+            call(f"/jobs/{slow}/cancel", method="POST")
+            release.set()
+            call(f"/jobs/{slow}/events")  # returns once the job has stopped
+            jobs = {j["id"]: j["status"] for j in json.loads(call("/jobs")[1])}
+            assert jobs[slow] == jobs[queued] == "cancelled"
+            with pytest.raises(urllib.error.HTTPError) as e:
+                call(f"/jobs/{slow}/result")
+            assert e.value.code == 409
+            with pytest.raises(urllib.error.HTTPError) as e:
+                call("/jobs", {"spec": spec, "output": "../escape.mp4"})
+            assert e.value.code == 400
+            # What a web page could send: a form post, or a rebound DNS name
+            with pytest.raises(urllib.error.HTTPError) as e:
+                call("/jobs", spec, headers={"Content-Type": "text/plain"})
+            assert e.value.code == 415
+            with pytest.raises(urllib.error.HTTPError) as e:
+                call("/jobs", spec, headers={"Host": "attacker.example:8765"})
+            assert e.value.code == 403
+
+            # Finished jobs beyond the retention limit are forgotten
+            server.daemon.max_finished = 1
+            server.daemon._prune()
+            assert [j["id"] for j in json.loads(call("/jobs")[1])] == [slow]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets")
+def test_daemon_socket_replaces_only_stale_sockets(tmp_path):
+    """Serving on a path should replace a leftover socket but never a regular file."""
+    import socket
+
+    from videoforge.render.daemon import RenderDaemon, make_server
+
+    daemon = RenderDaemon(engine.Config(cache_dir=tmp_path / "cache", output_dir=tmp_path))
+    path = tmp_path / "d.sock"
+    path.write_text("keep me")
+    with pytest.raises(ValueError, match="Not a socket"):
+        make_server(daemon, socket_path=path)
+    assert path.read_text() == "keep me"
+
+    path.unlink()
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(str(path))
+    stale.close()
+    make_server(daemon, socket_path=path).server_close()
+
+
+def test_plan_mirrors_render_steps(tmp_path):
+    """The plan should chain scenes, transitions and the final steps like the engine."""
+    from videoforge.config import Config
+    from videoforge.render.plan import CostModel, build_plan
+    from videoforge.schema import ExportConfig
+
+    font = _any_font()
+    config = Config(cache_dir=tmp_path / "cache", default_font_path=str(font))
+    config.default_font = "videoforge-test-font"
+    overlay = TextOverlay(content="Hi", font=config.default_font)
+    spec = VideoSpec(
+        scenes=[
+            Scene(id="a", duration=2.0, transition_out="fade", text_overlays=[overlay]),
+            Scene(id="b", duration=3.0),
+        ],
+        export=ExportConfig(codec="h265", subtitles=None, platforms=["tiktok"]),
+    )
+    rasterize_overlay(overlay, font, config.cache_dir)
+
+    plan = build_plan(spec, config, cost_model=CostModel())
+    ids = [t.id for t in plan.tasks]
+    # The engine's own task ids, then the exports that run on the finished file
+    assert ids == [
+        "scene:0", "scene:1", "join:0", "join:1", "narration", "bgm", "mux", "variant:tiktok",
+    ]
+    assert "1 text layer(s), 1 cached" in plan.get("scene:0").description
+    assert plan.get("join:1").op == "xfade"
+    assert plan.get("join:1").deps == ["join:0", "scene:1"]
+    assert plan.get("mux").deps == ["join:1", "narration", "bgm"]
+    assert "h265 chunked encode" in plan.get("mux").description
+    assert plan.get("variant:tiktok").deps == ["mux"]
+    # Tasks come in dependency order
+    seen = set()
+    for task in plan.tasks:
+        assert set(task.deps) <= seen
+        seen.add(task.id)
+    assert "8 tasks, 0 cached" in plan.to_table()
+
+
+def test_plan_has_no_side_effects(tmp_path, monkeypatch):
+    """Planning a hybrid render should neither change the spec nor set up a worker."""
+    from videoforge.config import Config
+    from videoforge.render.plan import CostModel, build_plan
+
+    def no_worker():
+        raise AssertionError("plan started a Remotion worker")
+
+    monkeypatch.setattr(engine, "is_remotion_installed", lambda: True)
+    monkeypatch.setattr(engine, "RemotionWorker", no_worker)
+    overlay = TextOverlay(content="Hi", animation="fade_in")
+    spec = VideoSpec(scenes=[Scene(text_overlays=[overlay]), Scene(duration=2.0)])
+    before = spec.model_dump()
+    plan = build_plan(spec, Config(cache_dir=tmp_path), "hybrid", cost_model=CostModel())
+    assert plan.get("scene:0").op == "remotion"
+    assert spec.model_dump() == before
+    assert not list(tmp_path.iterdir())
+
+
+def test_record_timings_calibrates_the_cost_model(tmp_path):
+    """Measured task times should become the rates of their operations."""
+    from videoforge.config import Config
+    from videoforge.render.plan import CostModel, build_plan, record_timings
+
+    config = Config(cache_dir=tmp_path / "cache")
+    spec = VideoSpec(scenes=[Scene(id="a", duration=2.0), Scene(id="b", duration=2.0)])
+    plan = build_plan(spec, config, cost_model=CostModel())
+    units = plan.get("scene:0").units
+    path = tmp_path / "costs.json"
+    record_timings(plan, {"scene:0": units * 0.002, "scene:1": units * 0.004}, path)
+    model = CostModel.load(path)
+    assert model.cpu["color"] == pytest.approx(0.003)
+    assert model.samples == {"color": 2}
+    record_timings(plan, {"scene:0": units * 0.006}, path)
+    assert CostModel.load(path).cpu["color"] == pytest.approx(0.004)
+
+
+def test_cost_model_calibration(tmp_path):
+    """A calibration file should override only the rates it lists."""
+    from videoforge.render.plan import DEFAULT_CPU_RATES, CostModel
+
+    path = tmp_path / "costs.json"
+    path.write_text('{"cpu": {"xfade": 0.5}}')
+    model = CostModel.load(path)
+    assert model.cpu_seconds("xfade", 10) == 5.0
+    assert model.cpu["color"] == DEFAULT_CPU_RATES["color"]
+    assert CostModel.load(model.save(tmp_path / "saved.json")) == model
@@ -1,5 +1,11 @@
 """Tests for VideoSpec parsing and validation."""
 
+import json
+
+import pytest
+
+from videoforge import spec as spec_module
+from videoforge.render.subtitles import narration_cues
 from videoforge.schema import (
     ExportConfig,
     Position,
@@ -9,7 +15,7 @@ from videoforge.schema import (
     VideoMeta,
     VideoSpec,
 )
-from videoforge.spec import dump_spec, parse_spec
+from videoforge.spec import dump_spec, load_spec, parse_spec, stream_spec
 
 
 def test_minimal_spec():
@@ -85,3 +91,114 @@ def test_text_overlay_defaults():
     assert overlay.font_size == 48
     assert overlay.color == "#FFFFFF"
     assert overlay.position == Position.BOTTOM_CENTER
+
+
+def test_timeline_index():
+    """The compiled timeline should index scenes by id, time and frame."""
+    spec = VideoSpec(
+        video=VideoMeta(fps=10),
+        scenes=[
+            Scene(id="a", duration=2.0, transition_out="fade", transition_duration=0.5),
+            Scene(id="b", duration=1.0),
+            Scene(id="c", duration=0.04),
+            Scene(id="d", duration=3.0),
+        ],
+    )
+    tl = spec.timeline
+    assert tl.starts == [0.0, 1.5, 2.5, 2.54]
+    assert tl.duration == 5.54
+    assert tl.transitions[1] == ("fade", 0.5) and tl.transitions[2] is None
+    assert tl.frame_ranges() == [(0, 20), (20, 30), (30, 30), (30, 60)]
+    assert tl.index_of("d") == 3 and tl.index_of("z") is None
+    assert [tl.scene_at(t) for t in (0.0, 1.6, 2.52, 5.0, 5.54, -1)] == [0, 1, 2, 3, None, None]
+    assert [tl.scene_at_frame(f) for f in (0, 29, 30, 59, 60)] == [0, 1, 3, 3, None]
+    assert spec.total_duration == 6.04
+
+
+def test_timeline_follows_scene_list():
+    """Replacing or extending the scene list should rebuild the cached timeline."""
+    spec = VideoSpec(scenes=[Scene(id="a")])
+    assert spec.timeline is spec.timeline
+    spec.scenes.append(Scene(id="b", duration=1.0))
+    assert spec.get_scene("b") is not None
+    spec.scenes = [Scene(id="c", duration=2.0)]
+    assert spec.get_scene("b") is None and spec.total_duration == 2.0
+
+
+def test_id_less_scenes_are_indexed():
+    """Id-less scenes get their fallback ids up front, so the timeline index sees them."""
+    spec = parse_spec({
+        "scenes": [{"duration": 2.0}, {"duration": 3.0}],
+        "audio": {"narration": [{"scene": "scene_1", "text": "Hello"}]},
+    })
+    assert spec.total_duration == 5.0
+    assert [s.id for s in spec.scenes] == ["scene_0", "scene_1"]
+    assert spec.get_scene("scene_1") is spec.scenes[1]
+    cues = narration_cues(spec.audio.narration, spec.timeline)
+    assert [(c.start, c.end, c.text) for c in cues] == [(2.0, 5.0, "Hello")]
+
+
+def test_load_spec_yaml_and_json_agree(tmp_path):
+    """YAML and the JSON fast path should produce the same validated spec."""
+    data = {"video": {"title": "高速"}, "scenes": [{"id": "a", "duration": 2.0}]}
+    (tmp_path / "s.yaml").write_text(dump_spec(parse_spec(data)), encoding="utf-8")
+    (tmp_path / "s.json").write_text(json.dumps(data), encoding="utf-8")
+    from_yaml = load_spec(tmp_path / "s.yaml", use_cache=False)
+    assert from_yaml == load_spec(tmp_path / "s.json", use_cache=False)
+    assert from_yaml.video.title == "高速"
+
+    (tmp_path / "bad.json").write_text('{"scenes": [{"duration": "long"}]}')
+    with pytest.raises(ValueError, match="Invalid VideoSpec"):
+        load_spec(tmp_path / "bad.json", use_cache=False)
+
+
+def test_load_spec_cache(tmp_path, monkeypatch):
+    """An unchanged spec should come from the cache; an edited one is re-parsed."""
+    path = tmp_path / "s.yaml"
+    path.write_text("scenes:\n  - id: a\n    duration: 2\n", encoding="utf-8")
+    cache = tmp_path / "cache"
+    first = load_spec(path, cache_dir=cache)
+    assert len(list((cache / "specs").glob("*.json"))) == 1
+
+    parsed = []
+    real_parse = spec_module._parse_bytes
+    monkeypatch.setattr(
+        spec_module, "_parse_bytes", lambda data, p: parsed.append(p) or real_parse(data, p)
+    )
+    assert load_spec(path, cache_dir=cache) == first
+    assert parsed == []
+
+    path.write_text("scenes:\n  - id: a\n    duration: 3\n", encoding="utf-8")
+    assert load_spec(path, cache_dir=cache).total_duration == 3.0
+    assert parsed == [path]
+
+    monkeypatch.setattr(spec_module, "__version__", "99.0")  # an upgrade misses the cache
+    load_spec(path, cache_dir=cache)
+    assert parsed == [path, path]
+
+    monkeypatch.setattr(spec_module, "SPEC_CACHE_ENTRIES", 2)
+    for n in range(4):
+        path.write_text(f"scenes:\n  - id: a\n    duration: {n + 4}\n", encoding="utf-8")
+        load_spec(path, cache_dir=cache)
+    assert len(list((cache / "specs").glob("*.json"))) == 2
+
+
+def test_stream_spec_validates_scene_by_scene(tmp_path):
+    """A JSONL spec should yield scenes lazily and name the line of a bad one."""
+    path = tmp_path / "s.jsonl"
+    path.write_text(
+        '{"video": {"title": "stream", "fps": 24}}\n'
+        '{"id": "a", "duration": 1.5}\n'
+        "\n"
+        '{"id": "b", "duration": "later"}\n',
+        encoding="utf-8",
+    )
+    header, scenes = stream_spec(path)
+    assert header.video.fps == 24
+    assert next(scenes).id == "a"
+    with pytest.raises(ValueError, match="s.jsonl:4"):
+        next(scenes)
+
+    path.write_text('{"video": {"title": "t"}}\n{"id": "a", "duration": 2}\n')
+    spec = load_spec(path, use_cache=False)
+    assert spec.video.title == "t" and spec.total_duration == 2.0
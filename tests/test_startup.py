@@ -0,0 +1,78 @@
+"""CLI startup checks: modules imported by common commands, via ``python -X importtime``.
+
+Wrapper scripts call ``videoforge validate`` and friends many times per session, so
+heavy modules must stay out of the paths that don't need them. The checks are on
+which modules load rather than on timings, which vary too much between machines.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+RUN_CLI = (
+    "import sys; sys.argv = ['videoforge', *sys.argv[1:]]; "
+    "from videoforge.cli import main; main()"
+)
+
+
+def import_profile(*args: str, env: dict | None = None) -> set[str]:
+    """Modules imported by ``videoforge *args``.
+
+    Interpreter startup (everything up to ``site``) is not counted.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN_CLI, *args],
+        capture_output=True, text=True, env={**os.environ, **(env or {})}, timeout=60,
+        check=False,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    modules: set[str] = set()
+    started = False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        name = line.rpartition("|")[2]
+        if not started:
+            started = name == " site"
+            continue
+        modules.add(name.strip())
+    return modules
+
+
+def test_help_imports_nothing_heavy():
+    """``--help`` should load click and the CLI module only."""
+    modules = import_profile("--help")
+    assert not modules & {"pydantic", "yaml", "httpx", "dotenv", "PIL", "logging"}
+    assert not {m for m in modules if m.startswith("videoforge.") and m != "videoforge.cli"}
+
+
+def test_validate_imports_stay_light(tmp_path):
+    """A cached ``validate`` should skip yaml, httpx and the render pipeline."""
+    spec = tmp_path / "spec.yaml"
+    spec.write_text(
+        "video:\n  title: bench\nscenes:\n"
+        + "".join(f"  - id: s{i}\n    duration: 2\n" for i in range(200)),
+        encoding="utf-8",
+    )
+    env = {"VIDEOFORGE_CACHE_DIR": str(tmp_path / "cache")}
+    import_profile("validate", str(spec), env=env)  # warm the spec cache
+
+    modules = import_profile("validate", str(spec), env=env)
+    assert not modules & {"yaml", "httpx", "PIL"}
+    # Only the small atomic-write helper used by the spec cache
+    assert {m for m in modules if m.startswith("videoforge.render")} <= {
+        "videoforge.render", "videoforge.render.output"
+    }
+
+
+@pytest.mark.parametrize("module", ["videoforge", "videoforge.render.remotion"])
+def test_light_modules_stay_light(module):
+    """The package root and the Remotion bridge should not pull in pydantic or httpx."""
+    proc = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, timeout=60, check=True,
+    )
+    loaded = set(proc.stdout.split())
+    assert not loaded & {"pydantic", "httpx", "yaml", "dotenv"}